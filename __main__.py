@@ -22,7 +22,62 @@ Date:   November 20, 2019
 """
 from consts import *
 from app import *
+import sys
+import os
+
+
+def parse_config(argv):
+    """
+    Returns the GameConfig set by the command line arguments argv
+
+    sys.argv is a list of the command line arguments when you run python. These
+    arguments are everything after the word python. So if you start the game typing
+
+        python invaders 3 4 0.5
+
+    Python puts ['invaders', '3', '4', '0.5'] into sys.argv. The arguments after the
+    first set the number of alien rows (1 to 10), the number of aliens in a row (1 to
+    15) and the alien speed (0 to 3).  A fourth argument (an int) sets the seed, so
+    that a run can be reproduced.  Any argument that is missing or out of range keeps
+    its original value.  These ranges only limit the command line; a GameConfig
+    itself takes any positive number of rows and aliens.
+
+    Parameter argv: the command line arguments (with the script name)
+    Precondition: argv is a list of strings
+    """
+    changes={}
+    try:
+        rows = int(argv[1])
+        if rows >= 1 and rows <= 10:
+            changes['alien_rows'] = rows
+    except:
+        pass # Use original value
+
+    try:
+        perrow = int(argv[2])
+        if perrow >= 1 and perrow <= 15:
+            changes['aliens_in_row'] = perrow
+    except:
+        pass # Use original value
+
+    try:
+        speed = float(argv[3])
+        if speed >= 0 and speed <= 3:
+            changes['alien_speed'] = speed
+    except:
+        pass # Use original value
+
+    try:
+        changes['seed'] = int(argv[4])
+    except:
+        pass # Use original value
+    return GameConfig(**changes)
+
 
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    # Set INVADERS_RECORD to log the input, or INVADERS_REPLAY to play a log back
+    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,tickrate=TICK_RATE,
+             atlas=True,record=os.environ.get('INVADERS_RECORD'),
+             replay=os.environ.get('INVADERS_REPLAY'),
+             settings=parse_config(sys.argv)).run()
@@ -13,6 +13,7 @@ Eben Hill emh238, Kiyam Merali km942
 from consts import *
 from game2d import *
 from wave import *
+import random
 
 
 # PRIMARY RULE: Invaders can only access attributes in wave.py via getters/setters
@@ -71,7 +72,22 @@ class Invaders(GameApp):
     #
     # Attribute _image: The image that shows at the end of the game
     # Invariant: _image is a GImage object
+    #
+    # Attribute _seeds: the source of the seed of every new wave
+    # Invariant: _seeds is a random.Random object seeded with the seed of
+    # _config (or with the seed of the recording being replayed)
+    #
+    # Attribute _config: the settings every wave is made with
+    # Invariant: _config is a GameConfig (the settings of the app, or those of
+    # the recording being replayed)
+    #
+    # Attribute _fed: whether the wave was updated in the last frame
+    # Invariant: _fed is a bool
 
+    # Assets loaded before start, so that the first wave and the end screens
+    # do not stall while their files are decoded
+    PRELOAD={'images':list(ALIEN_IMAGES)+[SHIP_IMAGE,'win.jpg','lose.jpg'],
+             'fonts':['RetroGame.ttf']}
 
     # THREE MAIN GAMEAPP METHODS
     def start(self):
@@ -97,6 +113,19 @@ class Invaders(GameApp):
         self._wave=None
         self._truth=False
         self._image=None
+        self._fed=False
+        # A recording is replayed with the settings it was recorded with
+        recorded=self.input.recall('config')
+        if isinstance(recorded,dict):
+            self._config=GameConfig(**recorded)
+        else:
+            self._config=self.settings or DEFAULT_CONFIG
+        # A recording needs a seed to be replayed, so pick one if there is none
+        seed=self.input.recall('seed',self._config.seed)
+        if seed is None:
+            seed=random.randrange(2**32)
+        self.input.annotate(seed=seed,config=self._config._asdict())
+        self._seeds=random.Random(seed)
 
     def update(self,dt):
         """
@@ -154,7 +183,11 @@ class Invaders(GameApp):
             if self.input.is_key_pressed('s'):
                 self._state=STATE_NEWWAVE
         if self._state==STATE_NEWWAVE:
-            self._wave=Wave()
+            if self._wave != None:
+                self._wave.hide()
+            seed=self._seeds.getrandbits(32)
+            self._wave=Wave(seed,self._config)
+            self.input.annotate(wave=seed)
         if self._truth == True:
             self._state=STATE_ACTIVE
             self._truth=False
@@ -162,16 +195,24 @@ class Invaders(GameApp):
             self._truth=True
         if self._wave != None:
             self.enforce_pause()
+        fed=False
         if self._state==STATE_ACTIVE:
+            if not self._fed:
+                self.input.annotate(feed=True)
             self._wave.update(self.input,dt)
+            fed=True
         if self._state==STATE_CONTINUE:
             self.resume_state()
         #check win conditions
-        if self._wave != None:
+        if self._state==STATE_ACTIVE:
             self.check_endgame()
         if self._state==STATE_COMPLETE:
             if self.input.is_key_pressed('s'):
                 self._state=STATE_NEWWAVE
+        # Mark where the wave stops being updated, for replay.py
+        if self._fed and not fed:
+            self.input.annotate(feed=False)
+        self._fed=fed
 
     def draw(self):
         """
@@ -186,13 +227,18 @@ class Invaders(GameApp):
         getters for these attributes or you need to add a draw method to
         class Wave.  We suggest the latter.  See the example subcontroller.py
         from class.
+
+        The wave keeps its objects on screen between frames, so it has to be
+        hidden in the states where it is not drawn.
         """
+        if self._wave != None and not self._state in (STATE_NEWWAVE,STATE_ACTIVE):
+            self._wave.hide()
         if self._state == STATE_INACTIVE:
             self._text.draw(self.view)
         if self._state == STATE_NEWWAVE:
-            self._wave.draw(self.view)
+            self._wave.draw(self.view,self.alpha)
         if self._state == STATE_ACTIVE:
-            self._wave.draw(self.view)
+            self._wave.draw(self.view,self.alpha)
         if self._state == STATE_PAUSED:
             self._text.draw(self.view)
         if self._state == STATE_COMPLETE:
@@ -205,7 +251,7 @@ class Invaders(GameApp):
         """
         Pauses the game (after death of ship) until 'r' is pressed
         """
-        if self._wave.getDead()==True:
+        if self._wave.getDead()==True and self._state==STATE_ACTIVE:
             self._state = STATE_PAUSED
             self._text=GLabel(x=(GAME_WIDTH/2),y=(GAME_HEIGHT/2),\
             text="You Died. Press 'R' to Continue",font_name="RetroGame.ttf")
@@ -213,6 +259,7 @@ class Invaders(GameApp):
             if self.input.is_key_pressed('r'):
                 self._wave.setDead(False)
                 self._wave.respawn_ship()
+                self.input.annotate(respawn=True)
                 self._state=STATE_CONTINUE
 
     def resume_state(self):
@@ -9,7 +9,7 @@ Eben Hill emh238, Kiyam Merali km942
 12/05/2023
 """
 import introcs
-import sys
+import collections
 
 ### WINDOW CONSTANTS (all coordinates are in pixels) ###
 
@@ -17,6 +17,8 @@ import sys
 GAME_WIDTH  = 800
 #: the height of the game display
 GAME_HEIGHT = 700
+#: the number of simulation ticks per second (independent of the frame rate)
+TICK_RATE   = 60
 
 
 ### SHIP CONSTANTS ###
@@ -75,6 +77,8 @@ BOLT_HEIGHT = 16
 BOLT_SPEED  = 10
 # the number of ALIEN STEPS (not frames) between bolts
 BOLT_RATE   = 2
+# the number of bolts preallocated for a wave (at most this many on screen)
+BOLT_POOL   = 64
 
 
 ### GAME CONSTANTS ###
@@ -94,35 +98,86 @@ STATE_COMPLETE = 5
 
 
 
-### USE COMMAND LINE ARGUMENTS TO CHANGE NUMBER OF ALIENS IN A ROW"""
-"""
-sys.argv is a list of the command line arguments when you run python. These arguments are
-everything after the word python. So if you start the game typing
+### RUNTIME CONFIGURATION ###
 
-    python invaders 3 4 0.5
+# The settings of a game that can change from one game to the next.  The constants
+# above are only the defaults: every wave reads its settings from a GameConfig, so
+# waves with different settings can live in the same process.  The command line
+# and the environment are read by __main__.py.
+_CONFIG_FIELDS = ('ship_width','ship_height','ship_bottom','ship_movement',
+                  'ship_lives','defense_line','alien_width','alien_height',
+                  'alien_h_sep','alien_v_sep','alien_h_walk','alien_v_walk',
+                  'alien_ceiling','alien_rows','aliens_in_row','alien_speed',
+                  'bolt_width','bolt_height','bolt_speed','bolt_rate','bolt_pool',
+                  'seed')
+
+_CONFIG_DEFAULTS = (SHIP_WIDTH,SHIP_HEIGHT,SHIP_BOTTOM,SHIP_MOVEMENT,SHIP_LIVES,
+                    DEFENSE_LINE,ALIEN_WIDTH,ALIEN_HEIGHT,ALIEN_H_SEP,ALIEN_V_SEP,
+                    ALIEN_H_WALK,ALIEN_V_WALK,ALIEN_CEILING,ALIEN_ROWS,ALIENS_IN_ROW,
+                    ALIEN_SPEED,BOLT_WIDTH,BOLT_HEIGHT,BOLT_SPEED,BOLT_RATE,BOLT_POOL,
+                    None)
+
+
+class GameConfig(collections.namedtuple('GameConfig',_CONFIG_FIELDS,
+                                        defaults=_CONFIG_DEFAULTS)):
+    """
+    An immutable value holding the settings of a game.
+
+    There is one field for each of the ship, alien and bolt constants above,
+    named after the constant in lower case (so alien_rows for ALIEN_ROWS), plus
+    the field seed.  Every field defaults to its constant, so GameConfig() is
+    the standard game and GameConfig(alien_rows=3) has three rows of aliens.
+
+    Attribute seed: the seed of the random numbers of the game
+    Invariant: seed is an int, or None for a different game every time
+
+    Attribute alien_rows: the number of rows of aliens
+    Invariant: alien_rows is an int >= 1
+
+    Attribute aliens_in_row: the number of aliens per row
+    Invariant: aliens_in_row is an int >= 1
+
+    Attribute alien_speed: the number of seconds between alien steps
+    Invariant: alien_speed is a number >= 0
+
+    Attribute bolt_rate: the most alien steps between alien bolts
+    Invariant: bolt_rate is an int >= 1
+
+    Attribute bolt_pool: the number of bolts preallocated for a wave
+    Invariant: bolt_pool is an int >= 1
+
+    Every other field is a number >= 0, in pixels (or in bolts, for bolt_pool,
+    and in alien steps, for bolt_rate).  The ranges of the command line (see
+    parse_config in __main__.py) are not enforced here, so a sweep or a test
+    may build any wave that the rules can play.
+    """
+    __slots__ = ()
+
+    def __new__(cls,*args,**keywords):
+        """
+        Returns a new configuration with the given settings
+
+        Parameter args: the settings, in field order
+        Precondition: args satisfy the invariants of the class
+
+        Parameter keywords: the settings, by field name
+        Precondition: keywords satisfy the invariants of the class
+        """
+        self=super().__new__(cls,*args,**keywords)
+        assert isinstance(self.alien_rows,int) and self.alien_rows >= 1
+        assert isinstance(self.aliens_in_row,int) and self.aliens_in_row >= 1
+        assert isinstance(self.bolt_rate,int) and self.bolt_rate >= 1
+        assert isinstance(self.bolt_pool,int) and self.bolt_pool >= 1
+        assert self.seed is None or isinstance(self.seed,int)
+        for name in _CONFIG_FIELDS[:-1]:
+            value=getattr(self,name)
+            assert isinstance(value,(int,float)) and value >= 0, \
+            '%s %s is not a valid setting' % (name,repr(value))
+        return self
+
+
+# The standard game
+DEFAULT_CONFIG = GameConfig()
 
-Python puts ['breakout.py', '3', '4', '0.5'] into sys.argv. Below, we take advantage of
-this fact to change the constants ALIEN_ROWS, ALIENS_IN_ROW, and ALIEN_SPEED.
-"""
-try:
-    rows = int(sys.argv[1])
-    if rows >= 1 and rows <= 10:
-        ALIEN_ROWS = rows
-except:
-    pass # Use original value
-
-try:
-    perrow = int(sys.argv[2])
-    if perrow >= 1 and perrow <= 15:
-        ALIENS_IN_ROW = perrow
-except:
-    pass # Use original value
-
-try:
-    speed = float(sys.argv[3])
-    if speed >= 0 and speed <= 3:
-        ALIEN_SPEED = speed
-except:
-    pass # Use original value
 
 ### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
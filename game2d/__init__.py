@@ -7,11 +7,16 @@ simpler for students in CS 1110.
 Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
-from .gobject import GObject, GScene
+from .gobject import GObject, GScene, contains_each
 from .grectangle import GRectangle, GEllipse, GImage, GLabel
 from .gsprite import GSprite
 from .gtile import GTile
 from .gpath import GPath, GTriangle, GPolygon
+from .gbatch import GBatch
+from .atlas import TextureAtlas
+from .texcache import TextureCache
+from .preload import Preloader
+from .replay import InputRecorder, ReplayInput, run_replay
 from .gview import GInput, GView
 from .sound import Sound, SoundLibrary
 from .app import GameApp
\ No newline at end of file
@@ -16,7 +16,6 @@ import kivy.app
 # Lower-level kivy modules to support animation
 from kivy.config import Config
 from kivy.clock  import Clock
-from kivy.core.window import Window
 from kivy.logger import Logger
 
 import traceback
@@ -26,6 +25,8 @@ import sys
 
 import numpy as np
 
+from .texcache import TextureCache
+
 class GameApp(kivy.app.App):
     """
     A controller class for a simple game application.
@@ -46,7 +47,13 @@ class GameApp(kivy.app.App):
     thing you should have in this method are calls to ``self.view.draw()``.
     """
     # Class attribute for tracking textures (to reduce memory footprint)
-    TEXTURE_CACHE = {}
+    TEXTURE_CACHE = TextureCache()
+    # Class attribute for the texture atlas (None until one is built)
+    TEXTURE_ATLAS = None
+    # Class attribute for the Sound objects loaded by the preloader
+    SOUND_CACHE = {}
+    # Class attribute for the assets to load before start (override in a subclass)
+    PRELOAD = None
     
     
     # MUTABLE ATTRIBUTES
@@ -71,6 +78,49 @@ class GameApp(kivy.app.App):
         self._fps = value
         Clock.schedule_interval(self._refresh,1.0/self._fps)
     
+    @property
+    def tickrate(self):
+        """
+        The number of simulation ticks per second, or None for a variable step
+        
+        If this value is None (the default), :meth:`update` is called once per
+        animation frame with the time since the last frame.  Otherwise the game
+        uses a fixed timestep: :meth:`update` is called with ``dt`` equal to
+        ``1/tickrate`` as many times as needed to catch up with the clock,
+        independent of the frame rate.  So the simulation can run at 30 ticks a
+        second while the screen is drawn at 144 frames a second.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._tickrate
+    
+    @tickrate.setter
+    def tickrate(self,value):
+        assert value is None or type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value is None or value > 0, 'value %s is not positive' % repr(value)
+        self._tickrate = value
+        self._accum = 0.0
+        self._alpha = 1.0
+    
+    @property
+    def maxticks(self):
+        """
+        The maximum number of simulation ticks to run in a single frame
+        
+        This is the catch-up cap for the fixed timestep.  If a frame takes so long
+        that more ticks are owed than this, the extra time is dropped and the game
+        slows down instead of spiraling.  It has no effect if ``tickrate`` is None.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._maxticks
+    
+    @maxticks.setter
+    def maxticks(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._maxticks = value
+    
     
     # IMMUTABLE PROPERTIES
     @property
@@ -103,6 +153,36 @@ class GameApp(kivy.app.App):
         """
         return self._view
     
+    @property
+    def alpha(self):
+        """
+        The render interpolation factor for the current frame.
+        
+        With a fixed timestep, the clock is usually part of the way between two 
+        simulation ticks when the frame is drawn.  This value is that fraction (the 
+        time left over after the last tick, divided by the tick length).  Use it in 
+        :meth:`draw` to blend the previous and current positions of moving objects.
+        It is always 1 if ``tickrate`` is None.
+        
+        **Invariant**: Must be a float in 0..1.
+        """
+        return self._alpha
+    
+    @property
+    def settings(self):
+        """
+        The settings the game was created with.
+        
+        This is the value of the keyword ``settings`` given to the constructor.  The
+        game decides what it holds (usually an immutable object with one attribute per
+        setting), so that nothing has to read the command line at import time.
+        
+        **Immutable**: This value cannot be altered.
+        
+        **Invariant**: Can be any value, or None if no settings were given.
+        """
+        return self._settings
+    
     @property
     def input(self):
         """
@@ -197,7 +277,12 @@ class GameApp(kivy.app.App):
         
         The ``name`` must refer to the file in the **Images** folder.  If the texture
         has already been loaded, it will return the cached texture.  Otherwise, it will
-        load the texture and cache it before returning it.
+        load the texture and cache it before returning it.  The cache has a memory
+        budget (see :class:`TextureCache`), so a texture that has not been used in a 
+        while may have to be loaded again.
+        
+        If the image was packed in the texture atlas (see :meth:`build_atlas`), the
+        texture returned is its region of the atlas.
         
         This method will crash if name is not a valid file.
         
@@ -205,8 +290,9 @@ class GameApp(kivy.app.App):
         :type name:  ``str``
         """
         assert cls.is_image(name), '%s is not an image file' % repr(name)
-        if name in cls.TEXTURE_CACHE:
-            return cls.TEXTURE_CACHE[name]
+        texture = cls.TEXTURE_CACHE.get(name)
+        if not texture is None:
+            return texture
         
         try:
             from kivy.core.image import Image
@@ -219,6 +305,42 @@ class GameApp(kivy.app.App):
         
         return texture
     
+    @classmethod
+    def build_atlas(cls,names=None,size=512,limit=256):
+        """
+        Returns: The texture atlas packed with the given images
+        
+        The small images are packed into one texture (see :class:`TextureAtlas`), and
+        their regions are put in the texture cache, so that :meth:`load_texture` returns
+        them from then on.  Images that are too large to pack are left alone.  The atlas
+        and its regions are pinned in the cache, and only the atlas counts against its
+        budget.
+        
+        This method needs the game window, so it cannot be called before the game
+        starts. It is called for you before :meth:`start` if the game was created with
+        the keyword ``atlas`` set to True.
+        
+        :param names: The image file names (all of the **Images** folder if None)
+        :type names:  list of ``str`` or None
+        
+        :param size: The largest width and height of the atlas
+        :type size:  ``int`` > 0
+        
+        :param limit: The largest width and height of a packed image
+        :type limit:  ``int`` > 0
+        """
+        from .atlas import TextureAtlas
+        if names is None:
+            names = sorted(name for name in os.listdir(cls.images) if cls.is_image(name)
+                           and os.path.splitext(name)[1].lower() in ('.png','.jpg','.jpeg','.gif','.bmp'))
+        atlas = TextureAtlas(names,size,limit)
+        if not atlas.texture is None:
+            cls.TEXTURE_CACHE.put('<atlas>',atlas.texture,pinned=True)
+        for name in atlas:
+            cls.TEXTURE_CACHE.put(name,atlas[name],size=0,pinned=True)
+        cls.TEXTURE_ATLAS = atlas
+        return atlas
+    
     @classmethod
     def unload_texture(cls,name):
         """
@@ -232,12 +354,7 @@ class GameApp(kivy.app.App):
         :type name:  ``str``
         """
         assert type(name) == str, '%s is not a valid texture name' % repr(name)
-        if name in cls.TEXTURE_CACHE:
-            texture = cls.TEXTURE_CACHE[name]
-            del cls.TEXTURE_CACHE[name]
-            return texture
-        
-        return None
+        return cls.TEXTURE_CACHE.pop(name)
     
     @classmethod
     def load_json(cls,name):
@@ -282,6 +399,14 @@ class GameApp(kivy.app.App):
             
             GameApp(width=400,height=400)
         
+        To use a fixed timestep, add the keyword ``tickrate`` (and optionally the
+        catch-up cap ``maxticks``). To pack the small images into a texture atlas at
+        startup, add the keyword ``atlas=True``.  To record the player input to a log
+        file, add the keyword ``record`` with the name of the file.  To play the input
+        back from such a log instead of the keyboard and mouse, add the keyword
+        ``replay`` with the name of the file (see :mod:`game2d.replay`).  To pass
+        settings to the game, add the keyword ``settings`` (see :attr:`settings`).
+        
         The game window will not show until you start the game. To start the game, use 
         the method ``run()``.
         
@@ -294,18 +419,34 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        t = keywords.pop('tickrate', None)
+        m = keywords.pop('maxticks', 5)
+        a = keywords.pop('atlas', False)
+        r = keywords.pop('record', None)
+        p = keywords.pop('replay', None)
+        c = keywords.pop('settings', None)
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
         assert type(f) in [int,float], 'fps %s is not a number' % repr(value)
         assert f > 0, 'fps %s is not positive' % repr(value)
         
+        from kivy.core.window import Window
         self._gwidth = w
         self._gheight = h
         Window.size = (self.width,self.height)
         Window.bind(on_request_close=self._exit)
         
         self._fps = f
+        self.tickrate = t
+        self.maxticks = m
+        assert type(a) == bool, 'atlas %s is not a bool' % repr(a)
+        self._atlas = a
+        assert r is None or type(r) == str, 'record %s is not a file name' % repr(r)
+        assert p is None or type(p) == str, 'replay %s is not a file name' % repr(p)
+        self._record = r
+        self._replay = p
+        self._settings = c
         
         x = keywords.pop('left', None)
         y = keywords.pop('top', None)
@@ -344,8 +485,15 @@ class GameApp(kivy.app.App):
         from .gview import GInput, GView
         self._view = GView()
         self._view.size_hint = (1,1)
-        self._input = GInput()
-        self._input._register(self._view)
+        if self._replay is None:
+            self._input = GInput()
+            self._input._register(self._view)
+        else:
+            from .replay import ReplayInput
+            self._input = ReplayInput(self._replay)
+        if not self._record is None:
+            from .replay import InputRecorder
+            self._input._recorder = InputRecorder(self._record,self._tickrate)
         return self.view
     
     def run(self):
@@ -370,6 +518,7 @@ class GameApp(kivy.app.App):
         It should **never** be overridden.
         """
         import sys
+        self._close_recording()
         kivy.app.App.stop(self)
         sys.exit(0)
     
@@ -390,7 +539,8 @@ class GameApp(kivy.app.App):
         Updates the state of the game one animation frame.
         
         This method is called 60x a second (depending on the ``fps``) to provide on-screen 
-        animation. Any code that moves objects or processes user input (keyboard or mouse)
+        animation.  If ``tickrate`` is set, it is instead called ``tickrate`` times a 
+        second with a fixed ``dt``, no matter the frame rate. Any code that moves objects or processes user input (keyboard or mouse)
         goes in this method.
         
         Think of this method as the body of the loop.  You will need to add attributes
@@ -408,6 +558,9 @@ class GameApp(kivy.app.App):
         
         Every single object that you draw will need to be an attribute of the ``GameApp``
         class.  This method should largely be a sequence of calls to ``self.view.draw()``.
+        
+        With a fixed timestep, use ``self.alpha`` to interpolate moving objects between
+        the last two simulation ticks.
         """
         pass
     
@@ -426,7 +579,38 @@ class GameApp(kivy.app.App):
         Bootstraps the clock scheduler for the game..
         
         This method is a callback-proxy for method `start`.  It handles important issues 
-        behind the scenes, particularly with setting the FPS
+        behind the scenes, particularly with setting the FPS.  If the class attribute
+        ``PRELOAD`` holds a manifest, the assets in it are loaded first (see 
+        :class:`Preloader`), and `start` is only called once they are all resident.
+        """
+        if self._atlas:
+            self.build_atlas()
+        if self.PRELOAD:
+            from .preload import Preloader
+            self._preloader = Preloader(self.PRELOAD)
+            Clock.schedule_interval(self._preload,0)
+        else:
+            self._begin()
+    
+    def _preload(self,dt):
+        """
+        Processes a single animation frame of the preload.
+        
+        The game starts once the preloader is done.
+        
+        :param dt: time in seconds since last update
+        :type dt:  ``int`` or ``float``
+        """
+        if not self._preloader.step(dt):
+            return True
+        self._preloader.report()
+        self._preloader = None
+        self._begin()
+        return False
+    
+    def _begin(self):
+        """
+        Starts the animation frames and calls `start`.
         """
         if (self.fps < 60):
             Clock.schedule_interval(self._refresh,1.0/self.fps)
@@ -445,11 +629,49 @@ class GameApp(kivy.app.App):
         :type dt:  ``int`` or ``float``
         """
         self.view.clear()
-        self.input._prestep()
-        self.update(dt)
-        self.input._poststep()
+        if self._tickrate is None:
+            if not self._replay is None and not self.input.done:
+                dt = self.input.dt
+            self.input._prestep(dt)
+            self.update(dt)
+            self.input._poststep()
+        else:
+            self._tick(dt)
         self.draw()
     
+    def _tick(self,dt):
+        """
+        Runs the fixed timestep simulation ticks owed for this frame.
+        
+        The frame time is added to an accumulator, and :meth:`update` is called once 
+        for every whole tick in it (up to ``maxticks``).  Key presses and releases last 
+        for a single tick.  The leftover fraction of a tick becomes ``alpha``.
+        
+        :param dt: time in seconds since last frame
+        :type dt:  ``int`` or ``float``
+        """
+        step = 1.0/self._tickrate
+        self._accum += dt
+        ticks = 0
+        while self._accum >= step and ticks < self._maxticks:
+            self.input._prestep(step)
+            self.update(step)
+            self.input._poststep()
+            self._accum -= step
+            ticks += 1
+        if self._accum >= step:
+            # Too far behind; drop the backlog
+            self._accum %= step
+        self._alpha = self._accum/step
+    
+    def _close_recording(self):
+        """
+        Finishes the input log, if the input is being recorded.
+        """
+        input = getattr(self,'_input',None)
+        if not input is None and not input._recorder is None:
+            input._recorder.close()
+    
     def _setpaths(self):
         """
         Sets the resource paths to the application directory.
@@ -476,6 +698,7 @@ class GameApp(kivy.app.App):
         """
         Prepare this application for shutdown
         """
+        self._close_recording()
         self.cleanup()
         return False
         
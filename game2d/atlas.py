@@ -0,0 +1,182 @@
+"""
+A module to support texture atlases.
+
+Every image loaded by :meth:`GameApp.load_texture` is normally its own GPU texture, so
+drawing a scene means switching textures over and over, and no two images can ever
+share a batch.  A texture atlas packs many small images into a single texture.  Each
+image is then a region of the atlas, which Kivy treats like any other texture.
+
+The atlas is packed once when the game starts.  The regions are put into the texture
+cache of :class:`GameApp` under the names of their images, so that :class:`GImage`,
+:class:`GSprite`, :class:`GTile` and :class:`GBatch` get them from ``load_texture``
+without any change.
+"""
+from kivy.graphics.texture import Texture
+from kivy.logger import Logger
+import os.path
+
+
+def shelf_pack(sizes,width,padding=1):
+    """
+    Packs rectangles into a strip of the given width.
+
+    The rectangles are sorted by height and placed left to right in shelves (rows),
+    starting a new shelf whenever a rectangle does not fit in the current one.  Each
+    rectangle is surrounded by ``padding`` pixels of empty space so that filtering
+    does not bleed one image into another.
+
+    :param sizes: the (width,height) of each rectangle
+    :type sizes:  list of pairs of ``int``
+
+    :param width: the width of the strip
+    :type width:  ``int`` > 0
+
+    :param padding: the empty space around each rectangle
+    :type padding:  ``int`` >= 0
+
+    :return: the (x,y) position of each rectangle (None if it is wider than the strip),
+        and the height of the strip used
+    :rtype:  ``tuple`` of a ``list`` and an ``int``
+    """
+    order = sorted(range(len(sizes)),key=lambda pos: (-sizes[pos][1],-sizes[pos][0]))
+    places = [None]*len(sizes)
+    shelf_y = 0
+    shelf_h = 0
+    cursor = 0
+    for pos in order:
+        w = sizes[pos][0]+2*padding
+        h = sizes[pos][1]+2*padding
+        if w > width:
+            continue
+        if cursor+w > width:
+            shelf_y += shelf_h
+            shelf_h = 0
+            cursor = 0
+        places[pos] = (cursor+padding,shelf_y+padding)
+        cursor += w
+        shelf_h = max(shelf_h,h)
+    return places, shelf_y+shelf_h
+
+
+class TextureAtlas(object):
+    """
+    A class representing a texture packed with many small images.
+
+    An atlas is built from a list of image file names.  Images larger than ``limit``
+    in either dimension, images in a format that cannot be copied into the atlas, and
+    images that do not fit in a ``size`` x ``size`` texture are left out (they are
+    loaded as separate textures as before).
+
+    An atlas behaves like a read-only dictionary from the names of the packed images
+    to their texture regions.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def texture(self):
+        """
+        The texture holding every packed image.
+
+        **invariant**: Value is a Kivy ``Texture``, or None if no image was packed.
+        """
+        return self._texture
+
+    @property
+    def names(self):
+        """
+        The names of the packed images, in the order given to the constructor.
+
+        **invariant**: Value is a ``tuple`` of ``str``.
+        """
+        return tuple(self._regions)
+
+    # BUILT-IN METHODS
+    def __init__(self,names,size=512,limit=256,padding=1):
+        """
+        Creates a new atlas packed with the given images.
+
+        The images are loaded from the **Images** folder.  This constructor uploads a
+        texture, so it can only be called once the game window exists.
+
+        :param names: the image file names
+        :type names:  list of ``str``
+
+        :param size: the largest width and height of the atlas texture
+        :type size:  ``int`` > 0
+
+        :param limit: the largest width and height of a packed image
+        :type limit:  ``int`` > 0
+
+        :param padding: the empty space around each packed image
+        :type padding:  ``int`` >= 0
+        """
+        from kivy.core.image import ImageLoader
+        from .app import GameApp
+        assert type(size) == int and size > 0, '%s is not a valid size' % repr(size)
+        assert type(limit) == int and limit > 0, '%s is not a valid limit' % repr(limit)
+        assert type(padding) == int and padding >= 0, '%s is not a valid padding' % repr(padding)
+
+        images = []
+        for name in names:
+            assert GameApp.is_image(name), '%s is not an image file' % repr(name)
+            try:
+                loader = ImageLoader.load(os.path.join(GameApp.images,name),keep_data=True)
+                data = loader._data[0]
+            except:
+                Logger.warning('TextureAtlas: could not read %s' % repr(name))
+                continue
+            if data.width > limit or data.height > limit:
+                continue
+            if not data.fmt in ('rgba','bgra','rgb','bgr'):
+                continue
+            images.append((name,data))
+
+        places = shelf_pack([(data.width,data.height) for name, data in images],
+                            size,padding)[0]
+        packed = [(name,data,place) for (name,data), place in zip(images,places)
+                  if not place is None and place[1]+data.height+padding <= size]
+
+        self._regions = {}
+        self._texture = None
+        if not packed:
+            return
+
+        height = 1
+        while height < max(place[1]+data.height+padding for name, data, place in packed):
+            height *= 2
+        self._texture = Texture.create(size=(size,height),colorfmt='rgba')
+        self._texture.blit_buffer(bytes(size*height*4),colorfmt='rgba',bufferfmt='ubyte')
+        for name, data, place in packed:
+            self._texture.blit_buffer(data.data,size=(data.width,data.height),pos=place,
+                                      colorfmt=data.fmt,bufferfmt='ubyte',
+                                      rowlength=data.rowlength)
+            region = self._texture.get_region(place[0],place[1],data.width,data.height)
+            if data.flip_vertical:
+                region.flip_vertical()
+            self._regions[name] = region
+        Logger.info('TextureAtlas: packed %d images into %dx%d' %
+                    (len(packed),size,height))
+
+    def __contains__(self,name):
+        """
+        Returns True if the image ``name`` is packed in this atlas
+        """
+        return name in self._regions
+
+    def __getitem__(self,name):
+        """
+        Returns the texture region of the image ``name``
+        """
+        return self._regions[name]
+
+    def __iter__(self):
+        """
+        Returns an iterator over the names of the packed images
+        """
+        return iter(self._regions)
+
+    def __len__(self):
+        """
+        Returns the number of packed images
+        """
+        return len(self._regions)
@@ -0,0 +1,245 @@
+"""
+A module to support batched drawing of many identical quads.
+
+Every GObject carries its own matrix push, transforms, color and shape, so drawing a
+large number of copies of the same image means a large number of Kivy instructions.
+A batch draws all of its quads with a single Mesh instead.  The quads share a size,
+a color and a texture, and they cannot be rotated or scaled individually.  Only their
+centers change from frame to frame.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import to_rgba
+from .app import GameApp
+
+
+class GBatch(object):
+    """
+    A class representing a batch of same-size, same-texture quads.
+
+    The quads are positioned with :meth:`place`, which takes the coordinates of their
+    centers.  Only the quads that were placed are drawn, and a batch may draw anything
+    from 0 up to ``capacity`` quads.  Placing quads only rewrites the vertices of the
+    mesh, so it is cheap to do every frame.
+
+    Like :class:`GObject`, a batch can be drawn with :meth:`draw` every frame or kept in
+    the retained scene of the view with :meth:`attach` and :meth:`detach`.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The maximum number of quads in this batch.
+
+        **invariant**: Value is an ``int`` > 0.
+        """
+        return self._capacity
+
+    @property
+    def size(self):
+        """
+        The number of quads currently drawn.
+
+        **invariant**: Value is an ``int`` between 0 and ``capacity``.
+        """
+        return self._size
+
+    @property
+    def width(self):
+        """
+        The width of each quad.
+
+        **invariant**: Value is an ``int`` or ``float`` > 0.
+        """
+        return self._width
+
+    @property
+    def height(self):
+        """
+        The height of each quad.
+
+        **invariant**: Value is an ``int`` or ``float`` > 0.
+        """
+        return self._height
+
+    @property
+    def source(self):
+        """
+        The source file of the texture shared by the quads.
+
+        If this value is None, the quads are solid rectangles in the fill color.
+
+        **invariant**: Value is None or a string refering to a valid file.
+        """
+        return self._source
+
+    # MUTABLE PROPERTIES
+    @property
+    def fillcolor(self):
+        """
+        The color of the quads.
+
+        The texture (if any) is tinted by this color, so white shows the image as is.
+        It may be assigned any value accepted by the ``fillcolor`` of :class:`GObject`.
+
+        **invariant**: Value is a 4-element list of floats between 0 and 1.
+        """
+        return self._color.rgba
+
+    @fillcolor.setter
+    def fillcolor(self,value):
+        assert not value is None, 'a batch must have a fill color'
+        self._color.rgba = to_rgba(value)
+
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty batch
+
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes. For example, to make a
+        batch of up to 60 aliens, use the constructor call::
+
+            GBatch(width=33,height=33,capacity=60,source='alien1.png')
+
+        The keywords ``width`` and ``height`` are required.  The keyword ``capacity``
+        defaults to 64, ``source`` to None and ``fillcolor`` to white.
+
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        if not 'width' in keywords:
+            raise ValueError("The 'width' argument must be specified.")
+        if not 'height' in keywords:
+            raise ValueError("The 'height' argument must be specified.")
+        width  = keywords['width']
+        height = keywords['height']
+        capacity = keywords['capacity'] if 'capacity' in keywords else 64
+        source = keywords['source'] if 'source' in keywords else None
+        assert type(width) in [int,float] and width > 0, '%s is not a valid width' % repr(width)
+        assert type(height) in [int,float] and height > 0, '%s is not a valid height' % repr(height)
+        assert type(capacity) == int and capacity > 0, '%s is not a valid capacity' % repr(capacity)
+        # Mesh indices are unsigned shorts
+        assert 4*capacity <= 65536, '%s is too large a capacity' % repr(capacity)
+        assert source is None or GameApp.is_image(source), '%s is not an image file' % repr(source)
+
+        self._width  = width
+        self._height = height
+        self._capacity = capacity
+        self._source = source
+        self._size = 0
+
+        self._texture = None if source is None else GameApp.load_texture(source)
+        if self._texture is None:
+            self._uvs = (0,0,1,0,1,1,0,1)
+        else:
+            self._uvs = tuple(self._texture.tex_coords)
+        self._indices = []
+        for pos in range(0,4*capacity,4):
+            self._indices.extend((pos,pos+1,pos+2,pos+2,pos+3,pos))
+
+        self._color = Color(1,1,1,1)
+        self.fillcolor = keywords['fillcolor'] if 'fillcolor' in keywords else 'white'
+        self._mesh  = Mesh(vertices=[], indices=[], mode='triangles', texture=self._texture)
+        self._cache = InstructionGroup()
+        self._cache.add(self._color)
+        self._cache.add(self._mesh)
+
+    def __len__(self):
+        """
+        Returns the number of quads currently drawn
+        """
+        return self._size
+
+    def __repr__(self):
+        """
+        Returns an unambiguous representation of this batch
+        """
+        return '<%s of %d/%d quads>' % (self.__class__.__name__,self._size,self._capacity)
+
+    # PUBLIC METHODS
+    def place(self,xs,ys):
+        """
+        Positions the quads at the given centers
+
+        Quad i is centered at (xs[i],ys[i]).  The number of quads drawn becomes the
+        length of the sequences; any quads left over from a previous call disappear.
+
+        :param xs: the x-coordinates of the centers
+        :type xs:  sequence of numbers
+
+        :param ys: the y-coordinates of the centers
+        :type ys:  sequence of numbers, the same length as xs
+        """
+        size = len(xs)
+        assert size == len(ys), 'the coordinate sequences have different lengths'
+        assert size <= self._capacity, '%d quads exceed the capacity %d' % (size,self._capacity)
+
+        hw = self._width/2.0
+        hh = self._height/2.0
+        u0, v0, u1, v1, u2, v2, u3, v3 = self._uvs
+        vert = []
+        for x, y in zip(xs,ys):
+            vert.extend((x-hw,y-hh,u0,v0, x+hw,y-hh,u1,v1,
+                         x+hw,y+hh,u2,v2, x-hw,y+hh,u3,v3))
+        self._mesh.vertices = vert
+        if size != self._size:
+            self._mesh.indices = self._indices[:6*size]
+            self._size = size
+
+    def clear(self):
+        """
+        Removes every quad from the batch
+        """
+        self.place((),())
+
+    def reserve(self,capacity):
+        """
+        Makes room for at least ``capacity`` quads
+
+        Nothing happens if the batch is already large enough.  The quads already
+        placed are kept.
+
+        :param capacity: the number of quads to make room for
+        :type capacity:  ``int`` > 0
+        """
+        assert type(capacity) == int and capacity > 0, '%s is not a valid capacity' % repr(capacity)
+        assert 4*capacity <= 65536, '%s is too large a capacity' % repr(capacity)
+        if capacity <= self._capacity:
+            return
+        for pos in range(4*self._capacity,4*capacity,4):
+            self._indices.extend((pos,pos+1,pos+2,pos+2,pos+3,pos))
+        self._capacity = capacity
+
+    def draw(self, view):
+        """
+        Draws this batch in the provide view.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        view.draw(self._cache)
+
+    def attach(self, view):
+        """
+        Adds this batch to the retained scene of the provided view.
+
+        The batch stays on screen (following any call to :meth:`place`) until it is
+        removed with :meth:`detach`.
+
+        :param view: view to add this batch to
+        :type view:  :class:`GView`
+        """
+        view.add(self._cache)
+
+    def detach(self, view):
+        """
+        Removes this batch from the retained scene of the provided view.
+
+        Nothing happens if the batch is not attached to the view.
+
+        :param view: view to remove this batch from
+        :type view:  :class:`GView`
+        """
+        view.remove(self._cache)
@@ -11,7 +11,9 @@ Date:   August 1, 2017 (Python 3 version)
 from kivy.graphics import *
 from kivy.graphics.instructions import *
 from introcs.geom import Point2, Matrix
+import numpy as np
 import introcs
+import math
 
 def is_color(c):
     """
@@ -77,8 +79,88 @@ def is_gobject_list(g):
         return False
 
 
+def contains_each(objects,x,y):
+    """
+    Checks which of many shapes contain the point (x,y)
+
+    This is the counterpart of :meth:`GObject.contains_many` for one point and many
+    shapes.  The shapes that are tested by an unrotated, unscaled bounding box are
+    tested all at once; the others are tested one at a time with
+    :meth:`GObject.contains_xy`.  It is unchecked.
+
+    :return: whether each shape contains the point
+    :rtype:  numpy array of ``bool``
+
+    :param objects: the shapes to test
+    :type objects:  sequence of :class:`GObject`
+
+    :param x: the x-coordinate of the point
+    :type x:  ``int`` or ``float``
+
+    :param y: the y-coordinate of the point
+    :type y:  ``int`` or ``float``
+    """
+    size = len(objects)
+    geometry = np.empty((4,size))
+    plain = np.ones(size,dtype=bool)
+    for pos, obj in enumerate(objects):
+        geometry[0,pos] = obj._x
+        geometry[1,pos] = obj._y
+        geometry[2,pos] = obj.width
+        geometry[3,pos] = obj.height
+        plain[pos] = (obj._angle == 0.0 and obj._sx == 1.0 and obj._sy == 1.0 and
+                      type(obj).contains_xy == GObject.contains_xy)
+    result = (np.abs(x-geometry[0]) < geometry[2]/2.0) & (np.abs(y-geometry[1]) < geometry[3]/2.0)
+    for pos in np.flatnonzero(~plain):
+        result[pos] = objects[pos].contains_xy(x,y)
+    return result
+
+
 # #mark -
 
+# Colors already converted from a name, so that each name is only looked up once
+_COLORS = {}
+
+def to_rgba(value):
+    """
+    Converts a color value to a 4-element list of floats.
+
+    Tuples and lists of numbers are handled directly.  Color names are converted with
+    ``introcs`` the first time they are seen, and cached after that.  Any other value
+    must satisfy :func:`is_color`.
+
+    :return: the color as a 4-element list of floats between 0 and 1, or None
+    :rtype:  ``list`` or ``None``
+
+    :param value: The color to convert
+    :type value:  ``None`` or any value satisfying :func:`is_color`
+    """
+    if value is None:
+        return None
+    kind = type(value)
+    if kind in (tuple, list) and 3 <= len(value) <= 4:
+        for c in value:
+            assert type(c) in (int, float) and 0 <= c <= 1, '%s is not a valid color' % repr(value)
+        rgba = [float(c) for c in value]
+        if len(rgba) == 3:
+            rgba.append(1.0)
+        return rgba
+    if kind == str and value in _COLORS:
+        return list(_COLORS[value])
+
+    import introcs
+    assert is_color(value), '%s is not a valid color' % repr(value)
+    if kind == str:
+        if value[0] == '#':
+            rgba = introcs.RGB.CreateWebColor(value).glColor()
+        else:
+            rgba = introcs.RGB.CreateName(value).glColor()
+        _COLORS[value] = tuple(rgba)
+    else:
+        rgba = value.glColor()
+    return list(rgba)
+
+
 class GObject(object):
     """
     An class representing a basic graphics object.
@@ -89,7 +171,15 @@ class GObject(object):
     You should never make a `GObject` directly.  Instead, you should use one of the
     subclasses: :class:`GRectangle`, :class:`GEllipse`, :class:`GImage`, :class:`GLabel`,
     :class:`GTriangle`, :class:`GPolygon`, or :class:`GPath`.
+
+    The geometry and colors of an object are stored as plain numbers.  The Kivy
+    instructions that draw it are only built the first time it is drawn (or attached
+    to a view), so an object that is never drawn never allocates them.  The class and
+    its subclasses use ``__slots__``, so they have no instance dictionary either.
     """
+    __slots__ = ('_x','_y','_width','_height','_angle','_sx','_sy','_set_width',
+                 '_set_height','_fillcolor','_linecolor','_name','_defined','_mtrue',
+                 '_matrix','_invrse','_cache','_trans','_rotate','_scale','_parent')
 
     # MUTABLE PROPERTIES
     @property
@@ -99,13 +189,17 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``
         """
-        return self._trans.x
+        return self._x
 
     @x.setter
     def x(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
-        self._trans.x = float(value)
+        self._x = float(value)
         self._mtrue = False
+        if not self._trans is None:
+            self._trans.x = self._x
+        if not self._parent is None:
+            self._parent._invalidate()
 
     @property
     def y(self):
@@ -114,13 +208,17 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``
         """
-        return self._trans.y
+        return self._y
 
     @y.setter
     def y(self,value):
         assert type(value) in [int,float], '%s is not a number' % repr(value)
-        self._trans.y = float(value)
+        self._y = float(value)
         self._mtrue = False
+        if not self._trans is None:
+            self._trans.y = self._y
+        if not self._parent is None:
+            self._parent._invalidate()
 
     @property
     def width(self):
@@ -139,6 +237,7 @@ class GObject(object):
         assert value > 0, '%s is not positive' % repr(value)
         self._width = float(value)
         self._set_width = True
+        self._invalidate()
         if self._defined:
             self._reset()
 
@@ -159,6 +258,7 @@ class GObject(object):
         assert value > 0, '%s is not positive' % repr(value)
         self._height = float(value)
         self._set_height = True
+        self._invalidate()
         if self._defined:
             self._reset()
 
@@ -177,7 +277,7 @@ class GObject(object):
 
         **invariant**: Value must be either a number (``int`` or ``float``) or a pair of numbers.
         """
-        return (self._scale.x,self._scale.y)
+        return (self._sx,self._sy)
 
     @scale.setter
     def scale(self,value):
@@ -185,12 +285,17 @@ class GObject(object):
         assert type(value) in [int,float] or is_num_tuple(value,2), \
                 '%s is not a valid scaling factor' % repr(value)
         if type(value) in [int,float]:
-            self._scale.x = float(value)
-            self._scale.y = float(value)
+            self._sx = float(value)
+            self._sy = float(value)
         else:
-            self._scale.x = float(value[0])
-            self._scale.y = float(value[1])
+            self._sx = float(value[0])
+            self._sy = float(value[1])
         self._mtrue = False
+        if not self._scale is None:
+            self._scale.x = self._sx
+            self._scale.y = self._sy
+        if not self._parent is None:
+            self._parent._invalidate()
 
     @property
     def angle(self):
@@ -201,16 +306,19 @@ class GObject(object):
 
         **invariant**: Value must be an ``int`` or ``float``
         """
-        return self._rotate.angle
+        return self._angle
 
     @angle.setter
     def angle(self,value):
-        import numpy as np
         assert type(value) in [int,float], '%s is not a number' % repr(value)
-        diff = np.allclose([self._rotate.angle],[value])
-        self._rotate.angle = float(value)
-        if not diff:
+        # Same tolerance as numpy.allclose
+        if abs(self._angle-value) > 1e-8+1e-5*abs(value):
             self._mtrue = False
+            if not self._parent is None:
+                self._parent._invalidate()
+        self._angle = float(value)
+        if not self._rotate is None:
+            self._rotate.angle = self._angle
 
     @property
     def linecolor(self):
@@ -229,23 +337,11 @@ class GObject(object):
 
         **invariant**: Value must be ``None`` or a 4-element list of floats between 0 and 1.
         """
-        return None if self._linecolor is None else self._linecolor.rgba
+        return None if self._linecolor is None else list(self._linecolor)
 
     @linecolor.setter
     def linecolor(self,value):
-        import introcs
-        assert value is None or is_color(value), '%s is not a valid color' % repr(value)
-        if type(value) in [tuple, list] and len(value) == 3:
-            value = list(value)+[1.0]
-        elif type(value) in [introcs.RGB, introcs.HSV]:
-            value = value.glColor()
-        elif type(value) == str:
-            if value[0] == '#':
-                value = introcs.RGB.CreateWebColor(value).glColor()
-            else:
-                value = introcs.RGB.CreateName(value).glColor()
-
-        self._linecolor = None if value is None else Color(value[0],value[1],value[2],value[3])
+        self._linecolor = to_rgba(value)
         if self._defined:
             self._reset()
 
@@ -267,23 +363,11 @@ class GObject(object):
 
         **invariant**: Value must be ``None`` or a 4-element list of floats between 0 and 1.
         """
-        return None if self._fillcolor is None else self._fillcolor.rgba
+        return None if self._fillcolor is None else list(self._fillcolor)
 
     @fillcolor.setter
     def fillcolor(self,value):
-        import introcs
-        assert value is None or is_color(value), '%s is not a valid color' % repr(value)
-        if type(value) in [tuple, list] and len(value) == 3:
-            value = list(value)+[1.0]
-        elif type(value) in [introcs.RGB, introcs.HSV]:
-            value = value.glColor()
-        elif type(value) == str:
-            if value[0] == '#':
-                value = introcs.RGB.CreateWebColor(value).glColor()
-            else:
-                value = introcs.RGB.CreateName(value).glColor()
-
-        self._fillcolor = None if value is None else Color(value[0],value[1],value[2],value[3])
+        self._fillcolor = to_rgba(value)
         if self._defined:
             self._reset()
 
@@ -322,14 +406,14 @@ class GObject(object):
         **invariant**: Value must be an ``int`` or ``float``.
         """
         # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) == 0.0:
-            return self.x-self._scale.x*self.width/2.0
-        elif (self._rotate.angle % 360) == 180:
-            return self.x-self._scale.x*self.width/2.0
-        elif (self._rotate.angle % 360) == 90.0:
-            return self.x-self._scale.y*self.height/2.0
-        elif (self._rotate.angle % 360) == 270:
-            return self.x-self._scale.y*self.height/2.0
+        if (self._angle % 360) == 0.0:
+            return self.x-self._sx*self.width/2.0
+        elif (self._angle % 360) == 180:
+            return self.x-self._sx*self.width/2.0
+        elif (self._angle % 360) == 90.0:
+            return self.x-self._sy*self.height/2.0
+        elif (self._angle % 360) == 270:
+            return self.x-self._sy*self.height/2.0
         
         p0 = tuple(self.matrix._transform(-self.width/2.0, -self.height/2.0))[0]
         p1 = tuple(self.matrix._transform( self.width/2.0, -self.height/2.0))[0]
@@ -359,14 +443,14 @@ class GObject(object):
         **invariant**: Value must be an ``int`` or ``float``.
         """
         # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) == 0.0:
-            return self.x+self._scale.x*self.width/2.0
-        elif (self._rotate.angle % 360) == 180:
-            return self.x+self._scale.x*self.width/2.0
-        elif (self._rotate.angle % 360) == 90.0:
-            return self.x+self._scale.y*self.height/2.0
-        elif (self._rotate.angle % 360) == 270:
-            return self.x+self._scale.y*self.height/2.0
+        if (self._angle % 360) == 0.0:
+            return self.x+self._sx*self.width/2.0
+        elif (self._angle % 360) == 180:
+            return self.x+self._sx*self.width/2.0
+        elif (self._angle % 360) == 90.0:
+            return self.x+self._sy*self.height/2.0
+        elif (self._angle % 360) == 270:
+            return self.x+self._sy*self.height/2.0
         
         p0 = tuple(self.matrix._transform(-self.width/2.0, -self.height/2.0))[0]
         p1 = tuple(self.matrix._transform( self.width/2.0, -self.height/2.0))[0]
@@ -396,14 +480,14 @@ class GObject(object):
         **invariant**: Value must be an ``int`` or ``float``.
         """
         # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) == 0.0:
-            return self.y+self._scale.y*self.height/2.0
-        elif (self._rotate.angle % 360) == 180:
-            return self.y+self._scale.y*self.height/2.0
-        elif (self._rotate.angle % 360) == 90.0:
-            return self.y+self._scale.x*self.width/2.0
-        elif (self._rotate.angle % 360) == 270:
-            return self.y+self._scale.x*self.width/2.0
+        if (self._angle % 360) == 0.0:
+            return self.y+self._sy*self.height/2.0
+        elif (self._angle % 360) == 180:
+            return self.y+self._sy*self.height/2.0
+        elif (self._angle % 360) == 90.0:
+            return self.y+self._sx*self.width/2.0
+        elif (self._angle % 360) == 270:
+            return self.y+self._sx*self.width/2.0
         
         p0 = tuple(self.matrix._transform(-self.width/2.0, -self.height/2.0))[1]
         p1 = tuple(self.matrix._transform( self.width/2.0, -self.height/2.0))[1]
@@ -433,14 +517,14 @@ class GObject(object):
         **invariant**: Value must be an ``int`` or ``float``.
         """
         # Optimize for 90 degree turns
-        if (self._rotate.angle % 360) == 0.0:
-            return self.y-self._scale.y*self.height/2.0
-        elif (self._rotate.angle % 360) == 180:
-            return self.y-self._scale.y*self.height/2.0
-        elif (self._rotate.angle % 360) == 90.0:
-            return self.y-self._scale.x*self.width/2.0
-        elif (self._rotate.angle % 360) == 270:
-            return self.y-self._scale.x*self.width/2.0
+        if (self._angle % 360) == 0.0:
+            return self.y-self._sy*self.height/2.0
+        elif (self._angle % 360) == 180:
+            return self.y-self._sy*self.height/2.0
+        elif (self._angle % 360) == 90.0:
+            return self.y-self._sx*self.width/2.0
+        elif (self._angle % 360) == 270:
+            return self.y-self._sx*self.width/2.0
         
         p0 = tuple(self.matrix._transform(-self.width/2.0, -self.height/2.0))[1]
         p1 = tuple(self.matrix._transform( self.width/2.0, -self.height/2.0))[1]
@@ -509,11 +593,21 @@ class GObject(object):
         # Set the properties.
         self._defined = False
 
-        # Create the Kivy transforms for position and size
-        self._trans  = Translate(0,0,0)
-        self._rotate = Rotate(angle=0,axis=(0,0,1))
-        #self._scale  = Scale(1,1,1)
-        self._scale  = Scale(1,1,1)
+        # The scene (if any) that contains this object
+        self._parent = None
+
+        # The Kivy instructions are built on the first draw
+        self._cache  = None
+        self._trans  = None
+        self._rotate = None
+        self._scale  = None
+        self._matrix = None
+        self._mtrue  = False
+        self._x = 0.0
+        self._y = 0.0
+        self._angle = 0.0
+        self._sx = 1.0
+        self._sy = 1.0
 
         # Now update these with the keywords; size first
         if 'width' in keywords:
@@ -548,8 +642,8 @@ class GObject(object):
             self.top = keywords['top']
         
         # Top it off with color
-        self.fillcolor = keywords['fillcolor'] if 'fillcolor' in keywords else [1,1,1,1]
-        self.linecolor = keywords['linecolor'] if 'linecolor' in keywords else [1,1,1,1]
+        self._fillcolor = to_rgba(keywords['fillcolor']) if 'fillcolor' in keywords else [1.0,1.0,1.0,1.0]
+        self._linecolor = to_rgba(keywords['linecolor']) if 'linecolor' in keywords else [1.0,1.0,1.0,1.0]
         
         # Add a name for debugging
         self.name = keywords['name'] if 'name' in keywords else None
@@ -579,9 +673,8 @@ class GObject(object):
         """
         Checks whether this shape contains the point
 
-        By default, this method just checks the bounding box of the shape.
-
-        **Warning**: Using this method on a rotated object may slow down your framerate.
+        By default, this method just checks the bounding box of the shape.  It checks
+        its argument and then calls :meth:`contains_xy`.
 
         :param point: the point to check
         :type point: :class:`Point2` or a pair of numbers
@@ -589,16 +682,62 @@ class GObject(object):
         :return: True if the shape contains this point
         :rtype:  ``bool``
         """
-        import numpy as np
         if isinstance(point,Point2):
-            point = (point.x,point.y)
+            return self.contains_xy(point.x,point.y)
         assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
+        return self.contains_xy(point[0],point[1])
+
+    def contains_xy(self,x,y):
+        """
+        Checks whether this shape contains the point (x,y)
+
+        This is the unchecked version of :meth:`contains`, for inner loops such as
+        collision detection.  It does not allocate anything.  A rotated or scaled
+        shape takes a little longer, as the point is first moved into the coordinates
+        of the shape.  Subclasses that are not tested by their bounding box override
+        this method along with :meth:`contains`.
+
+        :param x: the x-coordinate of the point
+        :type x:  ``int`` or ``float``
+
+        :param y: the y-coordinate of the point
+        :type y:  ``int`` or ``float``
+
+        :return: True if the shape contains this point
+        :rtype:  ``bool``
+        """
+        x -= self._x
+        y -= self._y
+        if self._angle != 0.0 or self._sx != 1.0 or self._sy != 1.0:
+            x, y = self._untransform(x,y)
+        return abs(x) < self.width/2.0 and abs(y) < self.height/2.0
 
-        if self._rotate.angle != 0.0 or self._scale.x != 1.0 or self._scale.y != 1.0:
-            point = tuple(self.matrix.inverse()._transform(point[0],point[1]))
-            return abs(point[0]) < self.width/2.0 and abs(point[1]) < self.height/2.0
+    def contains_many(self,xs,ys):
+        """
+        Checks which of many points this shape contains
 
-        return abs(point[0]-self.x) < self.width/2.0 and abs(point[1]-self.y) < self.height/2.0
+        This is the vectorized version of :meth:`contains_xy`.  It is unchecked, and
+        the coordinate sequences must have the same length.
+
+        :param xs: the x-coordinates of the points
+        :type xs:  sequence or numpy array of numbers
+
+        :param ys: the y-coordinates of the points
+        :type ys:  sequence or numpy array of numbers
+
+        :return: whether the shape contains each point
+        :rtype:  numpy array of ``bool``
+        """
+        if type(self).contains_xy != GObject.contains_xy:
+            return np.array([self.contains_xy(x,y) for x, y in zip(xs,ys)],dtype=bool)
+        xs = np.asarray(xs,dtype=float)-self._x
+        ys = np.asarray(ys,dtype=float)-self._y
+        if self._angle != 0.0 or self._sx != 1.0 or self._sy != 1.0:
+            radians = math.radians(self._angle)
+            cos = math.cos(radians)
+            sin = math.sin(radians)
+            xs, ys = (cos*xs+sin*ys)/self._sx, (cos*ys-sin*xs)/self._sy
+        return (np.abs(xs) < self.width/2.0) & (np.abs(ys) < self.height/2.0)
 
     def transform(self,point):
         """
@@ -619,7 +758,7 @@ class GObject(object):
             return self.inverse.transform(point)
         else:
             assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
-            p = self.inverse._transform(point[0],point[2])
+            p = self.inverse._transform(point[0],point[1])
             return Point2(p[0],p[1])
 
     def draw(self, view):
@@ -632,33 +771,117 @@ class GObject(object):
         :type view:  :class:`GView`
         """
         try:
-            view.draw(self._cache)
+            view.draw(self._instructions())
         except:
             raise IOError('Cannot draw %s since it was not initialized properly' % repr(self))
 
+    def attach(self, view):
+        """
+        Adds this shape to the retained scene of the provided view.
+
+        Unlike :meth:`draw`, this only has to be done once.  The shape stays on screen
+        (following any changes to its attributes) until it is removed with :meth:`detach`.
+
+        :param view: view to add this shape to
+        :type view:  :class:`GView`
+        """
+        try:
+            view.add(self._instructions())
+        except:
+            raise IOError('Cannot attach %s since it was not initialized properly' % repr(self))
+
+    def detach(self, view):
+        """
+        Removes this shape from the retained scene of the provided view.
+
+        Nothing happens if the shape is not attached to the view.
+
+        :param view: view to remove this shape from
+        :type view:  :class:`GView`
+        """
+        if not self._cache is None:
+            view.remove(self._cache)
+
     # HIDDEN METHODS
+    def _untransform(self,dx,dy):
+        """
+        Returns: the offset (dx,dy) from the center in the coordinates of this shape
+
+        The rotation and the scale of the shape are undone, so the result can be tested
+        against the unrotated, unscaled shape centered at the origin.  This is the slow
+        path of :meth:`contains_xy` and its overrides.
+
+        :param dx: the horizontal offset from the center
+        :type dx:  ``float``
+
+        :param dy: the vertical offset from the center
+        :type dy:  ``float``
+
+        :rtype:  pair of ``float``
+        """
+        radians = math.radians(self._angle)
+        cos = math.cos(radians)
+        sin = math.sin(radians)
+        return (cos*dx+sin*dy)/self._sx, (cos*dy-sin*dx)/self._sy
+
+    def _invalidate(self):
+        """
+        Tells the scene containing this object (if any) that its geometry changed.
+
+        This must be called whenever the position or the size of the object changes,
+        so that the scene can recompute its bounds.
+        """
+        if not self._parent is None:
+            self._parent._invalidate()
+
+    def _instructions(self):
+        """
+        Returns the drawing cache, building it if this is the first time it is needed.
+        """
+        if self._cache is None:
+            self._trans  = Translate(self._x,self._y,0)
+            self._rotate = Rotate(angle=self._angle,axis=(0,0,1))
+            self._scale  = Scale(self._sx,self._sy,1)
+            self._cache  = InstructionGroup()
+            self._reset()
+        return self._cache
+
     def _reset(self):
         """
         Resets the drawing cache.
+
+        Nothing happens (and this returns False) if the cache has not been built yet.
+        Otherwise the cache group is emptied and refilled with the transforms, and this
+        returns True so that the subclass can add its own instructions.  The group is
+        refilled rather than replaced, so that a shape attached to a view (or a scene)
+        stays attached when its cache is rebuilt.
         """
-        self._cache = InstructionGroup()
+        if self._cache is None:
+            return False
+        self._cache.clear()
+        self._trans.x = self._x
+        self._trans.y = self._y
+        self._rotate.angle = self._angle
+        self._scale.x = self._sx
+        self._scale.y = self._sy
         self._cache.add(PushMatrix())
         self._cache.add(self._trans)
         self._cache.add(self._rotate)
         self._cache.add(self._scale)
+        return True
     
     def _build_matrix(self):
         """
         Builds the transform matrices after a settings change.
         """
         self._matrix = Matrix()
-        self._matrix.scale(self._scale.x,self._scale.y)
-        self._matrix.rotate(self._rotate.angle)
-        self._matrix.translate(self._trans.x,self._trans.y)
+        self._matrix.scale(self._sx,self._sy)
+        self._matrix.rotate(self._angle)
+        self._matrix.translate(self._x,self._y)
         self._invrse = Matrix()
-        self._invrse.translate(-self._trans.x,-self._trans.y)
-        self._invrse.rotate(-self._rotate.angle)
-        self._invrse.scale(1.0/self._scale.x,1.0/self._scale.y)
+        self._invrse.translate(-self._x,-self._y)
+        self._invrse.rotate(-self._angle)
+        self._invrse.scale(1.0/self._sx,1.0/self._sy)
         self._mtrue = True
 
 
@@ -677,9 +900,24 @@ class GScene(GObject):
 
     The attributes ``width`` and ``height`` are present in this object, but they are now
     read-only.  These values are computed from the list of objects stored in the scene.
+    They are cached, and only recomputed after a child moves or changes size, or after
+    a child is added or removed.  Moving the scene itself does not change them.
+
+    Children may be added and removed one at a time with :meth:`add` and :meth:`remove`.
+    This is much cheaper than assigning to ``children``, which rebuilds the drawing cache
+    of the whole scene.
+
+    A scene with at least ``INDEX_THRESHOLD`` children keeps a uniform grid over their
+    bounding boxes, so that :meth:`select` only tests the children near the point.  The
+    grid is built on the first selection, and thrown away (with the cached bounds)
+    whenever a child moves, changes size, or is scaled or rotated.
 
     All objects stored in a ``GScene`` are drawn as if the point (x,y) is the origin.
     """
+    __slots__ = ('_children','_bounds','_grid','_pop')
+
+    # The number of children at which select uses a grid instead of a linear search
+    INDEX_THRESHOLD = 16
 
     # MUTABLE PROPERTIES
     @property
@@ -697,7 +935,12 @@ class GScene(GObject):
     @children.setter
     def children(self,value):
         assert is_gobject_list(value), '%s is not a list of valid objects' % repr(value)
+        for x in self._children:
+            x._parent = None
         self._children = list(value)
+        for x in self._children:
+            x._parent = self
+        self._invalidate()
         if self._defined:
             self._reset()
 
@@ -713,12 +956,9 @@ class GScene(GObject):
 
         **invariant**: Value must be an ``int`` or ``float`` > 0
         """
-        max = 0
-        for x in self.children:
-            w = x.x+x.width/2.0
-            if w > max:
-                max = w
-        return max*2
+        if self._bounds is None:
+            self._compute_bounds()
+        return self._bounds[0]
 
     @property
     def height(self):
@@ -730,12 +970,9 @@ class GScene(GObject):
 
         **invariant**: Value must be an ``int`` or ``float`` > 0
         """
-        max = 0
-        for x in self.children:
-            h = x.y+x.height/2.0
-            if h > max:
-                max = h
-        return max*2
+        if self._bounds is None:
+            self._compute_bounds()
+        return self._bounds[1]
 
 
     # BUILT-IN METHODS
@@ -756,6 +993,11 @@ class GScene(GObject):
         :type keywords:  keys are attribute names
         """
         self._defined = False
+        self._parent = None
+        self._bounds = None
+        self._grid = None
+        self._pop = PopMatrix()
+        self._children = []
         self.children = keywords['children'] if 'children' in keywords else []
         GObject.__init__(self,**keywords)
         self._reset()
@@ -763,14 +1005,55 @@ class GScene(GObject):
 
 
     # PUBLIC METHODS
+    def add(self,child):
+        """
+        Adds a child to the end of this scene, so that it is drawn on top.
+
+        Only the drawing instructions of the new child are added to the drawing cache.
+        The rest of the scene is left alone.
+
+        :param child: the object to add
+        :type child:  :class:`GObject` not in any scene
+        """
+        assert isinstance(child,GObject), '%s is not a valid object' % repr(child)
+        assert child._parent is None, '%s is already in a scene' % repr(child)
+        self._children.append(child)
+        child._parent = self
+        self._invalidate()
+        if not self._cache is None:
+            self._cache.remove(self._pop)
+            self._cache.add(child._instructions())
+            self._cache.add(self._pop)
+
+    def remove(self,child):
+        """
+        Removes a child from this scene.
+
+        Only the drawing instructions of that child are removed from the drawing cache.
+        The rest of the scene is left alone.
+
+        :param child: the object to remove
+        :type child:  :class:`GObject` in this scene
+        """
+        assert child in self._children, '%s is not in this scene' % repr(child)
+        self._children.remove(child)
+        child._parent = None
+        self._invalidate()
+        if not self._cache is None and not child._cache is None:
+            self._cache.remove(child._cache)
+
     def select(self,point):
         """
         Selects the child selected by the given point.
 
-        This function recursively descends the scene graph.  It returns the first child
-        it finds that contains ``point``.  If that child is also a ``GScene``, it
-        recursively calls this method.  If not child contains this point, it returns
-        either this object, or ``None`` if the point is completely out of bounds.
+        This function recursively descends the scene graph.  It returns the front-most
+        child that contains ``point``, where children later in the list are drawn on top
+        of earlier ones.  If that child is also a ``GScene``, it recursively calls this
+        method.  If no child contains this point, it returns either this object, or
+        ``None`` if the point is completely out of bounds.
+
+        The point is given in the coordinates of the parent of this scene (or of the
+        view, for a scene that is not nested).
 
         **Warning**: Using this method on a rotated object may slow down your framerate.
 
@@ -780,24 +1063,100 @@ class GScene(GObject):
         if not self.contains(point):
             return None
 
-        for child in self._children:
-            result = None
+        if isinstance(point,Point2):
+            point = (point.x,point.y)
+        if self._angle == 0.0 and self._sx == 1.0 and self._sy == 1.0:
+            local = (point[0]-self._x,point[1]-self._y)
+        else:
+            local = tuple(self.inverse._transform(point[0],point[1]))[:2]
+
+        if len(self._children) < GScene.INDEX_THRESHOLD:
+            candidates = range(len(self._children)-1,-1,-1)
+        else:
+            if self._grid is None:
+                self._build_grid()
+            size, cells = self._grid
+            cell = (math.floor(local[0]/size),math.floor(local[1]/size))
+            candidates = reversed(cells.get(cell,()))
+
+        for pos in candidates:
+            child = self._children[pos]
             if isinstance(child,GScene):
-                result = child.select(point)
-            elif child.contains(point):
+                result = child.select(local)
+            elif child.contains_xy(local[0],local[1]):
                 result = child
-            if not child is None:
-                return child
+            else:
+                result = None
+            if not result is None:
+                return result
 
-        return None
+        return self
 
 
     # HIDDEN METHODS
+    def _invalidate(self):
+        """
+        Drops the cached bounds, and tells the scene containing this one (if any).
+
+        The bounds of every scene above a scene with cached bounds are cached as well,
+        so there is nothing to pass on if the bounds were already dropped.  The grid
+        is only ever built along with the bounds, so it is dropped with them.
+        """
+        if not self._bounds is None:
+            self._bounds = None
+            self._grid = None
+            if not self._parent is None:
+                self._parent._invalidate()
+
+    def _compute_bounds(self):
+        """
+        Computes the cached bounds from the children.
+        """
+        right = 0
+        top = 0
+        for x in self._children:
+            w = x.x+x.width/2.0
+            if w > right:
+                right = w
+            h = x.y+x.height/2.0
+            if h > top:
+                top = h
+        self._bounds = (right*2,top*2)
+
+    def _build_grid(self):
+        """
+        Builds the grid of children used by :meth:`select`.
+
+        The cells are squares about the size of an average child.  Each cell lists,
+        in drawing order, the positions of the children whose bounding boxes overlap
+        it.  The box of a rotated or scaled child is enlarged to cover every angle.
+        """
+        if self._bounds is None:
+            self._compute_bounds()
+        boxes = []
+        for x in self._children:
+            hw = x.width/2.0
+            hh = x.height/2.0
+            if x._angle != 0.0 or x._sx != 1.0 or x._sy != 1.0:
+                hw = hh = math.hypot(hw,hh)*max(abs(x._sx),abs(x._sy))
+            boxes.append((x.x-hw,x.y-hh,x.x+hw,x.y+hh))
+
+        size = 1.0
+        if boxes:
+            size = max(size,sum(max(r-l,t-b) for l, b, r, t in boxes)/len(boxes))
+        cells = {}
+        for pos, (l, b, r, t) in enumerate(boxes):
+            for i in range(math.floor(l/size),math.floor(r/size)+1):
+                for j in range(math.floor(b/size),math.floor(t/size)+1):
+                    cells.setdefault((i,j),[]).append(pos)
+        self._grid = (size,cells)
+
     def _reset(self):
         """
         Resets the drawing cache
         """
-        GObject._reset(self)
-        for x in self.children:
-            self._cache.add(x._cache)
-        self._cache.add(PopMatrix())
+        if not GObject._reset(self):
+            return
+        for x in self._children:
+            self._cache.add(x._instructions())
+        self._cache.add(self._pop)
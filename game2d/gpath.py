@@ -57,6 +57,22 @@ def in_triangle(p, t):
             same_side(p, t[4:6], t[0:2], t[2:4]))
 
 
+def _in_triangle_xy(x, y, ax, ay, bx, by, cx, cy):
+    """
+    Checks whether the point (x,y) is inside of the triangle with corners a, b, c
+    
+    This is :func:`in_triangle` on plain numbers, so that it does not allocate.  Points 
+    on an edge are inside.
+    
+    :return: True if (x,y) is in the triangle; False otherwise
+    :rtype:  ``bool``
+    """
+    d1 = (bx-ax)*(y-ay)-(by-ay)*(x-ax)
+    d2 = (cx-bx)*(y-by)-(cy-by)*(x-bx)
+    d3 = (ax-cx)*(y-cy)-(ay-cy)*(x-cx)
+    return not ((d1 < 0 or d2 < 0 or d3 < 0) and (d1 > 0 or d2 > 0 or d3 > 0))
+
+
 def is_point_tuple(t,minsize):
     """
     Checks whether a value is an EVEN sequence of numbers.
@@ -103,6 +119,7 @@ class GPath(GObject):
     are 0.  However, if they are nonzero, then Python will add them to all of the points
     in the path, shifting the path accordingly.
     """
+    __slots__ = ('_points','_linewidth')
     
     # MUTABLE PROPERTIES
     @property
@@ -120,6 +137,7 @@ class GPath(GObject):
         assert is_point_tuple(value,2),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
         if self._defined:
+            self._invalidate()
             self._reset()
     
     @property
@@ -213,6 +231,21 @@ class GPath(GObject):
         """
         return False
     
+    def contains_xy(self,x,y):
+        """
+        Checks whether this shape contains the point (x,y)
+        
+        :param x: the x-coordinate of the point
+        :type x:  ``int`` or ``float``
+        
+        :param y: the y-coordinate of the point
+        :type y:  ``int`` or ``float``
+        
+        :return: True if the shape contains this point
+        :rtype:  ``bool``
+        """
+        return False
+    
     def near(self,point):
         """
         Checks whether this path is near the given point
@@ -254,9 +287,10 @@ class GPath(GObject):
         """
         Resets the drawing cache
         """
-        GObject._reset(self)
+        if not GObject._reset(self):
+            return
         if not self._linecolor is None:
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             line = Line(points=self.points,cap='round',joint='round',width=self.linewidth)
             self._cache.add(line)
         self._cache.add(PopMatrix())
@@ -280,6 +314,7 @@ class GTriangle(GPath):
     will add them to the triangle vertices.  Similarly, the attributes `width` and 
     `height` are immutable, and are computed directly from the points
     """
+    __slots__ = ()
     
     # MUTABLE PROPERTIES
     @property
@@ -298,6 +333,7 @@ class GTriangle(GPath):
         assert len(value) == 6, 'value %s does not have the right length'  %  repr(value)
         self._points = tuple(value)
         if self._defined:
+            self._invalidate()
             self._reset()
     
     
@@ -331,21 +367,39 @@ class GTriangle(GPath):
         """
         Checks whether this shape contains the point
         
-        By default, this method just checks the bounding box of the shape.
-        
-        **Warning**: Using this method on a rotated object may slow down your framerate.
+        It checks its argument and then calls :meth:`contains_xy`.
         
         :param point: the point to check
-        :type point: :class:`Point2`` or a pair of numbers
+        :type point: a pair of numbers
         
         :return: True if the shape contains this point
         :rtype:  ``bool``
         """
-        if isinstance(point,Point2):
-            point = (point.x,point.y)
         assert is_point_tuple(point,1), "%s is not a valid point" % repr(point)
+        return self.contains_xy(point[0],point[1])
+    
+    def contains_xy(self,x,y):
+        """
+        Checks whether this shape contains the point (x,y)
         
-        return in_triangle(points,self._points)
+        This is the unchecked version of :meth:`contains`.  The point is moved into the
+        coordinates of the triangle and tested against its three corners.
+        
+        :param x: the x-coordinate of the point
+        :type x:  ``int`` or ``float``
+        
+        :param y: the y-coordinate of the point
+        :type y:  ``int`` or ``float``
+        
+        :return: True if the shape contains this point
+        :rtype:  ``bool``
+        """
+        x -= self._x
+        y -= self._y
+        if self._angle != 0.0 or self._sx != 1.0 or self._sy != 1.0:
+            x, y = self._untransform(x,y)
+        p = self._points
+        return _in_triangle_xy(x,y,p[0],p[1],p[2],p[3],p[4],p[5])
     
     
     # HIDDEN METHODS
@@ -353,7 +407,8 @@ class GTriangle(GPath):
         """
         Resets the drawing cache
         """
-        GObject._reset(self)
+        if not GObject._reset(self):
+            return
         
         vertices = ()
         for x in range(3):
@@ -362,13 +417,13 @@ class GTriangle(GPath):
         
         mesh = Mesh(vertices=vertices, indices=range(3), mode='triangle_strip')
         if not self._fillcolor is None:
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
         self._cache.add(mesh)
         
         if self.linewidth > 0:
             line = Line(points=self.points,joint='miter',close=True,width=self.linewidth)
             if not self._linecolor is None:
-                self._cache.add(self._linecolor)
+                self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -400,6 +455,7 @@ class GPolygon(GPath):
     As with :class:`GPath`, the attributes ``width`` and ``height`` are immutable, and 
     are computed directly from the points
     """
+    __slots__ = ('_source','_source_width','_source_height','_mesh')
     
     # MUTABLE PROPERTIES
     @property
@@ -417,6 +473,7 @@ class GPolygon(GPath):
         assert is_point_tuple(value,3),'value %s is not a valid list of points' %  repr(value)
         self._points = tuple(value)
         if self._defined:
+            self._invalidate()
             self._reset()
     
     @property
@@ -520,26 +577,45 @@ class GPolygon(GPath):
         """
         Checks whether this shape contains the point
         
-        By default, this method just checks the bounding box of the shape.
-        
-        **Warning**: Using this method on a rotated object may slow down your framerate.
+        It checks its argument and then calls :meth:`contains_xy`.
         
         :param point: the point to check
-        :type point: :class:`Point2`` or a pair of numbers
+        :type point: a pair of numbers
         
         :return: True if the shape contains this point
         :rtype:  ``bool``
         """
-        if isinstance(point,Point2):
-            point = (point.x,point.y)
         assert is_point_tuple(point,1), "%s is not a valid point" % repr(point)
+        return self.contains_xy(point[0],point[1])
+    
+    def contains_xy(self,x,y):
+        """
+        Checks whether this shape contains the point (x,y)
+        
+        This is the unchecked version of :meth:`contains`.  The point is moved into the
+        coordinates of the polygon and tested against each triangle of the fan, 
+        including the one that closes the fan at the first vertex.
+        
+        :param x: the x-coordinate of the point
+        :type x:  ``int`` or ``float``
         
-        found = False
-        for i in xrange(4,len(self._points),2):
-            t = (0,0)+self.points[i-4:i]
-            found = found or in_triangle(point,t)
+        :param y: the y-coordinate of the point
+        :type y:  ``int`` or ``float``
         
-        return found
+        :return: True if the shape contains this point
+        :rtype:  ``bool``
+        """
+        x -= self._x
+        y -= self._y
+        if self._angle != 0.0 or self._sx != 1.0 or self._sy != 1.0:
+            x, y = self._untransform(x,y)
+        p = self._points
+        size = len(p)
+        for i in range(0,size,2):
+            j = (i+2) % size
+            if _in_triangle_xy(x,y,0,0,p[i],p[i+1],p[j],p[j+1]):
+                return True
+        return False
     
     
     # HIDDEN METHODS
@@ -578,15 +654,18 @@ class GPolygon(GPath):
         """
         Resets the drawing cache
         """
-        GObject._reset(self)
+        if not GObject._reset(self):
+            return
         self._make_mesh()
         
-        self._cache.add(self._fillcolor)
+        if not self._fillcolor is None:
+            self._cache.add(Color(*self._fillcolor))
         self._cache.add(self._mesh)
         
         if self.linewidth > 0:
             line = Line(points=self.points,joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            if not self._linecolor is None:
+                self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -10,10 +10,11 @@ Date:   August 1, 2017 (Python 3 version)
 """
 from kivy.graphics import *
 from kivy.graphics.instructions import *
-from kivy.uix.label import Label
 from kivy.uix.image import Image
-from .gobject import GObject
+from kivy.metrics import sp
+from .gobject import GObject, is_num_tuple
 from .app import GameApp
+from .texcache import TextureCache
 
 class GRectangle(GObject):
     """
@@ -28,6 +29,7 @@ class GRectangle(GObject):
     The only new property for this class is ``linewidth``, which controls the width of
     the border around the rectangle.  For all other properties, see the documentation
     for :class:`GObject`."""
+    __slots__ = ('_linewidth',)
     
     # MUTABLE PROPERTIES 
     @property
@@ -80,19 +82,20 @@ class GRectangle(GObject):
         """
         Resets the drawing cache
         """
-        GObject._reset(self)
+        if not GObject._reset(self):
+            return
         x = -self.width/2.0
         y = -self.height/2.0
         
         if not self._fillcolor is None:
             fill = Rectangle(pos=(x,y), size=(self.width, self.height))
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
             self._cache.add(fill)
         
         if not self._linecolor is None and self.linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',
                         close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -111,6 +114,7 @@ class GEllipse(GRectangle):
     This class has exactly the same properties as :class:`GRectangle`.  See the 
     documentation of that class and :class:`GObject` for a complete list of attributes.
     """
+    __slots__ = ()
     
     # BUILT-IN METHODS
     def __init__(self,**keywords):
@@ -139,26 +143,38 @@ class GEllipse(GRectangle):
         This method is better than simple rectangle inclusion.  It checks that the point 
         is within the proper radius as well.
         
-        **Warning**: Using this method on a rotated object may slow down your framerate.
+        It checks its argument and then calls :meth:`contains_xy`.
         
         :param point: the point to check
-        :type point: :class:`GPoint`` or a pair of numbers
+        :type point: a pair of numbers
         """
-        if isinstance(point,GPoint):
-            point = (point.x,point.y)
         assert is_num_tuple(point,2), "%s is not a valid point" % repr(point)
+        return self.contains_xy(point[0],point[1])
+    
+    def contains_xy(self,x,y):
+        """
+        Checks whether this shape contains the point (x,y)
+        
+        This is the unchecked version of :meth:`contains`.  An ellipse that is not
+        rotated or scaled is tested directly; otherwise the point is first moved into
+        the coordinates of the ellipse.
+        
+        :param x: the x-coordinate of the point
+        :type x:  ``int`` or ``float``
         
+        :param y: the y-coordinate of the point
+        :type y:  ``int`` or ``float``
+        
+        :return: True if the shape contains this point
+        :rtype:  ``bool``
+        """
+        x -= self._x
+        y -= self._y
+        if self._angle != 0.0 or self._sx != 1.0 or self._sy != 1.0:
+            x, y = self._untransform(x,y)
         rx = self.width/2.0
         ry = self.height/2.0
-        if self._rotate.angle == 0.0:
-            dx = (point[0]-self.x)*(point[0]-self.x)/(rx*rx)
-            dy = (point[1]-self.y)*(point[1]-self.y)/(ry*ry)
-        else:
-            p = self.matrix.inverse()._transform(point[0],point[1])
-            dx = p[0]*p[0]/(rx*rx)
-            dy = p[1]*p[1]/(ry*ry)
-        
-        return (dx+dy) <= 1.0
+        return x*x/(rx*rx)+y*y/(ry*ry) <= 1.0
     
     
     # HIDDEN METHODS
@@ -166,18 +182,19 @@ class GEllipse(GRectangle):
         """
         Resets the drawing cache.
         """
-        GObject._reset(self)
+        if not GObject._reset(self):
+            return
         x = -self.width/2.0
         y = -self.height/2.0
         
         if not self._fillcolor is None:
             fill = Ellipse(pos=(x,y), size=(self.width,self.height))
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
             self._cache.add(fill)
         
         if not self._linecolor is None and self.linewidth > 0:
             line = Line(ellipse=(x,y,self.width,self.height),close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -204,6 +221,7 @@ class GImage(GRectangle):
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
     """
+    __slots__ = ('_source','_texture')
     
     # MUTABLE PROPERTIES
     @property
@@ -264,21 +282,22 @@ class GImage(GRectangle):
             print('Failed to load',repr(self.source))
         
         # THEN we can reset
-        GObject._reset(self)
+        if not GObject._reset(self):
+            return
         x = -self.width/2.0
         y = -self.height/2.0
         
         
         fill = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
         if not self._fillcolor is None:
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
         else:
             self._cache.add(Color(1,1,1))
         self._cache.add(fill)
         
         if not self._linecolor is None and self.linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -307,7 +326,18 @@ class GLabel(GRectangle):
     to the font by filename, including the .ttf. If you give no name, it will use the 
     default Kivy font.  The `bold` attribute only works for the default Kivy font; for 
     other fonts you will need the .ttf file for the bold version of that font.  See the
-    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example."""
+    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
+    
+    Rendered text is kept in the class attribute `TEXT_CACHE`, keyed by the text, font 
+    name, font size, boldness and alignment.  Labels with the same text share a single
+    texture, so building the same label again does not render it again.  The text is
+    rendered in white and tinted with `linecolor` when drawn, so the color is not part
+    of the key.  Moving a label never renders it again."""
+    
+    # Class attribute for the rendered text (least recently used evicted first)
+    TEXT_CACHE = TextureCache(8*1024*1024)
+    __slots__ = ('_hanchor','_vanchor','_ha','_hv','_halign','_valign','_text','_fname',
+                 '_fsize','_bold','_texture')
     
     # MUTABLE PROPERTIES
     @property
@@ -322,8 +352,8 @@ class GLabel(GRectangle):
     def font_size(self,value):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._fsize = value
-        self._label.font_size = value
-        self._label.texture_update()
+        if self._defined:
+            self._reset()
     
     @property
     def font_name(self):
@@ -331,14 +361,15 @@ class GLabel(GRectangle):
         The file name for the .ttf file to use as a font
         
         **Invariant**: Must be a string referring to a .ttf file in folder Fonts"""
-        return self._label.font_name
+        return self._fname
     
     @font_name.setter
     def font_name(self,value):
         from .app import GameApp
         assert GameApp.is_font(value), 'value %s is not a font name' % repr(value)
-        self._label.font_name = value
-        self._label.texture_update()
+        self._fname = value
+        if self._defined:
+            self._reset()
     
     @property
     def bold(self):
@@ -350,13 +381,14 @@ class GLabel(GRectangle):
         `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
         
         **Invariant**: Must be a boolean"""
-        return self._label.bold
+        return self._bold
 
     @bold.setter
     def bold(self,value):
         assert type(value) == bool, repr(value)+' is not a bool'
-        self._label.bold = value
-        self._label.texture_update()
+        self._bold = value
+        if self._defined:
+            self._reset()
 
     @property
     def text(self):
@@ -368,13 +400,14 @@ class GLabel(GRectangle):
         this label will grow to ensure that the text will fit in the rectangle.
         
         **Invariant**: Must be a string"""
-        return self._label.text
+        return self._text
     
     @text.setter
     def text(self,value):
         assert type(value) == str, 'value %s is not a string' % repr(value)
-        self._label.text = value
-        self._label.texture_update()
+        self._text = value
+        if self._defined:
+            self._reset()
     
     @property
     def halign(self):
@@ -396,7 +429,6 @@ class GLabel(GRectangle):
     def halign(self,value):
         assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
         self._halign = value
-        self._label.halign = value
         if self._defined:
             self._reset()
     
@@ -420,7 +452,6 @@ class GLabel(GRectangle):
     def valign(self,value):
         assert value in ('top','middle','bottom'), 'value %s is not a valid vertical alignment' % repr(value)
         self._valign = value
-        self._label.valign = value
         if self._defined:
             self._reset()
     
@@ -432,13 +463,11 @@ class GLabel(GRectangle):
         The horizontal coordinate of the object center.
         
         **Invariant**: Must be an int or float."""
-        return self._trans.x
+        return self._x
     
     @x.setter
     def x(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
-        self._trans.x = float(value)
-        self._mtrue = False
+        GObject.x.fset(self,value)
         self._hanchor = 'center'
         self._ha = value
     
@@ -448,13 +477,11 @@ class GLabel(GRectangle):
         The vertical coordinate of the object center..
         
         **Invariant**: Must be an int or float."""
-        return self._trans.y
+        return self._y
     
     @y.setter
     def y(self,value):
-        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
-        self._trans.y = float(value)
-        self._mtrue = False
+        GObject.y.fset(self,value)
         self._vanchor = 'center'
         self._hv = value
     
@@ -473,7 +500,7 @@ class GLabel(GRectangle):
         
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.x-self.width/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
@@ -505,7 +532,7 @@ class GLabel(GRectangle):
         
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.x+self.width/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[0]
@@ -537,7 +564,7 @@ class GLabel(GRectangle):
         
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.y+self.height/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
@@ -568,7 +595,7 @@ class GLabel(GRectangle):
         **Warning**: Accessing this value on a rotated object may slow down your framerate.
         **Invariant**: Must be an int or float.
         """
-        if self._rotate.angle == 0.0:
+        if self._angle == 0.0:
             return self.y-self.height/2.0
         
         p0 = self.matrix._transform(self.x-self.width/2.0, self.y-self.height/2.0)[1]
@@ -604,16 +631,21 @@ class GLabel(GRectangle):
         self._defined = False
         self._hanchor = 'center'
         self._vanchor = 'center'
+        self._texture = None
         
-        sanitized = {}
-        excludes  = ['linewidth','linecolor','fillcolor','halign','valign','left','bottom']
-        for key in keywords:
-            if not key in excludes:
-                sanitized[key] = keywords[key]
-        
-        self._label = Label(**sanitized)
-        self._label.size_hint = (None,None)
-        self._label.mipmap = True
+        # Kivy defaults
+        self._text  = ''
+        self._fname = 'Roboto'
+        self._fsize = sp(15)
+        self._bold  = False
+        if 'text' in keywords:
+            self.text = keywords['text']
+        if 'font_name' in keywords:
+            self.font_name = keywords['font_name']
+        if 'font_size' in keywords:
+            self.font_size = keywords['font_size']
+        if 'bold' in keywords:
+            self.bold = keywords['bold']
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
         self.halign = keywords['halign'] if 'halign' in keywords else 'center'
@@ -624,7 +656,6 @@ class GLabel(GRectangle):
             self.linecolor = (0,0,0,1)
         self._reset()
         self._defined = True
-        self._label.bind(texture_size=self._callback)
     
     def __str__(self):
         """
@@ -639,67 +670,87 @@ class GLabel(GRectangle):
                 % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
     
     # HIDDEN METHODS
-    def _callback(self,instance=None,value=None):
-        """
-        A workaround to deal with parameter requirements for callbacks
-        """
-        if self._defined:
-            self._reset()
+    def _render(self):
+        """
+        Returns: The texture of the text of this label, or None if there is no text
+        
+        The texture is taken from `TEXT_CACHE` if the same text has been rendered
+        before.  Otherwise it is rendered and cached.
+        """
+        if self._text == '':
+            return None
+        key = repr((self._text,self._fname,self._fsize,self._bold,self._halign))
+        texture = GLabel.TEXT_CACHE.get(key)
+        if texture is None:
+            from kivy.core.text import Label
+            label = Label(text=self._text,font_name=self._fname,font_size=self._fsize,
+                          bold=self._bold,halign=self._halign,color=(1,1,1,1),mipmap=True)
+            label.refresh()
+            texture = label.texture
+            if not texture is None:
+                GLabel.TEXT_CACHE.put(key,texture)
+        return texture
     
     def _reset(self):
         """
         Resets the drawing cache.
         """
-        # Set up the label at the center.
-        self._label.size = self._label.texture_size
-        self._label.center = (0,0)
-        if self.linecolor:
-            self._label.color = self.linecolor
+        self._texture = self._render()
+        tw, th = (0,0) if self._texture is None else self._texture.size
         
         # Resize the outside if necessary
         self._defined = False
-        self.width  = max(self.width, self._label.width)
-        self.height = max(self.height,self._label.height)
+        self.width  = max(self.width, tw)
+        self.height = max(self.height,th)
         self._defined = True
         
         # Reset the absolute anchor
         if self._hanchor == 'left':
-            self._trans.x = self._ha+self.width/2.0
+            self._x = self._ha+self.width/2.0
         elif self._hanchor == 'right':
-            self._trans.x = self._ha-self.width/2.0
+            self._x = self._ha-self.width/2.0
         
         # Reset the absolute anchor
         if self._vanchor == 'top':
-            self._trans.y = self._hv-self.height/2.0
+            self._y = self._hv-self.height/2.0
         elif self._vanchor == 'bottom':
-            self._trans.y = self._hv+self.height/2.0
+            self._y = self._hv+self.height/2.0
+        self._invalidate()
         
-        # Reset the label anchor.
+        # Reset the text anchor.
         if self.halign == 'left':
-            self._label.x = -self.width/2.0
+            tx = -self.width/2.0
         elif self.halign == 'right':
-            self._label.right = self.width/2.0
+            tx = self.width/2.0-tw
+        else:
+            tx = -tw/2.0
         
-        # Reset the label anchor.
+        # Reset the text anchor.
         if self.valign == 'top':
-            self._label.top = self.height/2.0
+            ty = self.height/2.0-th
         elif self.valign == 'bottom':
-            self._label.bottom = -self.height/2.0
+            ty = -self.height/2.0
+        else:
+            ty = -th/2.0
         
-        GObject._reset(self)
+        if not GObject._reset(self):
+            return
         x = -self.width/2.0
         y = -self.height/2.0
         
         if self.fillcolor:
             fill = Rectangle(pos=(x,y), size=(self.width,self.height))
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
             self._cache.add(fill)
         
-        self._cache.add(self._label.canvas)
+        if not self._texture is None:
+            color = self.linecolor if self.linecolor else (1,1,1,1)
+            self._cache.add(Color(*color))
+            self._cache.add(Rectangle(pos=(tx,ty),size=(tw,th),texture=self._texture))
         
         if self._linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -34,6 +34,7 @@ class GSprite(GRectangle):
     If the image supports transparency, then this object can be used to represent irregular 
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
     """
+    __slots__ = ('_source','_texture','_frame','_format','_images','_bounds')
     
     # MUTABLE PROPERTIES
     @property
@@ -171,21 +172,22 @@ class GSprite(GRectangle):
             print('Failed to load',repr(self.source))
         
         # THEN we can reset
-        GObject._reset(self)
+        if not GObject._reset(self):
+            return
         x = -self.width/2.0
         y = -self.height/2.0
         
         self._texture = self._images[self._frame]
         self._bounds = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._texture)
         if not self._fillcolor is None:
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
         else:
             self._cache.add(Color(1,1,1))
         self._cache.add(self._bounds)
         
         if not self._linecolor is None and self.linewidth > 0:
             line = Line(rectangle=(x,y,self.width,self.height),joint='miter',close=True,width=self.linewidth)
-            self._cache.add(self._linecolor)
+            self._cache.add(Color(*self._linecolor))
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
@@ -24,6 +24,7 @@ class GTile(GObject):
     to fill in all of the remaining space.  This is ideal for terrain and other
     background features
     """
+    __slots__ = ('_source','_texture')
     
     # MUTABLE PROPERTIES
     @property
@@ -98,16 +99,17 @@ class GTile(GObject):
         """
         Resets the drawing cache.
         """
-        GObject._reset(self)
-        x = -self._width/2.0
-        y = -self._height/2.0
-        
         self._texture = GameApp.load_texture(self.source)
         if not self._texture is None and self.width == 0:
             self.width  = self._texture.width
         if not self._texture is None and self.height == 0:
             self.height = self._texture.height
         
+        if not GObject._reset(self):
+            return
+        x = -self._width/2.0
+        y = -self._height/2.0
+        
         grid_x = self._texture.width
         grid_y = self._texture.height
         size_x = int(self.width//grid_x)
@@ -134,7 +136,7 @@ class GTile(GObject):
         
         mesh = Mesh(vertices=vert, indices=indx,mode='triangles',texture=self._texture)
         if not self._fillcolor is None:
-            self._cache.add(self._fillcolor)
+            self._cache.add(Color(*self._fillcolor))
         else:
             self._cache.add(Color(1,1,1))
         self._cache.add(mesh)
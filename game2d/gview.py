@@ -150,6 +150,9 @@ class GInput(object):
         self._touchpress = 0
         self._touchrelease = 0
 
+        # The InputRecorder logging this input (None if it is not recorded)
+        self._recorder = None
+
 
     # PUBLIC METHODS
     def is_key_down(self,key):
@@ -290,14 +293,50 @@ class GInput(object):
         """
         return self._touchrelease > 0
 
+    def annotate(self,**notes):
+        """
+        Adds notes to the recording of this input, if it is being recorded.
+
+        Notes mark what the game did in the current tick, so that a tool replaying the
+        recording can follow along (see :mod:`game2d.replay`).  Nothing happens if the
+        input is not recorded.
+
+        :param notes: the notes to add
+        :type notes:  keyword arguments with JSON values
+        """
+        if not self._recorder is None:
+            self._recorder.annotate(notes)
+
+    def recall(self,name,default=None):
+        """
+        Returns the value of the first note called ``name`` in the input log.
+
+        Live input has no log, so this returns ``default``.  Input played back from a
+        log returns the note recorded with :meth:`annotate`, so that a game can restore
+        what it noted down (such as a random seed) when it is replayed.
+
+        :param name: the name of the note
+        :type name:  ``str``
+
+        :param default: the value to return if there is no such note
+        :type default:  any
+        """
+        return default
+
 
     # HIDDEN METHODS
-    def _prestep(self):
+    def _prestep(self,dt=None):
         """
         The step to perform before the update step.  
         
         This method 'dirties' the inputs so we know what presses and releases are read.
+        If the input is recorded, it also starts a new tick of the recording.
+
+        :param dt: the time step of the update (only used by the recording)
+        :type dt:  ``int`` or ``float``, or None
         """
+        if not self._recorder is None:
+            self._recorder.tick(dt)
         for k in self._keypress:
             self._keypress[k] = False
         for k in self._keyrelease:
@@ -409,6 +448,8 @@ class GInput(object):
         if not k in self._keystate or not self._keystate[k]:
             self._keycount += 1
             self._keypress[k] = True
+            if not self._recorder is None:
+                self._recorder.event('d',k)
         self._keystate[k] = True
         return True
 
@@ -425,6 +466,8 @@ class GInput(object):
         self._keystate[keycode[1]] = False
         self._keyrelease[keycode[1]] = True
         self._keycount -= 1
+        if not self._recorder is None:
+            self._recorder.event('u',keycode[1])
         return True
 
     def _capture_touch(self,view,touch):
@@ -440,6 +483,9 @@ class GInput(object):
         if not self._touch:
             self._touchpress = 2
         self._touch = touch
+        if not self._recorder is None:
+            point = self.touch
+            self._recorder.event('t',point.x,point.y)
         
         #self._touch.grab(self)
 
@@ -456,6 +502,8 @@ class GInput(object):
         if self._touch:
             self._touchrelease = 2
         self._touch = None
+        if not self._recorder is None:
+            self._recorder.event('r')
 
 
 # #mark -
@@ -467,6 +515,12 @@ class GView(FloatLayout):
     :class:`GObject` instances to the :meth:`draw` method.  You must do this every
     animation frame, as the game is constantly clearing the window.
 
+    The view also has a retained scene.  Commands added with :meth:`add` are not cleared
+    at the start of the frame; they stay on screen until they are taken out with
+    :meth:`remove`.  This is much cheaper for large numbers of objects that rarely come
+    and go, since nothing has to be redrawn each frame.  The retained scene is drawn
+    underneath the commands drawn this frame.
+
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
     only use the one provided in the `view` attribute of :class:`GameApp`.
@@ -484,7 +538,9 @@ class GView(FloatLayout):
         :class:`GameApp`. See the documentation of that class for more information.
         """
         FloatLayout.__init__(self)
+        self._scene = InstructionGroup()
         self._frame = InstructionGroup()
+        self._retained = set()
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
@@ -506,12 +562,41 @@ class GView(FloatLayout):
             self._frame.add(cmd)
             self._contents.add(cmd)
 
+    def add(self,cmd):
+        """
+        Adds the given Kivy graphics command to the retained scene of this view.
+
+        The command stays on screen until it is removed with :meth:`remove`.  You should
+        never call this method; use the `attach` method in :class:`GObject` instead.
+
+        :param cmd: the command to add
+        :type cmd:  A Kivy graphics command
+        """
+        if not cmd in self._retained:
+            self._scene.add(cmd)
+            self._retained.add(cmd)
+
+    def remove(self,cmd):
+        """
+        Removes the given Kivy graphics command from the retained scene of this view.
+
+        Nothing happens if the command is not in the retained scene.  You should never
+        call this method; use the `detach` method in :class:`GObject` instead.
+
+        :param cmd: the command to remove
+        :type cmd:  A Kivy graphics command
+        """
+        if cmd in self._retained:
+            self._scene.remove(cmd)
+            self._retained.discard(cmd)
+
     def clear(self):
         """
         Clears the contents of the view.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  It does
+        not touch the retained scene.
         """
         self._frame.clear()
         self._contents.clear()
@@ -526,4 +611,5 @@ class GView(FloatLayout):
         self.canvas.add(Rectangle(pos=self.pos,size=self.size))
         # Work-around for Retina Macs
         self.canvas.add(Scale(dp(1),dp(1),dp(1)))
+        self.canvas.add(self._scene)
         self.canvas.add(self._frame)
@@ -0,0 +1,242 @@
+"""
+A module to support loading assets before the game starts.
+
+Without a preload, every image is decoded the first time something draws it, which
+stalls that frame.  A preloader takes a manifest of images, fonts and sounds and
+loads all of them before :meth:`GameApp.start` is called.  The files are read and
+decoded on a pool of threads.  Anything that has to touch the GPU or the audio
+device is then finished on the main thread, a few assets per frame, so that the
+window stays responsive while the game loads.  The decoded pixels of an image are
+dropped as soon as its texture is uploaded, so they do not stay in memory.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from kivy.logger import Logger
+import os.path
+import math
+import time
+
+
+# The kinds of asset a manifest may list
+MANIFEST_KINDS = ('images', 'fonts', 'sounds')
+
+
+def percentile(values,fraction):
+    """
+    Returns: the nearest-rank percentile of a list of numbers (None if it is empty)
+
+    :param values: the numbers
+    :type values:  list of ``int`` or ``float``
+
+    :param fraction: the percentile as a fraction
+    :type fraction:  ``float`` in 0..1
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    pos = min(len(ordered),max(1,math.ceil(fraction*len(ordered))))-1
+    return ordered[pos]
+
+
+def _decode_image(path):
+    """
+    Returns: the decoded pixels of the image file, as an ``ImageData``
+
+    This is run on a worker thread.  The loader is never asked for its texture, so
+    nothing here touches the GPU.  The texture is made on the main thread.
+    """
+    from kivy.core.image import ImageLoader
+    return ImageLoader.load(path,keep_data=True)._data[0]
+
+
+def _read_file(path):
+    """
+    Returns: the number of bytes in the file, after reading all of it
+
+    This is run on a worker thread, so that the file is in the disk cache when the
+    main thread opens it.
+    """
+    with open(path,'rb') as file:
+        return len(file.read())
+
+
+class Preloader(object):
+    """
+    A class representing the loading of a manifest of assets.
+
+    A manifest is a dictionary whose keys are among 'images', 'fonts' and 'sounds',
+    and whose values are lists of file names in the matching folder.  For example::
+
+        {'images': ['ship.png','win.jpg'], 'fonts': ['RetroGame.ttf']}
+
+    Images are put in the texture cache of :class:`GameApp`, sounds in its sound cache,
+    and fonts are opened once so that the first label using them does not stall.
+
+    Call :meth:`step` once per frame until it returns True.  It finishes as many of the
+    decoded assets as fit in the time ``budget``, and at least one per frame.  The
+    frame times seen while loading are kept, so that :meth:`report` can log their
+    percentiles.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def total(self):
+        """
+        The number of assets in the manifest.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._total
+
+    @property
+    def loaded(self):
+        """
+        The number of assets finished so far (including any that failed to load).
+
+        **invariant**: Value is an ``int`` between 0 and ``total``.
+        """
+        return self._total-len(self._pending)
+
+    @property
+    def done(self):
+        """
+        Whether every asset in the manifest is finished.
+
+        **invariant**: Value is a ``bool``.
+        """
+        return not self._pending
+
+    @property
+    def frametimes(self):
+        """
+        The frame times (in seconds) seen while loading.
+
+        **invariant**: Value is a ``tuple`` of ``float``.
+        """
+        return tuple(self._frames)
+
+    # BUILT-IN METHODS
+    def __init__(self,manifest,workers=4,budget=0.004):
+        """
+        Creates a preloader and starts decoding the manifest on the worker threads
+
+        Assets that are already in the texture or sound cache are skipped.
+
+        :param manifest: the assets to load
+        :type manifest:  ``dict`` of lists of ``str``
+
+        :param workers: the number of decoding threads
+        :type workers:  ``int`` > 0
+
+        :param budget: the seconds per frame to spend finishing assets
+        :type budget:  ``float`` >= 0
+        """
+        from .app import GameApp
+        assert type(manifest) == dict, '%s is not a manifest' % repr(manifest)
+        assert all(kind in MANIFEST_KINDS for kind in manifest), \
+            '%s has an unknown kind of asset' % repr(manifest)
+        assert type(workers) == int and workers > 0, '%s is not a valid worker count' % repr(workers)
+        assert type(budget) in [int,float] and budget >= 0, '%s is not a valid budget' % repr(budget)
+        self._budget = budget
+        self._frames = []
+        self._start = time.perf_counter()
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._pending = []
+        for name in manifest.get('images',[]):
+            assert GameApp.is_image(name), '%s is not an image file' % repr(name)
+            if not name in GameApp.TEXTURE_CACHE:
+                future = self._pool.submit(_decode_image,os.path.join(GameApp.images,name))
+                self._pending.append(('images',name,future))
+        for name in manifest.get('fonts',[]):
+            assert GameApp.is_font(name), '%s is not a font file' % repr(name)
+            future = self._pool.submit(_read_file,os.path.join(GameApp.fonts,name))
+            self._pending.append(('fonts',name,future))
+        for name in manifest.get('sounds',[]):
+            assert GameApp.is_sound(name), '%s is not a sound file' % repr(name)
+            if not name in GameApp.SOUND_CACHE:
+                future = self._pool.submit(_read_file,os.path.join(GameApp.sounds,name))
+                self._pending.append(('sounds',name,future))
+        self._total = len(self._pending)
+        if not self._pending:
+            self._pool.shutdown(wait=False)
+
+    # PUBLIC METHODS
+    def step(self,dt):
+        """
+        Returns: True if every asset is finished, after finishing some more
+
+        This must be called on the main thread, once per frame.  It finishes the assets
+        whose decoding is done, until the time budget for the frame runs out.
+
+        :param dt: time in seconds since the last frame
+        :type dt:  ``int`` or ``float``
+        """
+        self._frames.append(dt)
+        stop = time.perf_counter()+self._budget
+        finished = 0
+        for entry in list(self._pending):
+            if finished and time.perf_counter() >= stop:
+                break
+            if not entry[2].done():
+                continue
+            self._pending.remove(entry)
+            self._finish(*entry)
+            finished += 1
+        if not self._pending:
+            self._pool.shutdown(wait=False)
+            return True
+        return False
+
+    def report(self):
+        """
+        Returns: a dictionary summarizing the preload, after logging it
+
+        The keys are 'assets', 'seconds', 'frames', and the frame time percentiles
+        'p50', 'p90', 'p99' and 'max' (in seconds, None if there were no frames).
+        """
+        result = {'assets': self._total, 'seconds': time.perf_counter()-self._start,
+                  'frames': len(self._frames), 'p50': percentile(self._frames,0.5),
+                  'p90': percentile(self._frames,0.9), 'p99': percentile(self._frames,0.99),
+                  'max': max(self._frames) if self._frames else None}
+        if self._frames:
+            Logger.info('Preloader: %d assets in %.3fs over %d frames; frame time '
+                        'p50 %.1fms, p90 %.1fms, p99 %.1fms, max %.1fms' %
+                        (result['assets'],result['seconds'],result['frames'],
+                         1000*result['p50'],1000*result['p90'],1000*result['p99'],
+                         1000*result['max']))
+        else:
+            Logger.info('Preloader: %d assets in %.3fs' % (result['assets'],result['seconds']))
+        return result
+
+    # HIDDEN METHODS
+    def _finish(self,kind,name,future):
+        """
+        Finishes loading a decoded asset on the main thread
+
+        An asset that fails to load is logged and skipped.  It will be loaded (or fail)
+        again when the game first uses it.
+
+        :param kind: the kind of asset
+        :type kind:  one of MANIFEST_KINDS
+
+        :param name: the file name
+        :type name:  ``str``
+
+        :param future: the decoding task
+        :type future:  ``Future``
+        """
+        from .app import GameApp
+        try:
+            result = future.result()
+            if kind == 'images':
+                from kivy.graphics.texture import Texture
+                texture = Texture.create_from_data(result,mipmap=True)
+                result.release_data()
+                GameApp.TEXTURE_CACHE.put(name,texture)
+            elif kind == 'fonts':
+                from kivy.core.text import Label
+                Label(text=' ',font_name=os.path.join(GameApp.fonts,name)).refresh()
+            else:
+                from .sound import Sound
+                GameApp.SOUND_CACHE[name] = Sound(name)
+        except Exception as e:
+            Logger.warning('Preloader: could not load %s (%s)' % (repr(name),e))
@@ -0,0 +1,335 @@
+"""
+A module to support recording and replaying player input.
+
+A recorder attached to the :class:`GInput` of a game writes a log of the input edges
+(key presses and releases, touches and touch releases) of every simulation tick.  A
+:class:`ReplayInput` reads such a log back.  It is a :class:`GInput` like any other,
+so it can be passed to any code that reads input, but it is not hooked up to a window:
+its state comes entirely from the log, one tick per call of the update step.
+
+Combined with a fixed timestep and seeded random numbers, replaying a log reproduces
+the session that recorded it.  The function :func:`run_replay` runs a log through any
+update function as fast as the CPU allows, for profiling and regression testing.
+
+A log is a text file of JSON values, one per line.  The first line is a header
+dictionary, and the last line is a footer dictionary with the number of ticks.  Every
+line in between is a tick with at least one event, as ``[tick, events]``, or as
+``[tick, events, dt]`` if the game did not use a fixed timestep (in which case every
+tick is written).  The events are
+
+* ``["d", key]``: the key went down
+* ``["u", key]``: the key went up
+* ``["t", x, y]``: the mouse went down (or moved while down) at (x,y)
+* ``["r"]``: the mouse went up
+* ``["a", notes]``: the game annotated the log with a dictionary of notes
+
+Annotations are written as soon as they are made, on a line of their own with the
+number of the tick that made them.  So a tick may be spread over several lines.
+
+Logs are read by :func:`read_log` of the module ``logformat``, which does not need
+Kivy, so that a log can also be read on a machine with no window.
+"""
+from .gview import GInput
+from introcs.geom import Point2
+from logformat import LOG_VERSION, read_log
+import json
+
+
+class InputRecorder(object):
+    """
+    A class representing a log of input being written.
+
+    Events are added with :meth:`event` as they happen, and are written out by
+    :meth:`tick` at the start of the tick that sees them.  Annotations are written
+    by :meth:`annotate` right away.  The log is only complete once :meth:`close` has
+    written its footer.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def ticks(self):
+        """
+        The number of ticks recorded so far.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._ticks
+
+    @property
+    def closed(self):
+        """
+        Whether the log has been closed.
+
+        **invariant**: Value is a ``bool``.
+        """
+        return self._file is None
+
+    # BUILT-IN METHODS
+    def __init__(self,path,tickrate=None):
+        """
+        Creates a recorder writing to a new log file
+
+        :param path: the file to write (replaced if it exists)
+        :type path:  ``str``
+
+        :param tickrate: the fixed timestep of the game, or None if there is none
+        :type tickrate:  ``int`` or ``float`` > 0, or None
+        """
+        assert type(path) == str, '%s is not a valid path' % repr(path)
+        assert tickrate is None or (type(tickrate) in [int,float] and tickrate > 0), \
+            '%s is not a valid tickrate' % repr(tickrate)
+        self._tickrate = tickrate
+        self._ticks = 0
+        self._events = []
+        self._file = open(path,'w')
+        self._write({'version': LOG_VERSION, 'tickrate': tickrate})
+
+    # PUBLIC METHODS
+    def event(self,*event):
+        """
+        Adds an event to the next tick
+
+        :param event: the event code and its arguments (see the module documentation)
+        :type event:  ``str`` followed by JSON values
+        """
+        self._events.append(list(event))
+
+    def tick(self,dt=None):
+        """
+        Writes out the events of a tick that is starting
+
+        :param dt: the time step of the tick (ignored with a fixed timestep)
+        :type dt:  ``int`` or ``float``, or None
+        """
+        if self._file is None:
+            return
+        if self._tickrate is None:
+            self._write([self._ticks,self._events,dt])
+        elif self._events:
+            self._write([self._ticks,self._events])
+        self._events = []
+        self._ticks += 1
+
+    def annotate(self,notes):
+        """
+        Writes an annotation for the current tick
+
+        The current tick is the last one started with :meth:`tick` (or the first tick,
+        if none has started yet).
+
+        :param notes: the notes to write
+        :type notes:  ``dict`` with JSON values
+        """
+        if self._file is None:
+            return
+        self._write([max(self._ticks-1,0),[['a',notes]]])
+
+    def close(self):
+        """
+        Writes the footer and closes the log
+
+        Events added since the last tick are lost.  Nothing happens if the log is
+        already closed.
+        """
+        if self._file is None:
+            return
+        self._write({'ticks': self._ticks})
+        self._file.close()
+        self._file = None
+
+    # HIDDEN METHODS
+    def _write(self,value):
+        """
+        Writes a single line of the log
+
+        :param value: the value to write
+        :type value:  any JSON value
+        """
+        self._file.write(json.dumps(value,separators=(',',':')))
+        self._file.write('\n')
+
+
+class ReplayInput(GInput):
+    """
+    A class representing input played back from a log.
+
+    This input handler is a drop-in replacement for the one provided by
+    :class:`GameApp`.  Each call to its hidden ``_prestep`` method (made by the game
+    before every update) applies the events of the next tick in the log, through the
+    same code that handles live keyboard and mouse events.  Once the log is finished,
+    no more events happen, and every key is left as it was.
+
+    The annotations in the log are collected in :attr:`notes` as the ticks are
+    played.
+    """
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def touch(self):
+        """
+        The current (x,y) coordinate of the mouse, if pressed.
+
+        **Immutable**: This value cannot be altered.
+
+        **Invariant**: Must be either a :class:`Point2` or None (if there is no touch).
+        """
+        if self._touch is None:
+            return None
+        return Point2(self._touch.x,self._touch.y)
+
+    @property
+    def header(self):
+        """
+        The header of the log.
+
+        **invariant**: Value is a ``dict``.
+        """
+        return dict(self._header)
+
+    @property
+    def tick(self):
+        """
+        The number of ticks played so far.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._tick
+
+    @property
+    def length(self):
+        """
+        The number of ticks in the log.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._length
+
+    @property
+    def done(self):
+        """
+        Whether every tick in the log has been played.
+
+        **invariant**: Value is a ``bool``.
+        """
+        return self._tick >= self._length
+
+    @property
+    def dt(self):
+        """
+        The time step recorded for the next tick.
+
+        With a fixed timestep, this is ``1/tickrate``.  It is None if the log has no
+        fixed timestep and is finished.
+
+        **invariant**: Value is a ``float`` > 0, or None.
+        """
+        if not self._header['tickrate'] is None:
+            return 1.0/self._header['tickrate']
+        if self._tick in self._ticks:
+            return self._ticks[self._tick][1]
+        return None
+
+    @property
+    def notes(self):
+        """
+        The annotations played so far, in order.
+
+        **invariant**: Value is a ``list`` of pairs (tick, ``dict``).
+        """
+        return self._notes
+
+    # BUILT-IN METHODS
+    def __init__(self,path):
+        """
+        Creates an input handler playing the given log
+
+        :param path: the log file to play
+        :type path:  ``str``
+        """
+        GInput.__init__(self)
+        self._keyboard_enabled = False
+        self._touch_enabled = False
+        self._header, footer, self._ticks = read_log(path)
+        self._length = footer['ticks']
+        self._tick = 0
+        self._notes = []
+
+    # PUBLIC METHODS
+    def annotate(self,**notes):
+        """
+        Does nothing, as a replay is not recorded.
+
+        :param notes: the notes to add
+        :type notes:  keyword arguments with JSON values
+        """
+        pass
+
+    def recall(self,name,default=None):
+        """
+        Returns the value of the first note called ``name`` in the log
+
+        Unlike :attr:`notes`, this looks at the whole log, including the ticks that
+        have not been played yet.
+
+        :param name: the name of the note
+        :type name:  ``str``
+
+        :param default: the value to return if the log has no such note
+        :type default:  any
+        """
+        for tick in sorted(self._ticks):
+            for event in self._ticks[tick][0]:
+                if event[0] == 'a' and name in event[1]:
+                    return event[1][name]
+        return default
+
+    # HIDDEN METHODS
+    def _prestep(self,dt=None):
+        """
+        Applies the events of the next tick in the log, then dirties the inputs.
+
+        :param dt: ignored (the log has its own time steps)
+        :type dt:  ``int`` or ``float``, or None
+        """
+        if self._tick in self._ticks:
+            for event in self._ticks[self._tick][0]:
+                code = event[0]
+                if code == 'd':
+                    self._capture_key(None,(None,event[1]),None,[])
+                elif code == 'u':
+                    self._release_key(None,(None,event[1]))
+                elif code == 't':
+                    self._capture_touch(None,Point2(event[1],event[2]))
+                elif code == 'r':
+                    self._release_touch(None,None)
+                elif code == 'a':
+                    self._notes.append((self._tick,event[1]))
+        if self._tick < self._length:
+            self._tick += 1
+        GInput._prestep(self)
+
+
+def run_replay(input,update):
+    """
+    Returns: the number of ticks played, after playing a log through an update function
+
+    This is a headless game loop.  For every tick left in the log, it does what
+    :class:`GameApp` does around its ``update`` method, calling ``update(input,dt)``
+    with the recorded time step.  It does not wait between ticks, so the log plays as
+    fast as ``update`` allows.
+
+    :param input: the log to play
+    :type input:  :class:`ReplayInput`
+
+    :param update: the function to call once per tick
+    :type update:  callable taking a :class:`GInput` and a ``float``
+    """
+    assert isinstance(input,ReplayInput), '%s is not a replay' % repr(input)
+    played = 0
+    while not input.done:
+        dt = input.dt
+        input._prestep()
+        update(input,dt)
+        input._poststep()
+        played += 1
+    return played
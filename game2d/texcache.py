@@ -0,0 +1,312 @@
+"""
+A module to support a bounded texture cache.
+
+Textures take GPU memory for as long as something references them.  The texture cache
+of :class:`GameApp` used to be a plain dictionary, so every image ever loaded stayed
+resident for the whole session.  This cache has a memory budget.  When the textures
+in it add up to more than the budget, the least recently used ones are dropped.
+
+Dropping a texture from the cache only drops the reference held by the cache.  Any
+object still displaying the texture keeps it alive, and it is freed once the last
+such object is gone.
+"""
+from collections import OrderedDict
+
+
+# The number of bytes per pixel of each Kivy color format
+CHANNELS = {'rgba': 4, 'bgra': 4, 'argb': 4, 'abgr': 4, 'rgb': 3, 'bgr': 3,
+            'luminance_alpha': 2, 'luminance': 1, 'red': 1, 'alpha': 1}
+
+
+def texture_bytes(texture):
+    """
+    Returns: an estimate of the GPU memory used by a texture
+
+    The estimate is width x height x channels, plus a third if the texture has mipmaps.
+
+    :param texture: the texture to measure
+    :type texture:  a Kivy ``Texture``
+    """
+    size = texture.width*texture.height*CHANNELS.get(texture.colorfmt,4)
+    if texture.mipmap:
+        size += size//3
+    return size
+
+
+class TextureCache(object):
+    """
+    A class representing a least-recently-used texture cache with a memory budget.
+
+    The cache maps image file names to textures.  It supports the dictionary operations
+    ``in``, ``[]``, ``del``, ``len`` and iteration, as well as ``get`` and ``pop``.
+    Looking up a texture (with ``get`` or ``[]``) marks it as recently used and counts
+    a hit or a miss.
+
+    A pinned texture is never evicted.  Pin the textures that are on screen all the
+    time, so that a burst of large one-off images cannot push them out.
+
+    The statistics (hits, misses, evictions and bytes resident) can be queried at any
+    time, either one at a time or all at once with :meth:`stats`.
+    """
+
+    # MUTABLE PROPERTIES
+    @property
+    def budget(self):
+        """
+        The number of bytes the cache may hold before it evicts textures.
+
+        Pinned textures count towards the budget, but are never evicted.  Lowering
+        the budget evicts textures right away.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._budget
+
+    @budget.setter
+    def budget(self,value):
+        assert type(value) == int and value >= 0, '%s is not a valid budget' % repr(value)
+        self._budget = value
+        self._evict()
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def bytes(self):
+        """
+        The estimated number of bytes resident in the cache.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._bytes
+
+    @property
+    def hits(self):
+        """
+        The number of lookups that found their texture.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        The number of lookups that did not find their texture.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._misses
+
+    @property
+    def evictions(self):
+        """
+        The number of textures evicted to stay within the budget.
+
+        **invariant**: Value is an ``int`` >= 0.
+        """
+        return self._evictions
+
+    # BUILT-IN METHODS
+    def __init__(self,budget=32*1024*1024):
+        """
+        Creates a new, empty texture cache
+
+        :param budget: the number of bytes the cache may hold
+        :type budget:  ``int`` >= 0
+        """
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._pinned = set()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self.budget = budget
+
+    def __contains__(self,name):
+        """
+        Returns True if ``name`` is in the cache (this is not counted as a lookup)
+        """
+        return name in self._entries
+
+    def __getitem__(self,name):
+        """
+        Returns the texture for ``name``, marking it as recently used
+
+        A ``KeyError`` is raised if ``name`` is not in the cache.
+        """
+        texture = self.get(name)
+        if texture is None:
+            raise KeyError(name)
+        return texture
+
+    def __setitem__(self,name,texture):
+        """
+        Adds the texture for ``name`` (see :meth:`put`)
+        """
+        self.put(name,texture)
+
+    def __delitem__(self,name):
+        """
+        Removes the texture for ``name``
+
+        A ``KeyError`` is raised if ``name`` is not in the cache.
+        """
+        if not name in self._entries:
+            raise KeyError(name)
+        self.pop(name)
+
+    def __iter__(self):
+        """
+        Returns an iterator over the names in the cache, least recently used first
+        """
+        return iter(list(self._entries))
+
+    def __len__(self):
+        """
+        Returns the number of textures in the cache
+        """
+        return len(self._entries)
+
+    def __repr__(self):
+        """
+        Returns an unambiguous representation of this cache
+        """
+        return '<%s of %d textures, %d/%d bytes>' % (self.__class__.__name__,
+                len(self._entries),self._bytes,self._budget)
+
+    # PUBLIC METHODS
+    def get(self,name,default=None):
+        """
+        Returns the texture for ``name``, or ``default`` if it is not in the cache
+
+        A texture found is marked as recently used.  Either way, the lookup is
+        counted as a hit or a miss.
+
+        :param name: the image file name
+        :type name:  ``str``
+        """
+        if name in self._entries:
+            self._hits += 1
+            self._entries.move_to_end(name)
+            return self._entries[name]
+        self._misses += 1
+        return default
+
+    def put(self,name,texture,size=None,pinned=False):
+        """
+        Adds the texture for ``name`` to the cache
+
+        Any texture already cached under ``name`` is replaced.  The new texture is the
+        most recently used, and the least recently used unpinned textures are then
+        evicted until the cache is within budget (or nothing is left to evict but the
+        new texture).
+
+        :param name: the image file name
+        :type name:  ``str``
+
+        :param texture: the texture to cache
+        :type texture:  a Kivy ``Texture``
+
+        :param size: the bytes to charge for the texture (estimated if None)
+        :type size:  ``int`` >= 0 or None
+
+        :param pinned: whether the texture may never be evicted
+        :type pinned:  ``bool``
+        """
+        assert type(name) == str, '%s is not a valid texture name' % repr(name)
+        if size is None:
+            size = texture_bytes(texture)
+        assert type(size) == int and size >= 0, '%s is not a valid size' % repr(size)
+        if name in self._entries:
+            self.pop(name)
+        self._entries[name] = texture
+        self._sizes[name] = size
+        self._bytes += size
+        if pinned:
+            self._pinned.add(name)
+        self._evict(name)
+
+    def pop(self,name,default=None):
+        """
+        Returns the texture for ``name`` after removing it from the cache
+
+        This also unpins the texture.  If ``name`` is not in the cache, this returns
+        ``default``.  This is not counted as a lookup.
+
+        :param name: the image file name
+        :type name:  ``str``
+        """
+        if not name in self._entries:
+            return default
+        self._bytes -= self._sizes.pop(name)
+        self._pinned.discard(name)
+        return self._entries.pop(name)
+
+    def pin(self,name):
+        """
+        Protects the texture for ``name`` from eviction
+
+        :param name: the name of a cached texture
+        :type name:  ``str``
+        """
+        assert name in self._entries, '%s is not in the cache' % repr(name)
+        self._pinned.add(name)
+
+    def unpin(self,name):
+        """
+        Allows the texture for ``name`` to be evicted again
+
+        :param name: the image file name
+        :type name:  ``str``
+        """
+        self._pinned.discard(name)
+        self._evict()
+
+    def is_pinned(self,name):
+        """
+        Returns True if the texture for ``name`` is pinned
+
+        :param name: the image file name
+        :type name:  ``str``
+        """
+        return name in self._pinned
+
+    def clear(self):
+        """
+        Removes every texture, pinned or not, from the cache
+
+        The statistics are not reset.
+        """
+        self._entries.clear()
+        self._sizes.clear()
+        self._pinned.clear()
+        self._bytes = 0
+
+    def stats(self):
+        """
+        Returns: a dictionary of the cache statistics
+
+        The keys are 'textures', 'pinned', 'bytes', 'budget', 'hits', 'misses' and
+        'evictions'.
+        """
+        return {'textures': len(self._entries), 'pinned': len(self._pinned),
+                'bytes': self._bytes, 'budget': self._budget, 'hits': self._hits,
+                'misses': self._misses, 'evictions': self._evictions}
+
+    # HIDDEN METHODS
+    def _evict(self,keep=None):
+        """
+        Evicts the least recently used unpinned textures until within budget
+
+        :param keep: a name that must not be evicted
+        :type keep:  ``str`` or None
+        """
+        if self._bytes <= self._budget:
+            return
+        for name in list(self._entries):
+            if self._bytes <= self._budget:
+                break
+            if name == keep or name in self._pinned:
+                continue
+            self.pop(name)
+            self._evictions += 1
@@ -0,0 +1,64 @@
+"""
+Input log reader for Alien Invaders
+
+This module reads the input logs written by the InputRecorder of game2d.  The
+format of a log is described in game2d/replay.py.  It is used both by the
+ReplayInput of game2d and by the LogInput of replay.py, so the two always
+agree on what a log means.
+
+Kiyam Merali km942, Eben Hill emh238
+12/03/2023
+"""
+import json
+
+# PRIMARY RULE: Like simulation.py, this module must never import game2d or
+# anything else that depends on Kivy.
+
+
+# The version of the log format
+LOG_VERSION = 1
+
+
+def read_log(path):
+    """
+    Returns the tuple (header, footer, ticks) of the log at path
+
+    The ticks are a dict from tick numbers to pairs (events, dt), where dt is
+    None in a log with a fixed timestep.  Ticks without events are left out of
+    such a log, and so are not in the dict.  A tick spread over several lines
+    (because of an annotation) has the events of every line, and the dt of
+    whichever line has one.  If the log has no footer, because the session did
+    not end cleanly, the footer counts the ticks that were written.
+
+    Parameter path: the log file to read
+    Precondition: path is a string naming a log written by game2d
+    """
+    header=None
+    footer=None
+    ticks={}
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            value=json.loads(line)
+            if header is None:
+                assert (isinstance(value,dict) and
+                value.get('version') == LOG_VERSION), \
+                '%s is not an input log' % repr(path)
+                header=value
+            elif isinstance(value,dict):
+                footer=value
+            else:
+                dt=value[2] if len(value) > 2 else None
+                if value[0] in ticks:
+                    events,first=ticks[value[0]]
+                    events.extend(value[1])
+                    if first is not None:
+                        dt=first
+                    ticks[value[0]]=(events,dt)
+                else:
+                    ticks[value[0]]=(value[1],dt)
+    assert header is not None, '%s is empty' % repr(path)
+    if footer is None:
+        footer={'ticks': max(ticks)+1 if ticks else 0}
+    return header,footer,ticks
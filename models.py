@@ -57,6 +57,8 @@ class Ship(GImage):
     inherited by GImage. You would only add attributes if you needed them
     for extra gameplay features (like animation).
     """
+    # No attributes beyond those of GImage (see GObject on __slots__)
+    __slots__ = ()
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getShipX(self):
@@ -66,12 +68,16 @@ class Ship(GImage):
         return self.x
 
     # INITIALIZER TO CREATE A NEW SHIP
-    def __init__(self):
+    def __init__(self,config=DEFAULT_CONFIG):
         """
         Initializes a ship object appearing at the bottom middle of the screen
+
+        Parameter config: the settings of the game (for the size of the ship)
+        Precondition: config is a GameConfig
         """
-        super().__init__(x=(GAME_WIDTH/2),width=SHIP_WIDTH,height=SHIP_HEIGHT,\
-        source=SHIP_IMAGE,bottom=SHIP_BOTTOM)
+        assert isinstance(config,GameConfig)
+        super().__init__(x=(GAME_WIDTH/2),width=config.ship_width,\
+        height=config.ship_height,source=SHIP_IMAGE,bottom=config.ship_bottom)
 
     # METHODS TO MOVE THE SHIP AND CHECK FOR COLLISIONS
     def moveShip(self,incr):
@@ -96,7 +102,7 @@ class Ship(GImage):
         assert isinstance(bolt,Bolt)
 
         if bolt.getVelocity()>0:
-            return self.contains((bolt.x,bolt.y))
+            return self.contains_xy(bolt.x,bolt.y)
         else:
             return False
 
@@ -119,9 +125,11 @@ class Alien(GImage):
     inherited by GImage. You would only add attributes if you needed them
     for extra gameplay features (like giving each alien a score value).
     """
+    # No attributes beyond those of GImage (see GObject on __slots__)
+    __slots__ = ()
 
     # INITIALIZER TO CREATE AN ALIEN
-    def __init__(self,x,y,source=ALIEN_IMAGES[0]):
+    def __init__(self,x,y,source=ALIEN_IMAGES[0],config=DEFAULT_CONFIG):
         """
         Initializes some alien dudes
 
@@ -133,13 +141,17 @@ class Alien(GImage):
 
         Parameter source: an image file to be displayed as the alien
         Precondition: source is a string
+
+        Parameter config: the settings of the game (for the size of the alien)
+        Precondition: config is a GameConfig
         """
         assert isinstance(x,int) or isinstance(x,float)
         assert isinstance(y,int) or isinstance(y,float)
         assert isinstance(source,str)
+        assert isinstance(config,GameConfig)
 
-        super().__init__(x=x,y=y,width=ALIEN_WIDTH,\
-        height=ALIEN_HEIGHT,source=source)
+        super().__init__(x=x,y=y,width=config.alien_width,\
+        height=config.alien_height,source=source)
 
     def moveAlienX(self,incr):
         """
@@ -172,17 +184,15 @@ class Alien(GImage):
         assert isinstance(bolt,Bolt)
 
         if bolt.getVelocity()<0:
-            return self.contains((bolt.x,bolt.y))
+            return self.contains_xy(bolt.x,bolt.y)
         else:
             return False
 
 
-def alien_row(x,y,src,num):
+def alien_row(x,y,src,num,config=DEFAULT_CONFIG):
     """
     Returns a row of aliens of the specified type
-    The aliens will be ALIEN_H_SEP apart from each other
-
-    There will be ALIENS_IN_ROW aliens in every row
+    The aliens will be alien_h_sep apart from each other
 
     Parameter x: The horizontal position of the first alien (far left) in row
     Precondition: x is a positive int or float
@@ -195,17 +205,21 @@ def alien_row(x,y,src,num):
 
     Parameter num: The number of aliens to be generated in row
     Precondition: num is an int and is not overstepping possible bounds
+
+    Parameter config: the settings of the game (for the size of the aliens)
+    Precondition: config is a GameConfig
     """
     assert isinstance(x,int) or isinstance(x,float) and x > 0
     assert isinstance(y,int) or isinstance(y,float) and y > 0
     assert isinstance(src,str)
     assert isinstance(num,int)
+    assert isinstance(config,GameConfig)
     xcor_accum=x
     list_accum=[]
     j=0
     while j < num:
-        list_accum.append(Alien(xcor_accum,y,source=src))
-        xcor_accum+=(ALIEN_H_SEP+ALIEN_WIDTH)
+        list_accum.append(Alien(xcor_accum,y,source=src,config=config))
+        xcor_accum+=(config.alien_h_sep+config.alien_width)
         j+=1
     return list_accum
 
@@ -215,7 +229,7 @@ class Bolt(GRectangle):
     A class representing a laser bolt.
 
     Laser bolts are often just thin, white rectangles. The size of the bolt
-    is determined by constants in consts.py. We MUST subclass GRectangle,
+    is determined by the GameConfig of the game. We MUST subclass GRectangle,
     because we need to add an extra (hidden) attribute for the velocity of
     the bolt.
 
@@ -235,6 +249,7 @@ class Bolt(GRectangle):
     # INSTANCE ATTRIBUTES:
     # Attribute _velocity: the velocity in y direction
     # Invariant: _velocity is an int or float
+    __slots__ = ('_velocity',)
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getVelocity(self):
@@ -244,13 +259,18 @@ class Bolt(GRectangle):
         return self._velocity
 
     # INITIALIZER TO SET THE VELOCITY
-    def __init__(self):
+    def __init__(self,config=DEFAULT_CONFIG):
         """
         Creates a Bolt() object
+
+        Parameter config: the settings of the game (for the size and speed
+        of the bolt)
+        Precondition: config is a GameConfig
         """
-        super().__init__(x=0,y=0,width=BOLT_WIDTH,height=BOLT_HEIGHT,\
-        fillcolor='blue',linecolor='blue')
-        self._velocity=BOLT_SPEED
+        assert isinstance(config,GameConfig)
+        super().__init__(x=0,y=0,width=config.bolt_width,\
+        height=config.bolt_height,fillcolor='blue',linecolor='blue')
+        self._velocity=config.bolt_speed
 
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
     def moveBolt(self):
@@ -275,4 +295,4 @@ class Bolt(GRectangle):
         Parameter obj: obj is any object
         Precondition: obj is an object
         """
-        return obj.contains((self.x,self.y))
+        return obj.contains_xy(self.x,self.y)
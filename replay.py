@@ -0,0 +1,363 @@
+"""
+Headless replay script for Alien Invaders
+
+This module plays a recorded session of Alien Invaders back without a window.
+Record a session by setting the environment variable INVADERS_RECORD to the
+name of a log file when starting the game.  Then run
+
+    python replay.py session.log
+
+to play the log through WaveSim as fast as the CPU allows.  It prints the
+number of ticks, how fast they were played, and how every wave ended.  Add
+the word profile after the file name to run the replay under cProfile.
+
+Invaders notes in the log which seed each wave was made with, when the ship
+respawns, and which ticks updated the wave.  That is all the replay needs
+from the states of Invaders, so the title screens and the messages are not
+played.  The session itself can be watched again by setting the environment
+variable INVADERS_REPLAY to the log file when starting the game.
+
+The waves are played with the GameConfig noted in the log, so a session
+recorded with a different number of aliens or alien speed on the command
+line plays back the same.
+
+Like simulation.py, this module never imports Kivy, so a log can be checked
+on a machine with no window.  That is why it reads the log with LogInput
+instead of the ReplayInput of game2d, which is a GInput and so needs Kivy.
+"""
+from consts import *
+from simulation import WaveSim, controls
+from logformat import read_log
+import time
+import sys
+
+# PRIMARY RULE: Like simulation.py, this module must never import game2d or
+# anything else that depends on Kivy.
+
+
+class LogInput(object):
+    """
+    A class to play the keys of a log written by game2d, without Kivy.
+
+    The log format is described in game2d/replay.py.  Each call to step applies
+    the events of the next tick in the log.  After it, is_key_down and
+    is_key_pressed answer as the ReplayInput of game2d does in the same tick,
+    and the annotations of the tick are added to getNotes.  Touches are ignored,
+    since Alien Invaders is played with the keyboard.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _tickrate: the fixed timestep of the log
+    # Invariant: _tickrate is a number > 0, or None if the log has no fixed
+    # timestep
+    #
+    # Attribute _ticks: the events of every tick with any
+    # Invariant: _ticks is a dict from tick numbers to pairs (events, dt)
+    #
+    # Attribute _length: the number of ticks in the log
+    # Invariant: _length is an int >= 0
+    #
+    # Attribute _tick: the number of ticks played so far
+    # Invariant: _tick is an int in 0.._length
+    #
+    # Attribute _down: the keys held down
+    # Invariant: _down is a set of strings
+    #
+    # Attribute _pressed: the keys pressed in the last tick played
+    # Invariant: _pressed is a set of strings
+    #
+    # Attribute _notes: the annotations played so far
+    # Invariant: _notes is a list of (tick, dict) pairs
+
+    # GETTERS
+    def getNotes(self):
+        """
+        Returns the list of (tick, notes) pairs of the annotations played so far
+        """
+        return self._notes
+
+    def getDone(self):
+        """
+        Returns True if every tick in the log has been played
+        """
+        return self._tick >= self._length
+
+    def getDt(self):
+        """
+        Returns the time step of the next tick (float), or None if the log
+        has no fixed timestep and is finished
+        """
+        if self._tickrate is not None:
+            return 1.0/self._tickrate
+        if self._tick in self._ticks:
+            return self._ticks[self._tick][1]
+        return None
+
+    # INITIALIZER
+    def __init__(self,path):
+        """
+        Initializes an input playing the log at path
+
+        Parameter path: the log file to play
+        Precondition: path is a string naming a log written by game2d
+        """
+        header,footer,self._ticks=read_log(path)
+        self._tickrate=header['tickrate']
+        self._length=footer['ticks']
+        self._tick=0
+        self._down=set()
+        self._pressed=set()
+        self._notes=[]
+
+    # METHODS
+    def is_key_down(self,key):
+        """
+        Returns True if key is held down
+
+        Parameter key: the name of the key
+        Precondition: key is a string
+        """
+        return key in self._down
+
+    def is_key_pressed(self,key):
+        """
+        Returns True if key went down in the last tick played
+
+        Parameter key: the name of the key
+        Precondition: key is a string
+        """
+        return key in self._pressed
+
+    def recall(self,name,default=None):
+        """
+        Returns the value of the first note called name in the whole log
+
+        Parameter name: the name of the note
+        Precondition: name is a string
+
+        Parameter default: the value to return if the log has no such note
+        Precondition: none
+        """
+        for tick in sorted(self._ticks):
+            for event in self._ticks[tick][0]:
+                if event[0] == 'a' and name in event[1]:
+                    return event[1][name]
+        return default
+
+    def step(self):
+        """
+        Applies the events of the next tick in the log
+        """
+        self._pressed.clear()
+        if self._tick in self._ticks:
+            for event in self._ticks[self._tick][0]:
+                code=event[0]
+                if code == 'd':
+                    if event[1] not in self._down:
+                        self._down.add(event[1])
+                        self._pressed.add(event[1])
+                elif code == 'u':
+                    self._down.discard(event[1])
+                elif code == 'a':
+                    self._notes.append((self._tick,event[1]))
+        if self._tick < self._length:
+            self._tick+=1
+
+
+def play_log(input,update):
+    """
+    Returns the number of ticks played, after playing every tick left in
+    input through update
+
+    This is the headless game loop of run_replay in game2d, for a LogInput.
+    It calls update(input,dt) once per tick with the recorded time step.
+
+    Parameter input: the log to play
+    Precondition: input is a LogInput
+
+    Parameter update: the function to call once per tick
+    Precondition: update is a function taking a LogInput and a float
+    """
+    assert isinstance(input,LogInput)
+    played=0
+    while not input.getDone():
+        dt=input.getDt()
+        input.step()
+        update(input,dt)
+        played+=1
+    return played
+
+
+class WaveReplay(object):
+    """
+    A class to play the waves of a recorded session through WaveSim.
+
+    The update method has the signature expected by play_log.  It follows
+    the notes Invaders left in the log to build each wave, respawn the ship,
+    and decide whether the wave is updated in a tick.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _sim: the wave being played
+    # Invariant: _sim is a WaveSim object, or None before the first wave
+    #
+    # Attribute _lattice: whether the waves store their formation as a lattice
+    # Invariant: _lattice is a bool
+    #
+    # Attribute _config: the settings the waves are made with
+    # Invariant: _config is a GameConfig
+    #
+    # Attribute _fed: whether the wave is updated in the current tick
+    # Invariant: _fed is a bool
+    #
+    # Attribute _ticks: the number of ticks the current wave was updated
+    # Invariant: _ticks is an int >= 0
+    #
+    # Attribute _seen: the number of notes of the log already followed
+    # Invariant: _seen is an int >= 0
+    #
+    # Attribute _results: how every finished wave ended
+    # Invariant: _results is a list of (seed, outcome, lives, aliens, steps)
+    # tuples, where outcome is 'won', 'lost' or 'quit'
+
+    # GETTERS AND SETTERS
+    def getSim(self):
+        """
+        Returns the WaveSim being played, or None before the first wave
+        """
+        return self._sim
+
+    def getResults(self):
+        """
+        Returns the list of (seed, outcome, lives, aliens, steps) tuples of
+        the waves played so far
+
+        The wave still being played (if any) is included with outcome 'quit'.
+        """
+        results=list(self._results)
+        if self._sim is not None and self._ticks > 0:
+            results.append(self._result('quit'))
+        return results
+
+    # INITIALIZER
+    def __init__(self,lattice=True,config=DEFAULT_CONFIG):
+        """
+        Initializes a replay with no wave
+
+        Parameter lattice: whether the waves store their formation as a lattice
+        Precondition: lattice is a bool
+
+        Parameter config: the settings the session was recorded with
+        Precondition: config is a GameConfig
+        """
+        assert isinstance(lattice,bool)
+        assert isinstance(config,GameConfig)
+        self._sim=None
+        self._lattice=lattice
+        self._config=config
+        self._fed=False
+        self._ticks=0
+        self._seen=0
+        self._results=[]
+
+    # UPDATE METHOD
+    def update(self,input,dt):
+        """
+        Plays a single tick of the log
+
+        Parameter input: the log being played
+        Precondition: input is a LogInput
+
+        Parameter dt: the time step of the tick
+        Precondition: dt is a number (int or float) >= 0
+        """
+        notes=input.getNotes()
+        while self._seen < len(notes):
+            self._follow(notes[self._seen][1])
+            self._seen+=1
+        if self._fed and self._sim is not None:
+            left,right,fire=controls(input)
+            self._sim.update(left,right,fire,dt)
+            self._ticks+=1
+            if self._sim.assert_win_conditions():
+                self._finish('won')
+            elif self._sim.assert_lose_conditions():
+                self._finish('lost')
+
+    # HELPER METHODS
+    def _follow(self,notes):
+        """
+        Follows the notes Invaders left in a tick
+
+        Parameter notes: the notes of the tick
+        Precondition: notes is a dict
+        """
+        if 'wave' in notes:
+            # Invaders may replace a wave before it is ever updated
+            if self._sim is not None and self._ticks > 0:
+                self._finish('quit')
+            self._sim=WaveSim(self._lattice,notes['wave'],self._config)
+            self._ticks=0
+        if notes.get('respawn') and self._sim is not None:
+            self._sim.setDead(False)
+            self._sim.respawn_ship()
+        if 'feed' in notes:
+            self._fed=notes['feed']
+
+    def _finish(self,outcome):
+        """
+        Records how the current wave ended and drops it
+
+        Parameter outcome: how the wave ended
+        Precondition: outcome is 'won', 'lost' or 'quit'
+        """
+        self._results.append(self._result(outcome))
+        self._sim=None
+        self._fed=False
+
+    def _result(self,outcome):
+        """
+        Returns the result tuple of the current wave
+
+        Parameter outcome: how the wave ended
+        Precondition: outcome is 'won', 'lost' or 'quit'
+        """
+        sim=self._sim
+        return (sim.getSeed(),outcome,sim.getLives(),
+        sim.getFormation().count(),sim.getSteps())
+
+
+def main(path,profile=False):
+    """
+    Plays the log at path and prints a summary
+
+    Parameter path: the log file to play
+    Precondition: path is a string naming a log written by Invaders
+
+    Parameter profile: whether to print a cProfile report of the replay
+    Precondition: profile is a bool
+    """
+    input=LogInput(path)
+    recorded=input.recall('config')
+    config=GameConfig(**recorded) if isinstance(recorded,dict) else DEFAULT_CONFIG
+    player=WaveReplay(config=config)
+    start=time.perf_counter()
+    if profile:
+        import cProfile
+        import pstats
+        profiler=cProfile.Profile()
+        ticks=profiler.runcall(play_log,input,player.update)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+    else:
+        ticks=play_log(input,player.update)
+    elapsed=time.perf_counter()-start
+    rate=ticks/elapsed if elapsed > 0 else float('inf')
+    print('%d ticks in %.3fs (%.0f ticks/s)' % (ticks,elapsed,rate))
+    for seed, outcome, lives, aliens, steps in player.getResults():
+        print('wave %d: %s with %d lives and %d aliens left after %d steps' %
+        (seed,outcome,lives,aliens,steps))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('usage: python replay.py LOG [profile]')
+        sys.exit(1)
+    main(sys.argv[1],len(sys.argv) > 2 and sys.argv[2] == 'profile')
@@ -0,0 +1,260 @@
+"""
+Binary save module for Alien Invaders
+
+This module turns the snapshots of a wave (see WaveSim.snapshot) into compact
+binary records and back.  It is meant for storing many mid-wave checkpoints,
+where JSON is both too slow and too large.
+
+A record is a fixed 16 byte header followed by a payload.  Every number is
+little-endian.  The header is
+
+    magic    4 bytes  b'AISV'
+    version  uint8    SAVE_VERSION
+    flags    uint8    the FLAG_ bits below
+    rows     uint16   the rows of the formation
+    cols     uint16   the columns of the formation
+    bolts    uint16   the number of active bolts
+    size     uint32   the number of bytes in the payload, as stored
+
+and the payload (compressed with zlib if FLAG_COMPRESSED is set) is
+
+    scalars  shipx, prevshipx, time, gauss (float64), seed (int64),
+             lives, nextshot, steps, peak, dropped (int32)
+    random   625 uint32: the Mersenne Twister state and its position
+    origin   2 float64 (lattice formations only)
+    x, y     rows*cols float64 each (other formations only)
+    alive    the alive mask, packed 8 aliens to a byte in row-major order
+    bolts    4 float64 per active bolt: x, y, prevy, velocity
+
+Records are parsed straight out of the buffer with struct and NumPy, so a file
+of records can be memory mapped and read with unpack_from without copying it.
+No Python object is made per alien.
+
+Kiyam Merali km942, Eben Hill emh238
+12/03/2023
+"""
+from simulation import WaveSnapshot
+import numpy as np
+import struct
+import zlib
+
+# PRIMARY RULE: Like simulation.py, this module must never import game2d or
+# anything else that depends on Kivy.
+
+
+# The version of the record format
+SAVE_VERSION = 1
+
+# The bits of the flags in the header
+FLAG_COMPRESSED = 1
+FLAG_LATTICE    = 2
+FLAG_SHIPALIVE  = 4
+FLAG_DIRECTION  = 8
+FLAG_DEAD       = 16
+FLAG_SEEDED     = 32
+FLAG_GAUSS      = 64
+
+# The layouts of the fixed parts of a record
+_HEADER  = struct.Struct('<4sBBHHHI')
+_SCALARS = struct.Struct('<4dq5i')
+_ORIGIN  = struct.Struct('<2d')
+_MAGIC   = b'AISV'
+
+# The number of words in the state of random.Random (624 plus the position)
+_RANDOM_WORDS = 625
+
+
+def pack(snapshot,compress=False):
+    """
+    Returns the snapshot of a wave as a binary record (bytes)
+
+    Parameter snapshot: the state of a wave
+    Precondition: snapshot is a WaveSnapshot whose seed (if any) fits in a
+    signed 64 bit int
+
+    Parameter compress: whether to compress the payload with zlib
+    Precondition: compress is a bool
+    """
+    assert isinstance(snapshot,WaveSnapshot)
+    assert isinstance(compress,bool)
+    version,words,gauss=snapshot.random
+    assert version == 3 and len(words) == _RANDOM_WORDS
+    bolts,peak,dropped=snapshot.bolts
+    alive=np.frombuffer(snapshot.formation[-1],dtype=bool)
+
+    flags=0
+    if snapshot.lattice:
+        flags|=FLAG_LATTICE
+    if snapshot.shipalive:
+        flags|=FLAG_SHIPALIVE
+    if snapshot.direction:
+        flags|=FLAG_DIRECTION
+    if snapshot.dead:
+        flags|=FLAG_DEAD
+    if snapshot.seed is not None:
+        flags|=FLAG_SEEDED
+    if gauss is not None:
+        flags|=FLAG_GAUSS
+
+    parts=[_SCALARS.pack(snapshot.shipx,snapshot.prevshipx,snapshot.time,
+    gauss or 0.0,snapshot.seed or 0,snapshot.lives,snapshot.nextshot,
+    snapshot.steps,peak,dropped),np.array(words,dtype='<u4').tobytes()]
+    if snapshot.lattice:
+        parts.append(_ORIGIN.pack(snapshot.formation[0],snapshot.formation[1]))
+    else:
+        parts.append(np.frombuffer(snapshot.formation[0]).astype('<f8').tobytes())
+        parts.append(np.frombuffer(snapshot.formation[1]).astype('<f8').tobytes())
+    parts.append(np.packbits(alive,bitorder='little').tobytes())
+    parts.append(np.array(bolts,dtype='<f8').tobytes())
+    payload=b''.join(parts)
+    if compress:
+        payload=zlib.compress(payload)
+        flags|=FLAG_COMPRESSED
+
+    rows,cols=snapshot.shape
+    return _HEADER.pack(_MAGIC,SAVE_VERSION,flags,rows,cols,len(bolts),
+    len(payload))+payload
+
+
+def unpack_from(buffer,offset=0):
+    """
+    Returns the tuple (snapshot, end) for the record at offset in buffer
+
+    The snapshot is a WaveSnapshot and end is the offset just after the
+    record, where the next record (if any) starts.  The record is read
+    through a memoryview, so buffer may be a bytes object, a bytearray or a
+    memory mapped file.
+
+    This function raises a ValueError if there is no valid record at offset.
+
+    Parameter buffer: the buffer holding the record
+    Precondition: buffer is a bytes-like object
+
+    Parameter offset: the position of the record in buffer
+    Precondition: offset is an int >= 0
+    """
+    view=memoryview(buffer).cast('B')
+    if len(view)-offset < _HEADER.size:
+        raise ValueError('truncated save record header')
+    magic,version,flags,rows,cols,count,size=_HEADER.unpack_from(view,offset)
+    if magic != _MAGIC:
+        raise ValueError('not a save record')
+    if version != SAVE_VERSION:
+        raise ValueError('unsupported save version %d' % version)
+    start=offset+_HEADER.size
+    end=start+size
+    if len(view) < end:
+        raise ValueError('truncated save record')
+    payload=view[start:end]
+    if flags & FLAG_COMPRESSED:
+        try:
+            payload=memoryview(zlib.decompress(payload))
+        except zlib.error:
+            raise ValueError('corrupt save record')
+    if len(payload) != _payload_size(flags,rows*cols,count):
+        raise ValueError('corrupt save record')
+
+    values=_SCALARS.unpack_from(payload,0)
+    shipx,prevshipx,time,gauss,seed,lives,nextshot,steps,peak,dropped=values
+    pos=_SCALARS.size
+    words=np.frombuffer(payload,dtype='<u4',count=_RANDOM_WORDS,offset=pos)
+    pos+=words.nbytes
+    cells=rows*cols
+    lattice=bool(flags & FLAG_LATTICE)
+    if lattice:
+        formation=_ORIGIN.unpack_from(payload,pos)
+        pos+=_ORIGIN.size
+    else:
+        x=np.frombuffer(payload,dtype='<f8',count=cells,offset=pos)
+        pos+=x.nbytes
+        y=np.frombuffer(payload,dtype='<f8',count=cells,offset=pos)
+        pos+=y.nbytes
+        formation=(x.astype(float).tobytes(),y.astype(float).tobytes())
+    packed=np.frombuffer(payload,dtype=np.uint8,count=(cells+7)//8,offset=pos)
+    pos+=packed.nbytes
+    alive=np.unpackbits(packed,count=cells,bitorder='little').astype(bool)
+    formation+=(alive.tobytes(),)
+    bolts=np.frombuffer(payload,dtype='<f8',count=4*count,offset=pos)
+    bolts=tuple(tuple(bolt) for bolt in bolts.reshape(count,4).tolist())
+
+    snapshot=WaveSnapshot(seed if flags & FLAG_SEEDED else None,
+    (3,tuple(words.tolist()),gauss if flags & FLAG_GAUSS else None),
+    shipx,prevshipx,bool(flags & FLAG_SHIPALIVE),lives,time,
+    bool(flags & FLAG_DIRECTION),bool(flags & FLAG_DEAD),nextshot,steps,
+    lattice,(rows,cols),formation,(bolts,peak,dropped))
+    return snapshot,end
+
+
+def _payload_size(flags,cells,count):
+    """
+    Returns the number of bytes in the (uncompressed) payload of a record
+
+    Parameter flags: the flags of the record
+    Precondition: flags is an int
+
+    Parameter cells: the number of aliens in the formation (rows*cols)
+    Precondition: cells is an int >= 0
+
+    Parameter count: the number of active bolts
+    Precondition: count is an int >= 0
+    """
+    size=_SCALARS.size+4*_RANDOM_WORDS
+    if flags & FLAG_LATTICE:
+        size+=_ORIGIN.size
+    else:
+        size+=2*8*cells
+    return size+(cells+7)//8+4*8*count
+
+
+def unpack(data):
+    """
+    Returns the WaveSnapshot stored in the binary record data
+
+    This function raises a ValueError if data is not a single valid record.
+
+    Parameter data: the record
+    Precondition: data is a bytes-like object
+    """
+    snapshot,end=unpack_from(data)
+    if end != memoryview(data).nbytes:
+        raise ValueError('trailing data after save record')
+    return snapshot
+
+
+def save(path,snapshots,compress=False):
+    """
+    Writes the snapshots to a new file, one record after the other
+
+    Parameter path: the file to write (replaced if it exists)
+    Precondition: path is a string
+
+    Parameter snapshots: the states to save
+    Precondition: snapshots is an iterable of WaveSnapshot objects
+
+    Parameter compress: whether to compress the payloads with zlib
+    Precondition: compress is a bool
+    """
+    with open(path,'wb') as file:
+        for snapshot in snapshots:
+            file.write(pack(snapshot,compress))
+
+
+def load(path):
+    """
+    Returns the list of snapshots saved in the file at path
+
+    This function raises a ValueError if the file is not a sequence of valid
+    records.
+
+    Parameter path: the file to read
+    Precondition: path is a string
+    """
+    with open(path,'rb') as file:
+        data=file.read()
+    snapshots=[]
+    offset=0
+    while offset < len(data):
+        snapshot,offset=unpack_from(data,offset)
+        snapshots.append(snapshot)
+    return snapshots
+
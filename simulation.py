@@ -0,0 +1,1646 @@
+"""
+Headless simulation module for Alien Invaders
+
+This module contains the rules for a single wave of Alien Invaders with no
+graphics attached.  Nothing in this module imports Kivy, so a WaveSim can be
+built and stepped thousands of times (for balancing or regression runs)
+without paying for textures or drawing instructions that are never shown.
+
+The class Wave in wave.py is a thin adapter around WaveSim.  It translates
+GInput into the three controls the simulation understands (left, right and
+fire) and mirrors the simulation state onto the Ship, Alien and Bolt models
+when it is time to draw.
+
+Kiyam Merali km942, Eben Hill emh238
+12/03/2023
+"""
+from consts import *
+import numpy as np
+import collections
+import random
+import bisect
+import math
+
+# PRIMARY RULE: The simulation may only access consts.py.  It must never import
+# game2d, models.py or anything else that depends on Kivy.
+
+
+def controls(input):
+    """
+    Returns the controls of the simulation as a tuple (left,right,fire)
+
+    Left and right are held down with the arrow keys, and the spacebar fires.
+    The input is only asked about keys, so this works with the GInput of a
+    game as well as with a log read without Kivy (see replay.py).
+
+    Parameter input: user input controlling ship and bolts
+    Precondition: input has the methods is_key_down and is_key_pressed of GInput
+    """
+    return (input.is_key_down('left'),input.is_key_down('right'),
+    input.is_key_pressed('spacebar'))
+
+
+class SpatialHash(object):
+    """
+    A class to represent a uniform grid spatial hash.
+
+    The plane is divided into cells of the given width and height, and every
+    item is stored in each cell its bounding box overlaps.  A query returns
+    the items in the cells overlapped by a box, which is a small superset of
+    the items that can actually collide with it.  Items are kept in insertion
+    order within a cell.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _width: the width of a cell
+    # Invariant: _width is a number > 0
+    #
+    # Attribute _height: the height of a cell
+    # Invariant: _height is a number > 0
+    #
+    # Attribute _cells: the items in each non-empty cell
+    # Invariant: _cells is a dict mapping (col,row) int pairs to lists
+
+    def __init__(self,width,height):
+        """
+        Initializes an empty spatial hash with cells of the given size
+
+        Parameter width: the width of a cell
+        Precondition: width is a number > 0
+
+        Parameter height: the height of a cell
+        Precondition: height is a number > 0
+        """
+        assert isinstance(width,int) or isinstance(width,float)
+        assert isinstance(height,int) or isinstance(height,float)
+        assert width > 0 and height > 0
+        self._width=width
+        self._height=height
+        self._cells={}
+
+    def clear(self):
+        """
+        Removes every item from the hash
+        """
+        self._cells.clear()
+
+    def insert(self,item,left,bottom,right,top):
+        """
+        Adds item to every cell overlapped by the given box
+
+        Parameter item: the item to store
+        Precondition: item is any value
+
+        Parameter left: the left edge of the box
+        Precondition: left is a number <= right
+
+        Parameter bottom: the bottom edge of the box
+        Precondition: bottom is a number <= top
+
+        Parameter right: the right edge of the box
+        Precondition: right is a number
+
+        Parameter top: the top edge of the box
+        Precondition: top is a number
+        """
+        cells=self._cells
+        for col in range(int(left//self._width),int(right//self._width)+1):
+            for row in range(int(bottom//self._height),int(top//self._height)+1):
+                key=(col,row)
+                if key in cells:
+                    cells[key].append(item)
+                else:
+                    cells[key]=[item]
+
+    def query(self,left,bottom,right,top):
+        """
+        Returns the list of items in the cells overlapped by the given box
+
+        An item that spans several of these cells appears once per cell.
+
+        Parameter left: the left edge of the box
+        Precondition: left is a number <= right
+
+        Parameter bottom: the bottom edge of the box
+        Precondition: bottom is a number <= top
+
+        Parameter right: the right edge of the box
+        Precondition: right is a number
+
+        Parameter top: the top edge of the box
+        Precondition: top is a number
+        """
+        cells=self._cells
+        result=[]
+        for col in range(int(left//self._width),int(right//self._width)+1):
+            for row in range(int(bottom//self._height),int(top//self._height)+1):
+                items=cells.get((col,row))
+                if items:
+                    result.extend(items)
+        return result
+
+
+class FormationIndex(object):
+    """
+    A class to represent the survivors of a formation.
+
+    The index tracks the number of living aliens, the bottom-most survivor of
+    every column, the first and last survivor of every row, the leftmost and
+    rightmost non-empty columns, the lowest non-empty row and the sorted list
+    of non-empty columns.  It is built once from the alive mask and then
+    updated every time an alien dies, so none of the questions the game asks
+    every frame (who fires, where is the edge, is anyone left, how low are
+    they) needs a scan of the grid.
+
+    Removing an alien only moves the affected pointers past dead aliens.  A
+    pointer never moves back, so over a whole wave each row and column is
+    walked at most once and the cost of a removal is O(1) amortized.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _grid: which aliens are alive
+    # Invariant: _grid is a rectangular 2d list of bools
+    #
+    # Attribute _count: the number of living aliens
+    # Invariant: _count is an int >= 0
+    #
+    # Attribute _rowcount: the number of living aliens in each row
+    # Invariant: _rowcount is a list of ints >= 0
+    #
+    # Attribute _colcount: the number of living aliens in each column
+    # Invariant: _colcount is a list of ints >= 0
+    #
+    # Attribute _first: the column of the first survivor in each row
+    # Invariant: _first is a list of ints (None for empty rows)
+    #
+    # Attribute _last: the column of the last survivor in each row
+    # Invariant: _last is a list of ints (None for empty rows)
+    #
+    # Attribute _bottom: the row of the bottom survivor in each column
+    # Invariant: _bottom is a list of ints (None for empty columns)
+    #
+    # Attribute _columns: the non-empty columns in increasing order
+    # Invariant: _columns is a sorted list of ints
+    #
+    # Attribute _left: the leftmost non-empty column
+    # Invariant: _left is an int (None if the formation is empty)
+    #
+    # Attribute _right: the rightmost non-empty column
+    # Invariant: _right is an int (None if the formation is empty)
+    #
+    # Attribute _low: the lowest (largest index) non-empty row
+    # Invariant: _low is an int (None if the formation is empty)
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def count(self):
+        """
+        The number of living aliens
+        """
+        return self._count
+
+    @property
+    def first(self):
+        """
+        The list of the first surviving column of each row (None if empty)
+
+        This list is owned by the index and must not be modified.
+        """
+        return self._first
+
+    @property
+    def last(self):
+        """
+        The list of the last surviving column of each row (None if empty)
+
+        This list is owned by the index and must not be modified.
+        """
+        return self._last
+
+    @property
+    def bottom(self):
+        """
+        The list of the bottom surviving row of each column (None if empty)
+
+        This list is owned by the index and must not be modified.
+        """
+        return self._bottom
+
+    @property
+    def columns(self):
+        """
+        The sorted list of the non-empty columns
+
+        This list is owned by the index and must not be modified.
+        """
+        return self._columns
+
+    @property
+    def leftmost(self):
+        """
+        The leftmost non-empty column, or None if every alien is dead
+        """
+        return self._left
+
+    @property
+    def rightmost(self):
+        """
+        The rightmost non-empty column, or None if every alien is dead
+        """
+        return self._right
+
+    @property
+    def lowest(self):
+        """
+        The lowest non-empty row, or None if every alien is dead
+        """
+        return self._low
+
+    def __init__(self,alive):
+        """
+        Initializes the index from an alive mask
+
+        Parameter alive: which aliens are alive
+        Precondition: alive is a (rows,cols) bool array
+        """
+        self._grid=alive.tolist()
+        rows=len(self._grid)
+        cols=len(self._grid[0])
+        self._rowcount=[sum(line) for line in self._grid]
+        self._colcount=[sum(self._grid[row][col] for row in range(rows))
+                        for col in range(cols)]
+        self._count=sum(self._rowcount)
+        self._first=[None]*rows
+        self._last=[None]*rows
+        for row in range(rows):
+            if self._rowcount[row]:
+                line=self._grid[row]
+                self._first[row]=line.index(True)
+                self._last[row]=cols-1-line[::-1].index(True)
+        self._bottom=[None]*cols
+        for col in range(cols):
+            for row in range(rows-1,-1,-1):
+                if self._grid[row][col]:
+                    self._bottom[col]=row
+                    break
+        self._columns=[col for col in range(cols) if self._colcount[col]]
+        filled=[row for row in range(rows) if self._rowcount[row]]
+        self._left=self._columns[0] if self._columns else None
+        self._right=self._columns[-1] if self._columns else None
+        self._low=filled[-1] if filled else None
+
+    def remove(self,row,col):
+        """
+        Records the death of the alien at (row,col)
+
+        Parameter row: the row of the alien
+        Precondition: row is an int and the alien at (row,col) is alive
+
+        Parameter col: the column of the alien
+        Precondition: col is an int and the alien at (row,col) is alive
+        """
+        grid=self._grid
+        assert grid[row][col]
+        grid[row][col]=False
+        self._count-=1
+        self._rowcount[row]-=1
+        self._colcount[col]-=1
+
+        # Row pointers
+        if self._rowcount[row] == 0:
+            self._first[row]=None
+            self._last[row]=None
+            if self._low == row:
+                low=row
+                while low >= 0 and self._rowcount[low] == 0:
+                    low-=1
+                self._low=low if low >= 0 else None
+        else:
+            line=grid[row]
+            if self._first[row] == col:
+                pos=col
+                while not line[pos]:
+                    pos+=1
+                self._first[row]=pos
+            if self._last[row] == col:
+                pos=col
+                while not line[pos]:
+                    pos-=1
+                self._last[row]=pos
+
+        # Column pointers
+        if self._colcount[col] == 0:
+            self._bottom[col]=None
+            del self._columns[bisect.bisect_left(self._columns,col)]
+            if self._columns:
+                self._left=self._columns[0]
+                self._right=self._columns[-1]
+            else:
+                self._left=None
+                self._right=None
+        elif self._bottom[col] == row:
+            pos=row
+            while not grid[pos][col]:
+                pos-=1
+            self._bottom[col]=pos
+
+
+class Formation(object):
+    """
+    A class to represent the alien formation as a structure of arrays.
+
+    Instead of a 2d list of alien objects, the formation is four NumPy arrays
+    of shape (rows,cols): the x and y coordinates of the alien centers, a
+    mask of which aliens are alive, and the image index of each alien.  Row 0
+    is the top row.  Every alien is a box alien_width wide and alien_height
+    tall (see GameConfig) centered at its coordinates.
+
+    Moving the formation is a single vectorized offset, and the bounds and
+    edge checks are array reductions, so the cost of a march step does not
+    grow with the number of aliens the way per-object updates do.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _x: the x coordinates of the alien centers
+    # Invariant: _x is a (rows,cols) float array
+    #
+    # Attribute _y: the y coordinates of the alien centers
+    # Invariant: _y is a (rows,cols) float array
+    #
+    # Attribute _alive: which aliens are alive
+    # Invariant: _alive is a (rows,cols) bool array
+    #
+    # Attribute _kind: the image index of each alien in ALIEN_IMAGES
+    # Invariant: _kind is a (rows,cols) int array
+    #
+    # Attribute _index: the survivors of the formation
+    # Invariant: _index is a FormationIndex matching _alive
+    #
+    # Attribute _hash: the broad-phase index of the living aliens
+    # Invariant: _hash is a SpatialHash keyed on the alien lattice pitch
+    #
+    # Attribute _hashed: whether _hash matches the current positions
+    # Invariant: _hashed is a bool
+    #
+    # Attribute _halfwidth, _halfheight: half the size of an alien
+    # Invariant: _halfwidth and _halfheight are floats > 0
+    #
+    # Attribute _pitchx, _pitchy: the distance between neighboring aliens
+    # Invariant: _pitchx and _pitchy are numbers > 0
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def rows(self):
+        """
+        The number of rows in the formation
+        """
+        return self._alive.shape[0]
+
+    @property
+    def cols(self):
+        """
+        The number of columns in the formation
+        """
+        return self._alive.shape[1]
+
+    @property
+    def x(self):
+        """
+        The (rows,cols) array of x coordinates (dead aliens included)
+        """
+        return self._x
+
+    @property
+    def y(self):
+        """
+        The (rows,cols) array of y coordinates (dead aliens included)
+        """
+        return self._y
+
+    @property
+    def alive(self):
+        """
+        The (rows,cols) mask of living aliens
+        """
+        return self._alive
+
+    @property
+    def kind(self):
+        """
+        The (rows,cols) array of image indices into ALIEN_IMAGES
+        """
+        return self._kind
+
+    @property
+    def index(self):
+        """
+        The FormationIndex of the survivors of this formation
+        """
+        return self._index
+
+    def __init__(self,x,y,num_col,num_rows,config=DEFAULT_CONFIG):
+        """
+        Initializes a full formation with the type alternating every two rows
+
+        Parameter x: x coordinate of the first (top left) alien in the grid
+        Precondition: x is a float or int
+
+        Parameter y: y coordinate of the first (top left) alien in the grid
+        Precondition: y is a float or int
+
+        Parameter num_col: number of columns in the grid
+        Precondition: int, >0
+
+        Parameter num_rows: number of rows in the grid
+        Precondition: int, >0
+
+        Parameter config: the settings of the game (for the size of an alien)
+        Precondition: config is a GameConfig
+        """
+        assert isinstance(x,float) or isinstance(x,int)
+        assert isinstance(y,float) or isinstance(y,int)
+        assert isinstance(num_col,int) and num_col > 0
+        assert isinstance(num_rows,int) and num_rows > 0
+        assert isinstance(config,GameConfig)
+        self._halfwidth=config.alien_width/2
+        self._halfheight=config.alien_height/2
+        self._pitchx=config.alien_width+config.alien_h_sep
+        self._pitchy=config.alien_height+config.alien_v_sep
+        cols=np.arange(num_col,dtype=float)
+        rows=np.arange(num_rows,dtype=float)
+        self._x=np.empty((num_rows,num_col))
+        self._x[:]=x+cols*self._pitchx
+        self._y=np.empty((num_rows,num_col))
+        self._y[:]=(y-rows*self._pitchy)[:,np.newaxis]
+        self._alive=np.ones((num_rows,num_col),dtype=bool)
+        self._kind=np.empty((num_rows,num_col),dtype=np.int8)
+        self._kind[:]=((np.arange(num_rows)//2) % len(ALIEN_IMAGES))[:,np.newaxis]
+        self._index=FormationIndex(self._alive)
+        self._hash=SpatialHash(self._pitchx,self._pitchy)
+        self._hashed=False
+
+    def move(self,incr_x,incr_y):
+        """
+        Moves the whole formation by (incr_x,incr_y)
+
+        Parameter incr_x: the movement on the x-axis
+        Precondition: incr_x is a number
+
+        Parameter incr_y: the movement on the y-axis
+        Precondition: incr_y is a number
+        """
+        if incr_x:
+            self._x+=incr_x
+            self._hashed=False
+        if incr_y:
+            self._y+=incr_y
+            self._hashed=False
+
+    def count(self):
+        """
+        Returns the number of living aliens
+        """
+        return self._index.count
+
+    def row_extents(self):
+        """
+        Returns the x coordinates of the first and last alien of every row
+
+        The result is a pair of lists with one entry per row.  Empty rows
+        have None in both lists.
+        """
+        index=self._index
+        first=[]
+        last=[]
+        for row in range(len(index.first)):
+            if index.first[row] is None:
+                first.append(None)
+                last.append(None)
+            else:
+                first.append(self.position(row,index.first[row])[0])
+                last.append(self.position(row,index.last[row])[0])
+        return first,last
+
+    def lowest(self):
+        """
+        Returns the y coordinate of the lowest living alien, or None
+        """
+        row=self._index.lowest
+        if row is None:
+            return None
+        return self.position(row,self._index.first[row])[1]
+
+    def non_empty_columns(self):
+        """
+        Returns the sorted list of indices of columns with a living alien
+
+        This list is owned by the formation index and must not be modified.
+        """
+        return self._index.columns
+
+    def bottom_alien(self,col):
+        """
+        Returns the row of the bottom living alien in column col, or None
+
+        Parameter col: the column to search
+        Precondition: col is an int in 0..cols-1
+        """
+        return self._index.bottom[col]
+
+    def kill(self,row,col):
+        """
+        Kills the living alien at (row,col)
+
+        Parameter row: the alien row
+        Precondition: row is an int and the alien at (row,col) is alive
+
+        Parameter col: the alien column
+        Precondition: col is an int and the alien at (row,col) is alive
+        """
+        self._alive[row,col]=False
+        self._index.remove(row,col)
+
+    def position(self,row,col):
+        """
+        Returns the center (x,y) of the alien at the given row and column
+
+        Parameter row: the alien row
+        Precondition: row is an int in 0..rows-1
+
+        Parameter col: the alien column
+        Precondition: col is an int in 0..cols-1
+        """
+        return float(self._x[row,col]),float(self._y[row,col])
+
+    def kill_at(self,x,y,halfwidth=0,halfheight=0):
+        """
+        Kills the first alien containing (x,y) and returns True if there was one
+
+        The first alien is the first in row-major order.  Only the aliens in
+        the hash cells overlapped by the box of the given half extents around
+        (x,y) are tested, which is usually one or two cells for a bolt.
+
+        Parameter x: the x coordinate of the point
+        Precondition: x is a number (int or float)
+
+        Parameter y: the y coordinate of the point
+        Precondition: y is a number (int or float)
+
+        Parameter halfwidth: half the width of the box to query
+        Precondition: halfwidth is a number >= 0
+
+        Parameter halfheight: half the height of the box to query
+        Precondition: halfheight is a number >= 0
+        """
+        if not self._hashed:
+            self._rehash()
+        alive=self._alive.flat
+        xs=self._x.flat
+        ys=self._y.flat
+        best=None
+        query=self._hash.query(x-halfwidth,y-halfheight,x+halfwidth,y+halfheight)
+        halfwidth=self._halfwidth
+        halfheight=self._halfheight
+        for pos in query:
+            if (alive[pos] and (best is None or pos < best) and
+                abs(xs[pos]-x) < halfwidth and abs(ys[pos]-y) < halfheight):
+                best=pos
+        if best is None:
+            return False
+        self.kill(*divmod(best,self._alive.shape[1]))
+        return True
+
+    def kill_along(self,x,y0,y1,halfwidth=0):
+        """
+        Kills the first alien on the path from (x,y0) to (x,y1) and returns
+        True if there was one
+
+        This is the swept version of kill_at.  It tests the whole vertical
+        segment the point covered in a frame, so a point moving faster than
+        an alien is tall cannot jump over it.  The first alien is the one the
+        point enters first going from y0 to y1 (ties are broken in row-major
+        order).  If y0 and y1 are equal, this is the same as kill_at.
+
+        Parameter x: the x coordinate of the path
+        Precondition: x is a number (int or float)
+
+        Parameter y0: the y coordinate at the start of the path
+        Precondition: y0 is a number (int or float)
+
+        Parameter y1: the y coordinate at the end of the path
+        Precondition: y1 is a number (int or float)
+
+        Parameter halfwidth: half the width of the box to query
+        Precondition: halfwidth is a number >= 0
+        """
+        if not self._hashed:
+            self._rehash()
+        low=min(y0,y1)
+        high=max(y0,y1)
+        up=y1 >= y0
+        alive=self._alive.flat
+        xs=self._x.flat
+        ys=self._y.flat
+        best=None
+        entry=None
+        query=self._hash.query(x-halfwidth,low,x+halfwidth,high)
+        halfwidth=self._halfwidth
+        halfheight=self._halfheight
+        for pos in query:
+            if not alive[pos] or abs(xs[pos]-x) >= halfwidth:
+                continue
+            bottom=ys[pos]-halfheight
+            top=ys[pos]+halfheight
+            if low >= top or high <= bottom:
+                continue
+            edge=bottom if up else -top
+            if best is None or edge < entry or (edge == entry and pos < best):
+                best=pos
+                entry=edge
+        if best is None:
+            return False
+        self.kill(*divmod(best,self._alive.shape[1]))
+        return True
+
+    def snapshot(self):
+        """
+        Returns the positions and survivors of the formation as a tuple of
+        bytes objects (x, y, alive)
+
+        The bytes are copies of the arrays, so the snapshot does not change
+        when the formation does.
+        """
+        return (self._x.tobytes(),self._y.tobytes(),self._alive.tobytes())
+
+    def restore(self,state):
+        """
+        Puts the formation back in the state returned by snapshot
+
+        Parameter state: the state to restore
+        Precondition: state was returned by snapshot on a Formation of the
+        same shape
+        """
+        x,y,alive=state
+        shape=self._alive.shape
+        self._x[:]=np.frombuffer(x).reshape(shape)
+        self._y[:]=np.frombuffer(y).reshape(shape)
+        self._alive[:]=np.frombuffer(alive,dtype=bool).reshape(shape)
+        self._index=FormationIndex(self._alive)
+        self._hashed=False
+
+    # HIDDEN METHODS
+    def _rehash(self):
+        """
+        Rebuilds the spatial hash from the living aliens
+
+        Dead aliens are left out.  Aliens killed after the rebuild stay in the
+        hash, so lookups must still check the alive mask.
+        """
+        self._hash.clear()
+        xs=self._x.flat
+        ys=self._y.flat
+        for pos in np.flatnonzero(self._alive).tolist():
+            x=xs[pos]
+            y=ys[pos]
+            self._hash.insert(pos,x-self._halfwidth,y-self._halfheight,
+            x+self._halfwidth,y+self._halfheight)
+        self._hashed=True
+
+
+class LatticeFormation(Formation):
+    """
+    A class to represent the alien formation as a lattice.
+
+    The aliens of a wave never leave the lattice they are built on, because
+    the formation only ever moves as one rigid body.  So instead of storing a
+    position for every alien, this formation stores the position of the top
+    left alien (the origin) and an alive bitmap.  Moving the formation only
+    changes the origin, and the alien under a point is found directly from
+    (x-origin_x)/pitch, so hit detection is O(1) per bolt whatever the size of
+    the grid.  The x and y arrays are only built when someone asks for them
+    (usually to render the aliens).
+
+    This class has the same interface as Formation.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _ox: the x coordinate of the center of the alien at (0,0)
+    # Invariant: _ox is a float
+    #
+    # Attribute _oy: the y coordinate of the center of the alien at (0,0)
+    # Invariant: _oy is a float
+    #
+    # Attribute _alive: which aliens are alive
+    # Invariant: _alive is a (rows,cols) bool array
+    #
+    # Attribute _kind: the image index of each alien in ALIEN_IMAGES
+    # Invariant: _kind is a (rows,cols) int array
+    #
+    # Attribute _index: the survivors of the formation
+    # Invariant: _index is a FormationIndex matching _alive
+    #
+    # Attribute _halfwidth, _halfheight: half the size of an alien
+    # Invariant: _halfwidth and _halfheight are floats > 0
+    #
+    # Attribute _pitchx, _pitchy: the distance between neighboring aliens
+    # Invariant: _pitchx and _pitchy are numbers > 0
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def origin(self):
+        """
+        The center (x,y) of the alien in the top left corner of the lattice
+        """
+        return self._ox,self._oy
+
+    @property
+    def x(self):
+        """
+        The (rows,cols) array of x coordinates (dead aliens included)
+
+        This array is built on every access, and changing it has no effect.
+        """
+        x=np.empty(self._alive.shape)
+        x[:]=self._ox+np.arange(self.cols)*self._pitchx
+        return x
+
+    @property
+    def y(self):
+        """
+        The (rows,cols) array of y coordinates (dead aliens included)
+
+        This array is built on every access, and changing it has no effect.
+        """
+        y=np.empty(self._alive.shape)
+        y[:]=(self._oy-np.arange(self.rows)*self._pitchy)[:,np.newaxis]
+        return y
+
+    def __init__(self,x,y,num_col,num_rows,config=DEFAULT_CONFIG):
+        """
+        Initializes a full formation with the type alternating every two rows
+
+        Parameter x: x coordinate of the first (top left) alien in the grid
+        Precondition: x is a float or int
+
+        Parameter y: y coordinate of the first (top left) alien in the grid
+        Precondition: y is a float or int
+
+        Parameter num_col: number of columns in the grid
+        Precondition: int, >0
+
+        Parameter num_rows: number of rows in the grid
+        Precondition: int, >0
+
+        Parameter config: the settings of the game (for the size of an alien)
+        Precondition: config is a GameConfig
+        """
+        assert isinstance(x,float) or isinstance(x,int)
+        assert isinstance(y,float) or isinstance(y,int)
+        assert isinstance(num_col,int) and num_col > 0
+        assert isinstance(num_rows,int) and num_rows > 0
+        assert isinstance(config,GameConfig)
+        self._halfwidth=config.alien_width/2
+        self._halfheight=config.alien_height/2
+        self._pitchx=config.alien_width+config.alien_h_sep
+        self._pitchy=config.alien_height+config.alien_v_sep
+        self._ox=float(x)
+        self._oy=float(y)
+        self._alive=np.ones((num_rows,num_col),dtype=bool)
+        self._kind=np.empty((num_rows,num_col),dtype=np.int8)
+        self._kind[:]=((np.arange(num_rows)//2) % len(ALIEN_IMAGES))[:,np.newaxis]
+        self._index=FormationIndex(self._alive)
+
+    def move(self,incr_x,incr_y):
+        """
+        Moves the whole formation by (incr_x,incr_y)
+
+        Parameter incr_x: the movement on the x-axis
+        Precondition: incr_x is a number
+
+        Parameter incr_y: the movement on the y-axis
+        Precondition: incr_y is a number
+        """
+        self._ox+=incr_x
+        self._oy+=incr_y
+
+    def position(self,row,col):
+        """
+        Returns the center (x,y) of the alien at the given row and column
+
+        Parameter row: the alien row
+        Precondition: row is an int in 0..rows-1
+
+        Parameter col: the alien column
+        Precondition: col is an int in 0..cols-1
+        """
+        return (self._ox+col*self._pitchx,self._oy-row*self._pitchy)
+
+    def cell_at(self,x,y):
+        """
+        Returns the (row,col) of the living alien containing (x,y), or None
+
+        Aliens are smaller than the lattice pitch, so the only alien that can
+        contain a point is the one nearest to it.
+
+        Parameter x: the x coordinate of the point
+        Precondition: x is a number (int or float)
+
+        Parameter y: the y coordinate of the point
+        Precondition: y is a number (int or float)
+        """
+        col=int(round((x-self._ox)/self._pitchx))
+        row=int(round((self._oy-y)/self._pitchy))
+        if not (0 <= row < self._alive.shape[0] and 0 <= col < self._alive.shape[1]):
+            return None
+        if not self._alive[row,col]:
+            return None
+        cx,cy=self.position(row,col)
+        if abs(x-cx) < self._halfwidth and abs(y-cy) < self._halfheight:
+            return row,col
+        return None
+
+    def kill_at(self,x,y,halfwidth=0,halfheight=0):
+        """
+        Kills the alien containing (x,y) and returns True if there was one
+
+        The half extents are accepted for compatibility with Formation, but
+        are not needed: the alien is found directly from the lattice.
+
+        Parameter x: the x coordinate of the point
+        Precondition: x is a number (int or float)
+
+        Parameter y: the y coordinate of the point
+        Precondition: y is a number (int or float)
+
+        Parameter halfwidth: ignored
+        Precondition: halfwidth is a number >= 0
+
+        Parameter halfheight: ignored
+        Precondition: halfheight is a number >= 0
+        """
+        cell=self.cell_at(x,y)
+        if cell is None:
+            return False
+        self.kill(*cell)
+        return True
+
+    def kill_along(self,x,y0,y1,halfwidth=0):
+        """
+        Kills the first alien on the path from (x,y0) to (x,y1) and returns
+        True if there was one
+
+        Only one column can contain x, so the path is checked against the
+        rows of that column it overlaps, in the order the point enters them.
+
+        Parameter x: the x coordinate of the path
+        Precondition: x is a number (int or float)
+
+        Parameter y0: the y coordinate at the start of the path
+        Precondition: y0 is a number (int or float)
+
+        Parameter y1: the y coordinate at the end of the path
+        Precondition: y1 is a number (int or float)
+
+        Parameter halfwidth: ignored
+        Precondition: halfwidth is a number >= 0
+        """
+        pitch=self._pitchy
+        half=self._halfheight
+        col=int(round((x-self._ox)/self._pitchx))
+        if not 0 <= col < self._alive.shape[1]:
+            return False
+        if abs(x-self.position(0,col)[0]) >= self._halfwidth:
+            return False
+        low=min(y0,y1)
+        high=max(y0,y1)
+        # Row r overlaps the path if oy-r*pitch-h/2 < high and oy-r*pitch+h/2 > low
+        first=max(0,math.floor((self._oy-high-half)/pitch)+1)
+        last=min(self._alive.shape[0]-1,math.ceil((self._oy-low+half)/pitch)-1)
+        # Rows further down are entered first on the way up
+        rows=range(last,first-1,-1) if y1 >= y0 else range(first,last+1)
+        for row in rows:
+            if self._alive[row,col]:
+                self.kill(row,col)
+                return True
+        return False
+
+    def snapshot(self):
+        """
+        Returns the origin and survivors of the formation as a tuple
+        (ox, oy, alive), where alive is a bytes copy of the alive mask
+        """
+        return (self._ox,self._oy,self._alive.tobytes())
+
+    def restore(self,state):
+        """
+        Puts the formation back in the state returned by snapshot
+
+        Parameter state: the state to restore
+        Precondition: state was returned by snapshot on a LatticeFormation of
+        the same shape
+        """
+        self._ox,self._oy,alive=state
+        self._alive[:]=np.frombuffer(alive,dtype=bool).reshape(self._alive.shape)
+        self._index=FormationIndex(self._alive)
+
+
+class SimBolt(object):
+    """
+    A class to represent the state of a single laser bolt.
+
+    Player bolts have a positive velocity (they move up) and alien bolts have
+    a negative velocity (they move down).
+    """
+    # INSTANCE ATTRIBUTES:
+    # Attribute x: the x value of the center of the bolt
+    # Invariant: x is a float
+    #
+    # Attribute y: the y value of the center of the bolt
+    # Invariant: y is a float
+    #
+    # Attribute velocity: the velocity in the y direction
+    # Invariant: velocity is an int or float
+    #
+    # Attribute prevy: the y value of the center of the bolt before its last move
+    # Invariant: prevy is a float
+    #
+    # Attribute slot: the position of this bolt in its BoltPool
+    # Invariant: slot is an int >= 0, or None if the bolt is not pooled
+
+    def __init__(self,x,y,velocity):
+        """
+        Initializes a bolt centered at (x,y) with the given velocity
+
+        Parameter x: the x value of the center of the bolt
+        Precondition: x is a number (int or float)
+
+        Parameter y: the y value of the center of the bolt
+        Precondition: y is a number (int or float)
+
+        Parameter velocity: the velocity in the y direction
+        Precondition: velocity is a nonzero number (int or float)
+        """
+        assert isinstance(x,int) or isinstance(x,float)
+        assert isinstance(y,int) or isinstance(y,float)
+        assert isinstance(velocity,int) or isinstance(velocity,float)
+        self.x=float(x)
+        self.y=float(y)
+        self.prevy=self.y
+        self.velocity=velocity
+        self.slot=None
+
+    def isPlayerBolt(self):
+        """
+        Returns True if the bolt was fired by the player
+        """
+        return self.velocity > 0
+
+    def move(self):
+        """
+        Moves the bolt by its velocity, remembering where it was
+        """
+        self.prevy=self.y
+        self.y+=self.velocity
+
+    def interpolate(self,alpha):
+        """
+        Returns the y value of the bolt blended between its last two positions
+
+        Parameter alpha: the fraction of the last move to apply
+        Precondition: alpha is a number in 0..1
+        """
+        return self.prevy+(self.y-self.prevy)*alpha
+
+    def offscreen(self,height=BOLT_HEIGHT):
+        """
+        Returns True if the bolt has left the screen
+
+        Parameter height: the height of the bolt
+        Precondition: height is a number >= 0
+        """
+        return self.y-height/2 > GAME_HEIGHT or self.y+height/2 < 0
+
+
+class BoltPool(object):
+    """
+    A class to represent a pool of bolts.
+
+    The bolts a wave normally has on screen are built when the pool is made.
+    Firing takes a bolt off the free list and only resets its position and
+    velocity; a bolt that leaves the screen or hits something goes back on the
+    free list.  The active bolts are kept in the order they were fired.  If
+    every bolt is in use, the pool grows by one bolt, so a shot is never lost.
+
+    The pool remembers the largest number of bolts that were ever active at
+    once, and how many times it had to grow.  Those are what to look at when
+    choosing bolt_pool: a pool that grew was too small to avoid allocating.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _bolts: every bolt in the pool, indexed by slot
+    # Invariant: _bolts is a list of SimBolt objects
+    #
+    # Attribute _free: the slots of the inactive bolts
+    # Invariant: _free is a list of ints, used as a stack
+    #
+    # Attribute _active: the active bolts in firing order
+    # Invariant: _active is a list of SimBolt objects, disjoint from _free
+    #
+    # Attribute _peak: the largest number of bolts active at once
+    # Invariant: _peak is an int in 0..capacity
+    #
+    # Attribute _dropped: the number of bolts fired while every bolt was in use
+    # Invariant: _dropped is an int >= 0
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The number of bolts in the pool, which only grows
+        """
+        return len(self._bolts)
+
+    @property
+    def active(self):
+        """
+        The list of active bolts, in the order they were fired
+
+        This list is owned by the pool and must not be modified.
+        """
+        return self._active
+
+    @property
+    def peak(self):
+        """
+        The largest number of bolts that have been active at the same time
+        """
+        return self._peak
+
+    @property
+    def dropped(self):
+        """
+        The number of times acquire found every bolt in use, and so grew the
+        pool
+
+        This is only a diagnostic: the shots are fired all the same.
+        """
+        return self._dropped
+
+    def __init__(self,capacity=BOLT_POOL):
+        """
+        Initializes a pool of capacity inactive bolts
+
+        Parameter capacity: the number of bolts to build up front
+        Precondition: capacity is an int > 0
+        """
+        assert isinstance(capacity,int) and capacity > 0
+        self._bolts=[]
+        for slot in range(capacity):
+            bolt=SimBolt(0,0,BOLT_SPEED)
+            bolt.slot=slot
+            self._bolts.append(bolt)
+        self._free=list(range(capacity-1,-1,-1))
+        self._active=[]
+        self._peak=0
+        self._dropped=0
+
+    def __len__(self):
+        """
+        Returns the number of active bolts
+        """
+        return len(self._active)
+
+    def acquire(self,x,y,velocity):
+        """
+        Returns a free bolt reset to (x,y) and velocity
+
+        If every bolt is in use, a new bolt is added to the pool for the shot,
+        and counted in dropped.
+
+        Parameter x: the x value of the center of the bolt
+        Precondition: x is a number (int or float)
+
+        Parameter y: the y value of the center of the bolt
+        Precondition: y is a number (int or float)
+
+        Parameter velocity: the velocity in the y direction
+        Precondition: velocity is a nonzero number (int or float)
+        """
+        if not self._free:
+            self._dropped+=1
+            bolt=SimBolt(0,0,BOLT_SPEED)
+            bolt.slot=len(self._bolts)
+            self._bolts.append(bolt)
+            self._free.append(bolt.slot)
+        bolt=self._bolts[self._free.pop()]
+        bolt.x=float(x)
+        bolt.y=float(y)
+        bolt.prevy=bolt.y
+        bolt.velocity=velocity
+        self._active.append(bolt)
+        if len(self._active) > self._peak:
+            self._peak=len(self._active)
+        return bolt
+
+    def release(self,bolt):
+        """
+        Returns an active bolt to the free list
+
+        Parameter bolt: the bolt to release
+        Precondition: bolt is an active bolt of this pool
+        """
+        self._active.remove(bolt)
+        self._free.append(bolt.slot)
+
+    def release_where(self,test):
+        """
+        Releases every active bolt for which test(bolt) is True
+
+        The bolts are tested in firing order and the survivors are compacted
+        in a single pass.
+
+        Parameter test: the function deciding which bolts to release
+        Precondition: test is a function taking a SimBolt and returning a bool
+        """
+        survivors=[]
+        for bolt in self._active:
+            if test(bolt):
+                self._free.append(bolt.slot)
+            else:
+                survivors.append(bolt)
+        self._active=survivors
+
+    def snapshot(self):
+        """
+        Returns the active bolts, the peak and the drops of the pool as a
+        tuple (bolts, peak, dropped)
+
+        The bolts are a tuple of (x, y, prevy, velocity) tuples in firing
+        order.
+        """
+        return (tuple((bolt.x,bolt.y,bolt.prevy,bolt.velocity)
+        for bolt in self._active),self._peak,self._dropped)
+
+    def restore(self,state):
+        """
+        Puts the pool back in the state returned by snapshot
+
+        Every bolt is released, and the bolts of the snapshot are acquired
+        again in firing order.  They may end up in different slots, and the
+        pool grows if it has fewer bolts than the snapshot.
+
+        Parameter state: the state to restore
+        Precondition: state was returned by snapshot on a BoltPool
+        """
+        bolts,peak,dropped=state
+        self._free=list(range(len(self._bolts)-1,-1,-1))
+        self._active=[]
+        for x, y, prevy, velocity in bolts:
+            self.acquire(x,y,velocity).prevy=prevy
+        self._peak=peak
+        self._dropped=dropped
+
+
+# The state of a WaveSim at one instant, as returned by WaveSim.snapshot.  The
+# formation and bolts fields hold the snapshots of the Formation and BoltPool,
+# shape is the (rows,cols) of the formation, and random is the state of the
+# random numbers of the wave.
+WaveSnapshot=collections.namedtuple('WaveSnapshot',['seed','random','shipx',
+'prevshipx','shipalive','lives','time','direction','dead','nextshot','steps',
+'lattice','shape','formation','bolts'])
+
+
+class WaveSim(object):
+    """
+    This class simulates a single wave of Alien Invaders.
+
+    The rules are the ones of the original Wave subcontroller.  The player
+    moves the ship and fires one bolt at a time.  The aliens march across the
+    screen every alien_speed seconds, stepping down whenever a row reaches the
+    edge, and fire a bolt every 1..bolt_rate steps from the bottom of a random
+    non-empty column.  These settings, and the sizes of everything, come from
+    the GameConfig of the wave.  The wave is won when every alien is dead and lost when
+    an alien crosses the defense line or the player runs out of lives.
+
+    Instead of a GInput, update takes the three controls of the game as
+    booleans, so that the simulation can be driven by a bot or a log.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _shipx: the x coordinate of the center of the ship
+    # Invariant: _shipx is a float
+    #
+    # Attribute _prevshipx: the x coordinate of the ship before the last update
+    # Invariant: _prevshipx is a float
+    #
+    # Attribute _shipalive: whether the ship is on the screen
+    # Invariant: _shipalive is a bool
+    #
+    # Attribute _aliens: the alien formation (row 0 is the top)
+    # Invariant: _aliens is a Formation (or LatticeFormation) object
+    #
+    # Attribute _bolts: the pool of laser bolts (active ones are on screen)
+    # Invariant: _bolts is a BoltPool object
+    #
+    # Attribute _lives: the number of lives left
+    # Invariant: _lives is an int >= 0
+    #
+    # Attribute _time: the amount of time since the last alien step
+    # Invariant: _time is a float >= 0
+    #
+    # Attribute _direction: the direction of the march
+    # Invariant: _direction is True (right) or False (left)
+    #
+    # Attribute _dead: whether or not the ship just died
+    # Invariant: _dead is a bool
+    #
+    # Attribute _nextshot: the number of steps until the next alien shoots
+    # Invariant: _nextshot is an int >= 0
+    #
+    # Attribute _steps: the number of alien steps taken so far
+    # Invariant: _steps is an int >= 0
+    #
+    # Attribute _seed: the seed the random numbers of the wave started from
+    # Invariant: _seed is an int, or None if the wave was seeded by the system
+    #
+    # Attribute _random: the random numbers of the wave (shared with nothing)
+    # Invariant: _random is a random.Random object
+    #
+    # Attribute _config: the settings of the wave
+    # Invariant: _config is a GameConfig
+
+    # GETTERS AND SETTERS
+    def getShipX(self,alpha=1):
+        """
+        Returns the x coordinate of the ship, or None if the ship is dead
+
+        By default this is the current position.  For rendering between two
+        updates, alpha blends the positions before and after the last update.
+
+        Parameter alpha: the fraction of the last move to apply
+        Precondition: alpha is a number in 0..1
+        """
+        if not self._shipalive:
+            return None
+        return self._prevshipx+(self._shipx-self._prevshipx)*alpha
+
+    def getFormation(self):
+        """
+        Returns the Formation of aliens in the wave
+        """
+        return self._aliens
+
+    def getBolts(self):
+        """
+        Returns the list of SimBolt objects currently on screen
+
+        This list is owned by the bolt pool and must not be modified.
+        """
+        return self._bolts.active
+
+    def getBoltPool(self):
+        """
+        Returns the BoltPool of the wave
+        """
+        return self._bolts
+
+    def getLives(self):
+        """
+        Returns the number of lives the player has left (int)
+        """
+        return self._lives
+
+    def getDead(self):
+        """
+        Returns True if the ship just died
+        """
+        return self._dead
+
+    def setDead(self,b):
+        """
+        Sets whether the ship just died
+
+        Parameter b: the truth value of the dead attribute
+        Precondition: b is a boolean
+        """
+        assert isinstance(b,bool)
+        self._dead=b
+
+    def getSteps(self):
+        """
+        Returns the number of alien steps taken so far
+        """
+        return self._steps
+
+    def getSeed(self):
+        """
+        Returns the seed of the wave (int), or None if it was seeded by the
+        system
+        """
+        return self._seed
+
+    def getConfig(self):
+        """
+        Returns the GameConfig of the wave
+        """
+        return self._config
+
+    # INITIALIZER
+    def __init__(self,lattice=True,seed=None,config=DEFAULT_CONFIG):
+        """
+        Initializes a new wave with a full formation and a fresh ship
+
+        By default the formation is a LatticeFormation, which finds the alien
+        hit by a bolt in constant time.  Setting lattice to False stores every
+        alien position in a Formation instead.
+
+        Every wave owns its random numbers.  Two waves with the same seed that
+        are given the same controls play out exactly the same, and waves never
+        disturb each other (or the random module).
+
+        Parameter lattice: whether to store the formation as a lattice
+        Precondition: lattice is a bool
+
+        Parameter seed: the seed of the random numbers of the wave
+        Precondition: seed is an int, or None to let the system pick one
+
+        Parameter config: the settings of the wave (its seed field is not used)
+        Precondition: config is a GameConfig
+        """
+        assert isinstance(lattice,bool)
+        assert seed is None or isinstance(seed,int)
+        assert isinstance(config,GameConfig)
+        self._config=config
+        self._seed=seed
+        self._random=random.Random(seed)
+        self._shipx=GAME_WIDTH/2
+        self._prevshipx=self._shipx
+        self._shipalive=True
+        x_cor_al=(config.alien_h_sep+(config.alien_width/2))
+        y_cor_al=GAME_HEIGHT-(config.alien_ceiling+(config.alien_height/2))
+        if lattice:
+            self._aliens=LatticeFormation(x_cor_al,y_cor_al,config.aliens_in_row,
+            config.alien_rows,config)
+        else:
+            self._aliens=Formation(x_cor_al,y_cor_al,config.aliens_in_row,
+            config.alien_rows,config)
+        self._bolts=BoltPool(config.bolt_pool)
+        self._lives=config.ship_lives
+        self._time=0
+        self._direction=True
+        self._dead=False
+        self._nextshot=self._random.randint(1,config.bolt_rate)
+        self._steps=0
+
+    # UPDATE METHOD
+    def update(self,left,right,fire,dt):
+        """
+        Advances the wave by one frame
+
+        Parameter left: whether the left control is held down
+        Precondition: left is a bool
+
+        Parameter right: whether the right control is held down
+        Precondition: right is a bool
+
+        Parameter fire: whether the fire control was just pressed
+        Precondition: fire is a bool
+
+        Parameter dt: time in seconds since the last call to update
+        Precondition: dt is a number (int or float) >= 0
+        """
+        assert isinstance(dt,int) or isinstance(dt,float)
+        assert dt >= 0
+
+        config=self._config
+        self._prevshipx=self._shipx
+        if self._shipalive:
+            if right and self._shipx <= GAME_WIDTH:
+                self._shipx+=config.ship_movement
+            if left and self._shipx >= 0:
+                self._shipx-=config.ship_movement
+        if self._time > config.alien_speed:
+            self.horde_move(config.alien_h_walk,config.alien_v_walk)
+            self._nextshot-=1
+            self._time=0
+        else:
+            self._time+=dt
+        if fire and self._shipalive and self.no_player_bolt():
+            self.ship_fire_bolt()
+        for bolt in self._bolts.active:
+            bolt.move()
+
+        self.resolve_alien_shots()
+        self.resolve_alien_collisions()
+        self.resolve_ship_collisions()
+        height=config.bolt_height
+        self._bolts.release_where(lambda bolt: bolt.offscreen(height))
+
+    # SNAPSHOT AND RESTORE
+    def snapshot(self):
+        """
+        Returns the complete state of the wave as a WaveSnapshot
+
+        A snapshot is an immutable tuple of numbers, bools and bytes, so it
+        can be kept (for rollback or a search tree) while the wave goes on.
+        Taking one copies no objects besides the state of the random numbers
+        and the alive mask of the formation.
+        """
+        return WaveSnapshot(self._seed,self._random.getstate(),self._shipx,
+        self._prevshipx,self._shipalive,self._lives,self._time,
+        self._direction,self._dead,self._nextshot,self._steps,
+        isinstance(self._aliens,LatticeFormation),self._aliens.alive.shape,
+        self._aliens.snapshot(),self._bolts.snapshot())
+
+    def restore(self,snapshot):
+        """
+        Puts the wave back in the state of snapshot
+
+        The snapshot may come from another wave, as long as its formation is
+        stored the same way (as a lattice or not) and has the same shape.
+        After a restore the wave plays out exactly as the wave the snapshot
+        was taken from did at that point.
+
+        Parameter snapshot: the state to restore
+        Precondition: snapshot is a WaveSnapshot
+        """
+        assert isinstance(snapshot,WaveSnapshot)
+        assert snapshot.lattice == isinstance(self._aliens,LatticeFormation)
+        assert snapshot.shape == self._aliens.alive.shape
+        self._seed=snapshot.seed
+        self._random.setstate(snapshot.random)
+        self._shipx=snapshot.shipx
+        self._prevshipx=snapshot.prevshipx
+        self._shipalive=snapshot.shipalive
+        self._lives=snapshot.lives
+        self._time=snapshot.time
+        self._direction=snapshot.direction
+        self._dead=snapshot.dead
+        self._nextshot=snapshot.nextshot
+        self._steps=snapshot.steps
+        self._aliens.restore(snapshot.formation)
+        self._bolts.restore(snapshot.bolts)
+
+    def no_player_bolt(self):
+        """
+        Returns True if there are no player bolts on the screen
+        """
+        for bolt in self._bolts.active:
+            if bolt.isPlayerBolt():
+                return False
+        return True
+
+    def ship_fire_bolt(self):
+        """
+        Fires a laser bolt from the top of the ship
+        """
+        config=self._config
+        self._bolts.acquire(self._shipx,config.ship_bottom+config.ship_height,
+        config.bolt_speed)
+
+    def resolve_alien_shots(self):
+        """
+        Has the aliens shoot after the countdown from their last shot
+        """
+        if self._nextshot == 0:
+            self.alien_fire_bolt()
+            self._nextshot=self._random.randint(1,self._config.bolt_rate)
+
+    def alien_fire_bolt(self):
+        """
+        Fires a laser bolt from the bottom alien of a random non-empty column
+        """
+        col=self.non_empty_column()
+        if col is not None:
+            x,y=self._aliens.position(self._aliens.bottom_alien(col),col)
+            config=self._config
+            self._bolts.acquire(x,y-config.bolt_height/2,-config.bolt_speed)
+
+    def non_empty_column(self):
+        """
+        Returns the index of a random non-empty column, or None if all
+        columns are empty
+        """
+        acum=self._aliens.non_empty_columns()
+        if len(acum) > 0:
+            return self._random.choice(acum)
+        return None
+
+    def resolve_alien_collisions(self):
+        """
+        Removes every player bolt that hits an alien, along with the alien
+
+        Collisions are swept: a bolt hits an alien if its center passed
+        through the alien at any point of its last move, not just where it
+        ended up.  A bolt kills at most one alien: the first one on its path.
+        The bolts that hit are dropped in a single compaction pass.
+        """
+        formation=self._aliens
+        halfwidth=self._config.bolt_width/2
+        self._bolts.release_where(lambda bolt: bolt.isPlayerBolt() and
+        formation.kill_along(bolt.x,bolt.prevy,bolt.y,halfwidth))
+
+    def resolve_ship_collisions(self):
+        """
+        Destroys the ship (and the bolt) if an alien bolt hits the ship
+
+        Collisions are swept, as in resolve_alien_collisions.  If several
+        bolts hit the ship in the same frame, the one that reached it first
+        (the earliest in firing order on a tie) destroys it and the others
+        fly on.  When the ship is destroyed, the player loses a life and the
+        wave is marked dead until the ship is respawned.
+        """
+        if not self._shipalive:
+            return
+        config=self._config
+        bottom=config.ship_bottom
+        top=bottom+config.ship_height
+        halfwidth=config.ship_width/2
+        first=None
+        entry=None
+        for bolt in self._bolts.active:
+            if bolt.isPlayerBolt() or abs(bolt.x-self._shipx) >= halfwidth:
+                continue
+            if bolt.y >= top or bolt.prevy <= bottom:
+                continue
+            # How far the bolt moved before it reached the top of the ship
+            depth=max(0,bolt.prevy-top)
+            if first is None or depth < entry:
+                first=bolt
+                entry=depth
+        if first is None:
+            return
+        self._bolts.release(first)
+        self._shipalive=False
+        self._lives-=1
+        self._dead=True
+
+    def respawn_ship(self):
+        """
+        Respawns the ship at the center of board if there are lives left
+        """
+        if self._lives > 0:
+            self._shipx=GAME_WIDTH/2
+            self._prevshipx=self._shipx
+            self._shipalive=True
+
+    #helpers for moving aliens
+    def horde_move(self,incr_x,incr_y):
+        """
+        Moves all the aliens, changing direction when they reach the edge
+
+        The formation takes one walk per non-empty row, checking that row
+        against the edge each time, exactly as Wave.horde_move always has.
+        The walks are added up on scalars and applied to the formation as a
+        single offset.
+
+        Parameter incr_x: the magnitude of each alien's movement on the x-axis
+        Precondition: incr_x is a number >= 0
+
+        Parameter incr_y: the magnitude of each alien's movement on the y-axis
+        Precondition: incr_y is a number >= 0
+        """
+        assert isinstance(incr_x,int) or isinstance(incr_x,float)
+        assert isinstance(incr_y,int) or isinstance(incr_y,float)
+        assert incr_y >= 0 and incr_x >= 0
+        first,last=self._aliens.row_extents()
+        sep=self._config.alien_h_sep
+        dx=0
+        dy=0
+        for row in range(len(first)):
+            if first[row] is None:
+                continue
+            if self._direction:
+                if (GAME_WIDTH-(last[row]+dx)) < sep:
+                    self._direction=False
+                    dy-=incr_y
+                else:
+                    dx+=incr_x
+            else:
+                if first[row]+dx < sep:
+                    self._direction=True
+                    dy-=incr_y
+                else:
+                    dx-=incr_x
+        self._aliens.move(dx,dy)
+        self._steps+=1
+
+    #helpers for game completion
+    def all_aliens_dead(self):
+        """
+        Returns True if every alien in the wave has been killed
+        """
+        return self._aliens.count() == 0
+
+    def alien_below_line(self):
+        """
+        Returns True if an alien has crossed below the defense line
+        """
+        lowest=self._aliens.lowest()
+        return lowest is not None and lowest < self._config.defense_line
+
+    def assert_win_conditions(self):
+        """
+        Returns True if win conditions are present
+        """
+        return self.all_aliens_dead()
+
+    def assert_lose_conditions(self):
+        """
+        Returns True if lose conditions are present
+        """
+        return self.alien_below_line() or self._lives == 0
@@ -0,0 +1,219 @@
+"""
+Batch runner for parameter sweeps of Alien Invaders
+
+This module plays headless waves for every combination of a grid of game
+parameters and seeds, spread over a pool of worker processes, and streams
+one line of results per wave to a CSV file.  For example
+
+    python sweep.py --rows 3 5 --cols 8 12 --speed 0.5 1.0 --seeds 100
+
+plays 100 seeded waves of each of the 8 configurations.  Run it with --help
+to see the other parameters (BOLT_RATE, SHIP_LIVES and BOLT_SPEED), the
+output file, and the number of workers and tasks per chunk.
+
+The waves are played by a simple bot: it moves under the nearest non-empty
+column (unless it has to dodge an alien bolt) and fires whenever it can, and
+respawns as soon as it dies.  The waves are capped at a number of ticks, so a
+sweep always finishes.  The column dropped counts the shots fired while every
+bolt of the pool was in use, which made the pool grow.  It is only a
+diagnostic for choosing bolt_pool; the shots are fired all the same.
+
+Every task builds the GameConfig of its wave from its parameters, so the
+workers never change any module state and can play any mix of tasks.
+
+Kiyam Merali km942, Eben Hill emh238
+12/03/2023
+"""
+import simulation
+from consts import *
+import multiprocessing
+import itertools
+import argparse
+import time
+import csv
+import sys
+import os
+
+
+# The columns of the CSV file, in order
+COLUMNS = ('rows','cols','speed','bolt_rate','lives','bolt_speed','seed',
+'outcome','ticks','steps','aliens','lives_left','dropped')
+
+# The distance above the ship below which the bot dodges alien bolts
+_DANGER = 200
+
+
+def configure(rows,cols,speed,bolt_rate,lives,bolt_speed):
+    """
+    Returns the GameConfig of a wave with the given parameters
+
+    Parameter rows: the number of alien rows
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens in a row
+    Precondition: cols is an int > 0
+
+    Parameter speed: the number of seconds between alien steps
+    Precondition: speed is a number >= 0
+
+    Parameter bolt_rate: the most alien steps between alien bolts
+    Precondition: bolt_rate is an int > 0
+
+    Parameter lives: the number of lives of the ship
+    Precondition: lives is an int > 0
+
+    Parameter bolt_speed: the pixels a bolt moves per tick
+    Precondition: bolt_speed is an int > 0
+    """
+    assert isinstance(lives,int) and lives > 0
+    assert isinstance(bolt_speed,int) and bolt_speed > 0
+    return GameConfig(alien_rows=rows,aliens_in_row=cols,alien_speed=speed,
+    bolt_rate=bolt_rate,ship_lives=lives,bolt_speed=bolt_speed)
+
+
+def play(sim,limit):
+    """
+    Returns the tuple (outcome, ticks) after playing sim with the bot
+
+    The outcome is 'won', 'lost', or 'limit' if the wave was still going
+    after limit ticks.
+
+    Parameter sim: the wave to play
+    Precondition: sim is a WaveSim that is not finished
+
+    Parameter limit: the most ticks to play
+    Precondition: limit is an int > 0
+    """
+    dt=1.0/TICK_RATE
+    config=sim.getConfig()
+    width=config.ship_width
+    step=config.ship_movement/2
+    danger=config.ship_bottom+config.ship_height+_DANGER
+    formation=sim.getFormation()
+    for tick in range(1,limit+1):
+        shipx=sim.getShipX()
+        left=right=False
+        columns=formation.non_empty_columns()
+        if shipx is not None and columns:
+            target=min((formation.position(0,col)[0] for col in columns),
+            key=lambda x: abs(x-shipx))
+            for bolt in sim.getBolts():
+                if (not bolt.isPlayerBolt() and bolt.y < danger and
+                    abs(bolt.x-shipx) < width):
+                    # Step out of the way of the bolt instead
+                    target=shipx+(width if shipx >= bolt.x else -width)
+            right=target-shipx > step
+            left=shipx-target > step
+        sim.update(left,right,True,dt)
+        if sim.getDead():
+            sim.setDead(False)
+            sim.respawn_ship()
+        if sim.assert_win_conditions():
+            return 'won',tick
+        if sim.assert_lose_conditions():
+            return 'lost',tick
+    return 'limit',limit
+
+
+def run(task):
+    """
+    Returns the CSV row of a single wave played with the bot
+
+    Parameter task: the parameters of configure, then the seed of the wave
+    and the most ticks to play
+    Precondition: task is a tuple (rows, cols, speed, bolt_rate, lives,
+    bolt_speed, seed, limit) satisfying the preconditions of configure and
+    play, with seed an int
+    """
+    sim=simulation.WaveSim(seed=task[6],config=configure(*task[:6]))
+    outcome,ticks=play(sim,task[7])
+    return task[:7]+(outcome,ticks,sim.getSteps(),sim.getFormation().count(),
+    sim.getLives(),sim.getBoltPool().dropped)
+
+
+def sweep(grid,seeds,path,limit,workers=None,chunksize=None):
+    """
+    Returns the number of waves played, after playing every wave of the
+    sweep and writing their results to path
+
+    Every configuration in the grid is played once with every seed.  The
+    results are written as they come in, so they are not in grid order.
+
+    Parameter grid: the configurations to play
+    Precondition: grid is a list of tuples of arguments to configure
+
+    Parameter seeds: the seeds to play each configuration with
+    Precondition: seeds is a list of ints
+
+    Parameter path: the CSV file to write (replaced if it exists)
+    Precondition: path is a string
+
+    Parameter limit: the most ticks to play a wave
+    Precondition: limit is an int > 0
+
+    Parameter workers: the number of worker processes
+    Precondition: workers is an int > 0, or None for one per core
+
+    Parameter chunksize: the number of waves sent to a worker at a time
+    Precondition: chunksize is an int > 0, or None to pick one
+    """
+    tasks=[config+(seed,limit) for config in grid for seed in seeds]
+    if workers is None:
+        workers=os.cpu_count() or 1
+    if chunksize is None:
+        # Enough chunks to balance the load, few enough to keep IPC cheap
+        chunksize=max(1,len(tasks)//(workers*8))
+    played=0
+    with open(path,'w',newline='') as file:
+        writer=csv.writer(file)
+        writer.writerow(COLUMNS)
+        with multiprocessing.Pool(workers) as pool:
+            for row in pool.imap_unordered(run,tasks,chunksize):
+                writer.writerow(row)
+                played+=1
+            # Let the workers exit on their own; leaving the block would
+            # signal them, and a handler inherited from the parent can
+            # ignore that signal
+            pool.close()
+            pool.join()
+    return played
+
+
+def main(argv):
+    """
+    Runs the sweep described by the command line arguments argv
+
+    Parameter argv: the command line arguments (without the script name)
+    Precondition: argv is a list of strings
+    """
+    parser=argparse.ArgumentParser(description='Play a grid of headless waves.')
+    parser.add_argument('--rows',type=int,nargs='+',default=[ALIEN_ROWS])
+    parser.add_argument('--cols',type=int,nargs='+',default=[ALIENS_IN_ROW])
+    parser.add_argument('--speed',type=float,nargs='+',default=[ALIEN_SPEED])
+    parser.add_argument('--bolt-rate',type=int,nargs='+',default=[BOLT_RATE])
+    parser.add_argument('--lives',type=int,nargs='+',default=[SHIP_LIVES])
+    parser.add_argument('--bolt-speed',type=int,nargs='+',default=[BOLT_SPEED])
+    parser.add_argument('--seeds',type=int,default=10,
+    help='the number of seeds per configuration')
+    parser.add_argument('--first-seed',type=int,default=0)
+    parser.add_argument('--limit',type=int,default=100000,
+    help='the most ticks to play a wave')
+    parser.add_argument('--out',default='sweep.csv')
+    parser.add_argument('--workers',type=int,default=None)
+    parser.add_argument('--chunksize',type=int,default=None)
+    args=parser.parse_args(argv)
+
+    grid=list(itertools.product(args.rows,args.cols,args.speed,args.bolt_rate,
+    args.lives,args.bolt_speed))
+    seeds=list(range(args.first_seed,args.first_seed+args.seeds))
+    workers=args.workers or os.cpu_count() or 1
+    start=time.perf_counter()
+    played=sweep(grid,seeds,args.out,args.limit,workers,args.chunksize)
+    elapsed=time.perf_counter()-start
+    rate=played/elapsed if elapsed > 0 else float('inf')
+    print('%d waves in %.2fs (%.1f runs/s) on %d workers' %
+    (played,elapsed,rate,workers))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,11 @@
+"""
+Test configuration for Alien Invaders
+
+The modules of the game live at the top of the repository (not in a package), so
+this puts the repository first on the path.  That also makes sure that wave.py is
+found before the wave module of the standard library.
+"""
+import os
+import sys
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
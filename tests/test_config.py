@@ -0,0 +1,63 @@
+"""
+Tests for GameConfig and the settings of the command line
+"""
+import pytest
+
+pytest.importorskip('introcs')
+
+import importlib.util
+import os
+from consts import DEFAULT_CONFIG, GameConfig
+
+
+def load_main():
+    """
+    Returns the module __main__.py of the game, loaded under another name
+
+    Loading it as a module does not start the game.
+    """
+    pytest.importorskip('kivy')
+    path=os.path.join(os.path.dirname(os.path.dirname(__file__)),'__main__.py')
+    spec=importlib.util.spec_from_file_location('invaders_main',path)
+    module=importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_defaults():
+    assert GameConfig() == DEFAULT_CONFIG
+    assert DEFAULT_CONFIG.seed is None
+    assert GameConfig(alien_rows=3).alien_rows == 3
+
+
+@pytest.mark.parametrize('changes',[{'alien_rows':40},{'aliens_in_row':60},
+    {'alien_speed':12.5},{'alien_speed':0},{'seed':7},{'bolt_pool':1}])
+def test_accepts_any_positive_size(changes):
+    config=GameConfig(**changes)
+    for name, value in changes.items():
+        assert getattr(config,name) == value
+
+
+@pytest.mark.parametrize('changes',[{'alien_rows':0},{'alien_rows':2.0},
+    {'aliens_in_row':-1},{'alien_speed':-0.5},{'alien_speed':'1'},
+    {'bolt_rate':0},{'bolt_pool':0},{'seed':1.5},{'ship_lives':-1},
+    {'bolt_speed':None}])
+def test_rejects_bad_settings(changes):
+    with pytest.raises(AssertionError):
+        GameConfig(**changes)
+
+
+@pytest.mark.parametrize('argv,changes',[
+    (['invaders'],{}),
+    (['invaders','3','4','0.5'],{'alien_rows':3,'aliens_in_row':4,'alien_speed':0.5}),
+    (['invaders','10','15','3','42'],{'alien_rows':10,'aliens_in_row':15,
+        'alien_speed':3.0,'seed':42}),
+    (['invaders','0','16','3.5'],{}),
+    (['invaders','11','-2','-1','seed'],{}),
+    (['invaders','x','2.5','fast'],{}),
+    (['invaders','1','1','0','-3'],{'alien_rows':1,'aliens_in_row':1,
+        'alien_speed':0.0,'seed':-3}),
+    (['invaders','12','5'],{'aliens_in_row':5})])
+def test_parse_config(argv,changes):
+    main=load_main()
+    assert main.parse_config(argv) == DEFAULT_CONFIG._replace(**changes)
@@ -0,0 +1,149 @@
+"""
+Tests for the containment checks of the game2d shapes
+
+GScene.select calls contains_xy on every child it tries, so every shape must
+answer it from x and y alone, and agree with contains.
+"""
+import pytest
+
+pytest.importorskip('kivy')
+pytest.importorskip('introcs')
+
+import math
+from game2d import GScene, GRectangle, GEllipse, GLabel, GPath, GTriangle, GPolygon
+
+
+# The (x, y, angle, scale) of the shapes checked by test_contains_xy
+PLACES = [(0,0,0,1),(37,-12,0,1),(0,0,30,1),(5,8,0,(2,0.5)),(-20,14,125,(0.7,1.6))]
+
+
+def make_shapes():
+    """
+    Returns a list with one shape of every kind, centered at the origin
+    """
+    return [GRectangle(width=40,height=20),GEllipse(width=40,height=20),
+    GLabel(text='Alien',width=40,height=20),
+    GScene(children=[GRectangle(x=-10,y=0,width=20,height=30),
+                     GEllipse(x=15,y=5,width=10,height=10)]),
+    GPath(points=(-20,-10,20,10),linewidth=2),
+    GTriangle(points=(-20,-15,5,25,20,-10)),
+    GPolygon(points=(-20,-20,-25,10,0,25,15,10,20,-15))]
+
+
+def in_triangle(x,y,points):
+    """
+    Returns True if (x,y) is in the triangle with the given corners
+
+    This uses barycentric coordinates, unlike the shapes themselves.
+
+    Parameter x: the x-coordinate of the point
+    Precondition: x is a number
+
+    Parameter y: the y-coordinate of the point
+    Precondition: y is a number
+
+    Parameter points: the corners of the triangle
+    Precondition: points is a sequence of 6 numbers
+    """
+    ax,ay,bx,by,cx,cy=points
+    det=(by-cy)*(ax-cx)+(cx-bx)*(ay-cy)
+    if det == 0:
+        return False
+    u=((by-cy)*(x-cx)+(cx-bx)*(y-cy))/det
+    v=((cy-ay)*(x-cx)+(ax-cx)*(y-cy))/det
+    return u >= 0 and v >= 0 and u+v <= 1
+
+
+def expected(shape,x,y):
+    """
+    Returns True if shape contains (x,y), computed from its geometry
+
+    The point is moved into the coordinates of the shape by hand, and then
+    tested against the box, ellipse, triangle or triangle fan of the shape.
+
+    Parameter shape: the shape to check
+    Precondition: shape is one of the shapes of make_shapes
+
+    Parameter x: the x-coordinate of the point
+    Precondition: x is a number
+
+    Parameter y: the y-coordinate of the point
+    Precondition: y is a number
+    """
+    radians=math.radians(shape.angle)
+    dx=x-shape.x
+    dy=y-shape.y
+    sx,sy=shape.scale if isinstance(shape.scale,tuple) else (shape.scale,shape.scale)
+    lx=(math.cos(radians)*dx+math.sin(radians)*dy)/sx
+    ly=(math.cos(radians)*dy-math.sin(radians)*dx)/sy
+    if isinstance(shape,GPolygon):
+        p=shape.points
+        return any(in_triangle(lx,ly,(0,0)+p[i:i+2]+(p+p[:2])[i+2:i+4])
+        for i in range(0,len(p),2))
+    if isinstance(shape,GTriangle):
+        return in_triangle(lx,ly,shape.points)
+    if isinstance(shape,GPath):
+        return False
+    if isinstance(shape,GEllipse):
+        return (2*lx/shape.width)**2+(2*ly/shape.height)**2 <= 1
+    return abs(lx) < shape.width/2 and abs(ly) < shape.height/2
+
+
+def test_ellipse_contains():
+    ellipse=GEllipse(x=100,y=50,width=40,height=20)
+    assert ellipse.contains((100,50))
+    assert ellipse.contains((119,50))
+    assert ellipse.contains((100,59))
+    assert not ellipse.contains((121,50))
+    assert not ellipse.contains((100,61))
+    # The corners of the bounding box are outside of the ellipse
+    assert not ellipse.contains((118,58))
+    assert not ellipse.contains_xy(82,42)
+
+
+def test_ellipse_contains_rotated():
+    ellipse=GEllipse(x=0,y=0,width=40,height=10,angle=90)
+    assert ellipse.contains_xy(0,19)
+    assert not ellipse.contains_xy(19,0)
+    ellipse.angle=0
+    assert ellipse.contains_xy(19,0)
+    assert not ellipse.contains_xy(0,19)
+
+
+def test_ellipse_contains_scaled():
+    ellipse=GEllipse(x=0,y=0,width=10,height=10)
+    ellipse.scale=2
+    assert ellipse.contains_xy(9,0)
+    assert not ellipse.contains_xy(11,0)
+
+
+def test_select_ellipse():
+    ellipse=GEllipse(x=0,y=0,width=40,height=20)
+    square=GRectangle(x=100,y=0,width=10,height=10)
+    scene=GScene(children=[ellipse,square])
+    assert scene.select((0,0)) is ellipse
+    assert scene.select((19,0)) is ellipse
+    assert not scene.select((18,9)) is ellipse
+    assert scene.select((100,0)) is square
+
+
+@pytest.mark.parametrize('place',PLACES)
+def test_contains_xy(place):
+    for shape in make_shapes():
+        shape.x=place[0]
+        shape.y=place[1]
+        shape.angle=place[2]
+        shape.scale=place[3]
+        xs=[place[0]-41.3+2.9*i for i in range(30)]
+        ys=[place[1]-37.1+2.3*j for j in range(33)]
+        found=set()
+        for x in xs:
+            many=shape.contains_many([x]*len(ys),ys)
+            for y, answer in zip(ys,many):
+                result=shape.contains_xy(x,y)
+                assert result == shape.contains((x,y)), (shape,x,y)
+                assert result == answer, (shape,x,y)
+                assert result == expected(shape,x,y), (shape,x,y)
+                found.add(result)
+        assert found == ({False} if isinstance(shape,GPath) and
+        not isinstance(shape,(GTriangle,GPolygon)) else {True,False}), shape
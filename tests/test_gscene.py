@@ -0,0 +1,80 @@
+"""
+Tests for the grid index of GScene.select
+
+A scene with INDEX_THRESHOLD children or more selects through a grid, while a
+smaller scene searches its children one by one.  The two must always agree.
+"""
+import pytest
+
+pytest.importorskip('kivy')
+pytest.importorskip('introcs')
+
+from game2d import GScene, GRectangle
+
+
+def make_scene(size):
+    """
+    Returns the tuple (scene, children) of a scene with size squares in a row
+
+    Parameter size: the number of children
+    Precondition: size is an int > 0
+    """
+    children=[GRectangle(x=10*pos,y=0,width=8,height=8) for pos in range(size)]
+    return GScene(children=children),children
+
+
+def select_linear(scene,point):
+    """
+    Returns what scene.select(point) would return without the grid
+
+    Parameter scene: the scene to search
+    Precondition: scene is a GScene
+
+    Parameter point: the point to select
+    Precondition: point is a pair of numbers
+    """
+    threshold=GScene.INDEX_THRESHOLD
+    GScene.INDEX_THRESHOLD=len(scene.children)+1
+    try:
+        return scene.select(point)
+    finally:
+        GScene.INDEX_THRESHOLD=threshold
+
+
+def assert_agree(scene):
+    """
+    Asserts that the grid and the linear search select the same child at
+    points all over the scene
+
+    Parameter scene: the scene to search
+    Precondition: scene is a GScene with at least INDEX_THRESHOLD children
+    """
+    assert len(scene.children) >= GScene.INDEX_THRESHOLD
+    for x in range(-30,230,3):
+        for y in range(-4,5,2):
+            assert scene.select((x,y)) is select_linear(scene,(x,y)), (x,y)
+
+
+@pytest.mark.parametrize('change',['move','scale','rotate'])
+def test_select_after_change(change):
+    scene,children=make_scene(20)
+    assert_agree(scene)
+    child=children[0]
+    if change == 'move':
+        child.x=25
+    elif change == 'scale':
+        child.scale=4
+    else:
+        # A tall child lying down covers cells it was never listed in
+        child.height=40
+        scene.select((0,0))
+        child.angle=90
+    assert_agree(scene)
+
+
+def test_scaled_child_is_selected():
+    for size in (5,20):
+        scene,children=make_scene(size)
+        scene.select((0,0))
+        children[0].scale=4
+        assert scene.select((-15,3)) is children[0]
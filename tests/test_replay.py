@@ -0,0 +1,169 @@
+"""
+Tests for the headless replay of replay.py
+"""
+import pytest
+
+pytest.importorskip('introcs')
+
+import importlib
+import random
+import json
+import sys
+from consts import DEFAULT_CONFIG, TICK_RATE
+from simulation import WaveSim
+import replay
+from replay import LogInput, WaveReplay, play_log
+from logformat import read_log
+
+
+# The keys pressed in the logs written by write_log
+KEYS = ('left','right','spacebar')
+
+
+def write_log(path,ticks,seed=0,wave=123,config=DEFAULT_CONFIG):
+    """
+    Writes a log of random key edges, as Invaders would record it
+
+    Parameter path: the file to write
+    Precondition: path is a string
+
+    Parameter ticks: the number of ticks in the log
+    Precondition: ticks is an int > 0
+
+    Parameter seed: the seed of the key edges
+    Precondition: seed is an int
+
+    Parameter wave: the seed of the only wave
+    Precondition: wave is an int
+
+    Parameter config: the settings noted in the log
+    Precondition: config is a GameConfig
+    """
+    rnd=random.Random(seed)
+    down=set()
+    with open(path,'w') as file:
+        file.write(json.dumps({'version':1,'tickrate':TICK_RATE})+'\n')
+        file.write(json.dumps([0,[['a',{'seed':seed,'config':config._asdict()}],
+        ['a',{'wave':wave}],['a',{'feed':True}]]])+'\n')
+        for tick in range(ticks):
+            events=[]
+            for key in KEYS:
+                if rnd.random() < 0.1:
+                    events.append(['u' if key in down else 'd',key])
+                    down.symmetric_difference_update([key])
+            if events:
+                file.write(json.dumps([tick,events])+'\n')
+        file.write(json.dumps({'ticks':ticks})+'\n')
+
+
+def test_replay_does_not_import_kivy(monkeypatch):
+    class Blocker(object):
+        def find_spec(self,name,path,target=None):
+            if name.split('.')[0] in ('kivy','game2d','wave','models'):
+                raise ImportError('%s imported by replay' % name)
+            return None
+    for name in ('replay','simulation'):
+        monkeypatch.delitem(sys.modules,name)
+    monkeypatch.setattr(sys,'meta_path',[Blocker()]+sys.meta_path)
+    importlib.import_module('replay')
+
+
+def test_keys_and_notes(tmp_path):
+    path=str(tmp_path/'session.log')
+    write_log(path,500)
+    log=LogInput(path)
+    assert log.recall('wave') == 123
+    assert log.recall('missing',7) == 7
+    down=set()
+    with open(path) as file:
+        lines=[json.loads(line) for line in file][2:-1]
+    edges={line[0]: line[1] for line in lines}
+    for tick in range(500):
+        assert not log.getDone()
+        assert log.getDt() == 1.0/TICK_RATE
+        log.step()
+        pressed=set()
+        for code, key in edges.get(tick,()):
+            if code == 'd':
+                down.add(key)
+                pressed.add(key)
+            else:
+                down.discard(key)
+        for key in KEYS:
+            assert log.is_key_down(key) == (key in down)
+            assert log.is_key_pressed(key) == (key in pressed)
+    assert log.getDone()
+    assert len(log.getNotes()) == 3
+
+
+def test_matches_replay_input(tmp_path):
+    game2d=pytest.importorskip('game2d')
+    path=str(tmp_path/'session.log')
+    write_log(path,500,seed=4)
+    log=LogInput(path)
+    other=game2d.ReplayInput(path)
+    while not other.done:
+        log.step()
+        other._prestep()
+        for key in KEYS:
+            assert log.is_key_down(key) == other.is_key_down(key)
+            assert log.is_key_pressed(key) == other.is_key_pressed(key)
+        other._poststep()
+    assert log.getDone()
+    assert log.getNotes() == other.notes
+
+
+def test_variable_timestep(tmp_path):
+    # As InputRecorder writes it: the notes of tick 0 come before its dt
+    path=str(tmp_path/'session.log')
+    steps=[0.02,0.015,0.03,0.017]
+    with open(path,'w') as file:
+        file.write(json.dumps({'version':1,'tickrate':None})+'\n')
+        file.write(json.dumps([0,[['a',{'wave':5}]]])+'\n')
+        for tick, dt in enumerate(steps):
+            events=[['d','left']] if tick == 1 else []
+            file.write(json.dumps([tick,events,dt])+'\n')
+        file.write(json.dumps([3,[['a',{'end':True}]]])+'\n')
+        file.write(json.dumps({'ticks':len(steps)})+'\n')
+    header, footer, ticks=read_log(path)
+    assert [ticks[tick][1] for tick in range(4)] == steps
+    assert ticks[0][0] == [['a',{'wave':5}]]
+    assert ticks[3][0] == [['a',{'end':True}]]
+    log=LogInput(path)
+    played=[]
+    while not log.getDone():
+        played.append(log.getDt())
+        log.step()
+    assert played == steps
+    assert log.getNotes() == [(0,{'wave':5}),(3,{'end':True})]
+    game2d=pytest.importorskip('game2d')
+    assert game2d.ReplayInput(path).dt == steps[0]
+
+
+@pytest.mark.parametrize('config',[DEFAULT_CONFIG,
+    DEFAULT_CONFIG._replace(alien_rows=3,aliens_in_row=5,alien_speed=0.4)])
+def test_replay_plays_the_wave(tmp_path,config):
+    path=str(tmp_path/'session.log')
+    write_log(path,3000,seed=2,wave=99,config=config)
+    recorded=LogInput(path).recall('config')
+    player=WaveReplay(config=type(config)(**recorded))
+    ticks=play_log(LogInput(path),player.update)
+
+    # The same wave played straight from the log, without WaveReplay
+    log=LogInput(path)
+    sim=WaveSim(True,99,config)
+    played=0
+    while not log.getDone() and not (sim.assert_win_conditions() or
+        sim.assert_lose_conditions()):
+        dt=log.getDt()
+        log.step()
+        sim.update(*replay.controls(log),dt)
+        played+=1
+    assert ticks == 3000
+    results=player.getResults()
+    assert results[0][0] == 99
+    assert results[0][2:] == (sim.getLives(),sim.getFormation().count(),sim.getSteps())
+    # Replays are deterministic
+    again=WaveReplay(config=config)
+    play_log(LogInput(path),again.update)
+    assert again.getResults() == results
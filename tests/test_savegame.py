@@ -0,0 +1,147 @@
+"""
+Tests for the binary save format of savegame.py
+"""
+import pytest
+
+pytest.importorskip('introcs')
+
+import savegame
+from savegame import pack, unpack, unpack_from, save, load
+from simulation import WaveSim
+
+
+def played(lattice,seed=7,ticks=600):
+    """
+    Returns a WaveSim played for a number of ticks with steady inputs
+
+    Parameter lattice: whether the formation is stored as a lattice
+    Precondition: lattice is a bool
+
+    Parameter seed: the seed of the wave
+    Precondition: seed is an int
+
+    Parameter ticks: the number of ticks to play
+    Precondition: ticks is an int >= 0
+    """
+    sim=WaveSim(lattice,seed)
+    for tick in range(ticks):
+        sim.update(tick % 7 < 3,tick % 5 < 2,tick % 3 == 0,1/60)
+    return sim
+
+
+def with_size(record,size,flags=None):
+    """
+    Returns record with the payload size (and flags) in its header replaced
+
+    Parameter record: a valid record
+    Precondition: record is a bytes object
+
+    Parameter size: the new payload size
+    Precondition: size is an int >= 0
+
+    Parameter flags: the new flags, or None to keep them
+    Precondition: flags is an int in 0..255 or None
+    """
+    fields=list(savegame._HEADER.unpack_from(record))
+    fields[-1]=size
+    if flags is not None:
+        fields[2]=flags
+    return savegame._HEADER.pack(*fields)+record[savegame._HEADER.size:]
+
+
+@pytest.mark.parametrize('lattice',[True,False])
+@pytest.mark.parametrize('compress',[False,True])
+def test_round_trip(lattice,compress):
+    sim=played(lattice)
+    snapshot=sim.snapshot()
+    assert len(snapshot.bolts[0]) > 0
+    record=pack(snapshot,compress)
+    assert unpack(record) == snapshot
+    assert pack(unpack(record),compress) == record
+
+    # The restored wave plays on exactly as the saved one
+    other=WaveSim(lattice,3)
+    other.restore(unpack(record))
+    for tick in range(600):
+        sim.update(tick % 4 == 0,tick % 6 == 0,tick % 5 == 0,1/60)
+        other.update(tick % 4 == 0,tick % 6 == 0,tick % 5 == 0,1/60)
+    assert other.snapshot() == sim.snapshot()
+
+
+def test_round_trip_unseeded_and_fresh():
+    snapshot=WaveSim(True).snapshot()
+    assert unpack(pack(snapshot)) == snapshot
+    snapshot=WaveSim(False,0).snapshot()
+    assert unpack(pack(snapshot)) == snapshot
+
+
+def test_save_and_load(tmp_path):
+    path=str(tmp_path/'waves.sav')
+    snapshots=[played(lattice,seed,ticks).snapshot()
+    for lattice in (True,False) for seed, ticks in ((1,0),(2,300),(3,900))]
+    save(path,snapshots,True)
+    assert load(path) == snapshots
+    with open(path,'rb') as file:
+        data=file.read()
+    offset=0
+    for snapshot in snapshots:
+        loaded,offset=unpack_from(memoryview(data),offset)
+        assert loaded == snapshot
+    assert offset == len(data)
+
+
+def test_size_too_small_for_scalars():
+    record=pack(played(True).snapshot())
+    with pytest.raises(ValueError,match='corrupt'):
+        unpack_from(with_size(record,8))
+
+
+def test_compressed_flag_on_plain_payload():
+    record=pack(played(True).snapshot())
+    flags=savegame._HEADER.unpack_from(record)[2]
+    with pytest.raises(ValueError,match='corrupt'):
+        unpack_from(with_size(record,len(record)-savegame._HEADER.size,
+        flags|savegame.FLAG_COMPRESSED))
+
+
+@pytest.mark.parametrize('lattice',[True,False])
+@pytest.mark.parametrize('compress',[False,True])
+@pytest.mark.parametrize('field',[3,4,5])
+def test_payload_shorter_than_counts(lattice,compress,field):
+    # Claim one more row, column or bolt than was written
+    record=pack(played(lattice).snapshot(),compress)
+    fields=list(savegame._HEADER.unpack_from(record))
+    fields[field]+=1
+    record=savegame._HEADER.pack(*fields)+record[savegame._HEADER.size:]
+    with pytest.raises(ValueError,match='corrupt'):
+        unpack(record)
+
+
+def test_truncated_and_trailing():
+    record=pack(played(False).snapshot())
+    with pytest.raises(ValueError):
+        unpack(record[:-1])
+    with pytest.raises(ValueError):
+        unpack(record+b'\0')
+    with pytest.raises(ValueError):
+        unpack(b'XXXX'+record[4:])
+
+
+def test_load_corrupt_file(tmp_path):
+    path=str(tmp_path/'corrupt.sav')
+    good=pack(played(True).snapshot())
+    with open(path,'wb') as file:
+        file.write(good+with_size(good,8))
+    with pytest.raises(ValueError,match='corrupt'):
+        load(path)
+
+
+def test_dropped_count_and_version():
+    snapshot=played(False).snapshot()
+    snapshot=snapshot._replace(bolts=snapshot.bolts[:2]+(5,))
+    record=pack(snapshot)
+    assert unpack(record).bolts[2] == 5
+    fields=list(savegame._HEADER.unpack_from(record))
+    fields[1]=savegame.SAVE_VERSION+1
+    with pytest.raises(ValueError,match='version'):
+        unpack(savegame._HEADER.pack(*fields)+record[savegame._HEADER.size:])
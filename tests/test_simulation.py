@@ -0,0 +1,191 @@
+"""
+Tests for the headless rules of simulation.py
+"""
+import pytest
+
+pytest.importorskip('introcs')
+
+import random
+import numpy as np
+from consts import DEFAULT_CONFIG
+from simulation import BoltPool, FormationIndex, WaveSim
+
+
+def random_controls(seed,ticks):
+    """
+    Returns a list of ticks random (left, right, fire) controls
+
+    Parameter seed: the seed of the controls
+    Precondition: seed is an int
+
+    Parameter ticks: the number of controls
+    Precondition: ticks is an int >= 0
+    """
+    rnd=random.Random(seed)
+    return [(rnd.random() < 0.3,rnd.random() < 0.3,rnd.random() < 0.2)
+    for tick in range(ticks)]
+
+
+def trace(sim,controls,respawn=True):
+    """
+    Returns the list of states of sim after each of the controls
+
+    Each state is a tuple of the ship, the lives, the formation, the steps
+    and the bolts, so two traces are equal only if the waves played out the
+    same.  The ship is respawned whenever it dies, so the wave goes on.
+
+    Parameter sim: the wave to play
+    Precondition: sim is a WaveSim
+
+    Parameter controls: the (left, right, fire) controls of every tick
+    Precondition: controls is a list of triples of bools
+
+    Parameter respawn: whether to respawn the ship when it dies
+    Precondition: respawn is a bool
+    """
+    states=[]
+    for left, right, fire in controls:
+        sim.update(left,right,fire,1/60)
+        if respawn and sim.getDead() and sim.getLives() > 0:
+            sim.setDead(False)
+            sim.respawn_ship()
+        formation=sim.getFormation()
+        states.append((sim.getShipX(),sim.getLives(),sim.getSteps(),
+        formation.x.tolist(),formation.y.tolist(),formation.alive.tolist(),
+        tuple((bolt.x,bolt.y,bolt.velocity) for bolt in sim.getBolts())))
+        if sim.assert_win_conditions() or sim.assert_lose_conditions():
+            break
+    return states
+
+
+def scan(alive):
+    """
+    Returns what a FormationIndex of alive should hold, by scanning the grid
+
+    The result is the tuple (count, first, last, bottom, columns, leftmost,
+    rightmost, lowest), in the order of the properties of FormationIndex.
+
+    Parameter alive: which aliens are alive
+    Precondition: alive is a (rows,cols) bool array
+    """
+    rows,cols=alive.shape
+    first=[]
+    last=[]
+    for row in range(rows):
+        found=[col for col in range(cols) if alive[row,col]]
+        first.append(found[0] if found else None)
+        last.append(found[-1] if found else None)
+    bottom=[]
+    for col in range(cols):
+        found=[row for row in range(rows) if alive[row,col]]
+        bottom.append(found[-1] if found else None)
+    columns=[col for col in range(cols) if alive[:,col].any()]
+    filled=[row for row in range(rows) if alive[row].any()]
+    return (int(alive.sum()),first,last,bottom,columns,
+    columns[0] if columns else None,columns[-1] if columns else None,
+    filled[-1] if filled else None)
+
+
+def index_state(index):
+    """
+    Returns the properties of index in the order of scan
+
+    Parameter index: the index to read
+    Precondition: index is a FormationIndex
+    """
+    return (index.count,list(index.first),list(index.last),list(index.bottom),
+    list(index.columns),index.leftmost,index.rightmost,index.lowest)
+
+
+@pytest.mark.parametrize('seed',range(6))
+@pytest.mark.parametrize('shape',[(1,1),(1,7),(6,1),(5,11),(4,4)])
+def test_index_matches_scan(seed,shape):
+    rnd=random.Random(seed)
+    alive=np.array([[rnd.random() < 0.8 for col in range(shape[1])]
+    for row in range(shape[0])])
+    index=FormationIndex(alive)
+    assert index_state(index) == scan(alive)
+    living=[(row,col) for row in range(shape[0]) for col in range(shape[1])
+    if alive[row,col]]
+    rnd.shuffle(living)
+    for row, col in living:
+        index.remove(row,col)
+        alive[row,col]=False
+        assert index_state(index) == scan(alive), (row,col)
+    assert index_state(index) == (0,[None]*shape[0],[None]*shape[0],
+    [None]*shape[1],[],None,None,None)
+
+
+def test_pool_grows_when_full():
+    pool=BoltPool(2)
+    assert pool.acquire(0,0,1) is not None
+    assert pool.acquire(0,0,-1) is not None
+    assert pool.acquire(0,0,1) is not None
+    assert (len(pool),pool.capacity,pool.peak,pool.dropped) == (3,3,3,1)
+    state=pool.snapshot()
+    pool.release(pool.active[0])
+    assert pool.acquire(0,0,1) is not None
+    assert (pool.capacity,pool.dropped) == (3,1)
+    other=BoltPool(2)
+    other.restore(state)
+    assert (len(other),other.peak,other.dropped) == (3,3,1)
+    assert [bolt.velocity for bolt in other.active] == [1,-1,1]
+
+
+def test_small_pool_plays_by_the_rules():
+    config=DEFAULT_CONFIG._replace(bolt_pool=1,bolt_rate=1,alien_speed=0)
+    small=WaveSim(True,3,config)
+    large=WaveSim(True,3,config._replace(bolt_pool=64))
+    for tick in range(300):
+        fire=tick % 2 == 0
+        small.update(False,False,fire,1/60)
+        large.update(False,False,fire,1/60)
+        assert small.snapshot()[:-1] == large.snapshot()[:-1]
+        assert small.snapshot().bolts[0] == large.snapshot().bolts[0]
+    assert small.getBoltPool().dropped > 0
+    assert large.getBoltPool().dropped == 0
+
+
+@pytest.mark.parametrize('seed',[1,7,42])
+@pytest.mark.parametrize('config',[DEFAULT_CONFIG,
+    DEFAULT_CONFIG._replace(alien_rows=3,aliens_in_row=5,alien_speed=0.1,bolt_rate=2)])
+def test_lattice_matches_arrays(seed,config):
+    controls=random_controls(seed,6000)
+    lattice=trace(WaveSim(True,seed,config),controls)
+    arrays=trace(WaveSim(False,seed,config),controls)
+    assert len(lattice) > 100
+    assert lattice == arrays
+
+
+def test_same_seed_same_wave():
+    controls=random_controls(3,2000)
+    assert trace(WaveSim(True,11),controls) == trace(WaveSim(True,11),controls)
+    assert trace(WaveSim(True,11),controls) != trace(WaveSim(True,12),controls)
+
+
+@pytest.mark.parametrize('lattice',[True,False])
+def test_restore_continues_the_wave(lattice):
+    controls=random_controls(5,4000)
+    sim=WaveSim(lattice,7)
+    trace(sim,controls[:1500])
+    snapshot=sim.snapshot()
+    expected=trace(sim,controls[1500:])
+
+    other=WaveSim(lattice,99)
+    trace(other,controls[:300])
+    other.restore(snapshot)
+    assert other.getSeed() == 7
+    assert trace(other,controls[1500:]) == expected
+
+    sim.restore(snapshot)
+    assert sim.snapshot() == snapshot
+    assert trace(sim,controls[1500:]) == expected
+
+
+def test_snapshot_is_immutable():
+    sim=WaveSim(True,7)
+    trace(sim,random_controls(5,500))
+    snapshot=sim.snapshot()
+    hash(snapshot)
+    trace(sim,random_controls(6,500))
+    assert sim.snapshot() != snapshot
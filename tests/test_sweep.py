@@ -0,0 +1,53 @@
+"""
+Tests for the batch runner of sweep.py
+"""
+import pytest
+
+pytest.importorskip('introcs')
+
+import csv
+import sweep
+from consts import DEFAULT_CONFIG
+from simulation import WaveSim
+
+
+# A small grid of (rows, cols, speed, bolt_rate, lives, bolt_speed)
+GRID = [(2,3,0.1,2,3,10),(3,4,0.2,3,2,15)]
+
+
+def read_rows(path):
+    """
+    Returns the header and the sorted rows of the CSV file at path
+    """
+    with open(path,newline='') as file:
+        rows=list(csv.reader(file))
+    return rows[0],sorted(rows[1:])
+
+
+def test_configure():
+    config=sweep.configure(3,4,0.5,2,5,12)
+    assert config == DEFAULT_CONFIG._replace(alien_rows=3,aliens_in_row=4,
+    alien_speed=0.5,bolt_rate=2,ship_lives=5,bolt_speed=12)
+
+
+def test_run_plays_one_wave():
+    task=GRID[0]+(7,2000)
+    row=sweep.run(task)
+    assert row[:7] == task[:7]
+    sim=WaveSim(seed=7,config=sweep.configure(*GRID[0]))
+    outcome,ticks=sweep.play(sim,2000)
+    assert row[7:] == (outcome,ticks,sim.getSteps(),sim.getFormation().count(),
+    sim.getLives(),sim.getBoltPool().dropped)
+
+
+def test_results_do_not_depend_on_workers(tmp_path):
+    seeds=list(range(4))
+    results=[]
+    for workers, chunksize in ((1,None),(2,1),(3,3)):
+        path=str(tmp_path/('sweep%d.csv' % workers))
+        assert sweep.sweep(GRID,seeds,path,2000,workers,chunksize) == 8
+        results.append(read_rows(path))
+    header,rows=results[0]
+    assert tuple(header) == sweep.COLUMNS
+    assert len(rows) == 8
+    assert all(result == results[0] for result in results)
@@ -0,0 +1,118 @@
+"""
+Tests for the vectorized waves of vectorwave.py
+
+VectorWave must play every wave by the rules of WaveSim.  The waves draw their
+random numbers from one shared generator, so the tests use a subclass that draws
+them per wave from the same random.Random a WaveSim of the same seed would use.
+"""
+import pytest
+
+pytest.importorskip('introcs')
+
+import random
+import numpy as np
+from consts import DEFAULT_CONFIG, GAME_WIDTH
+from simulation import WaveSim
+from vectorwave import VectorWave, LEFT, RIGHT, FIRE, action
+
+
+class TwinWave(VectorWave):
+    """
+    A VectorWave whose waves draw the random numbers of seeded WaveSims
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _twins: the random numbers of every wave
+    # Invariant: _twins is a list of random.Random objects, one per wave
+
+    def __init__(self,seeds,config=DEFAULT_CONFIG):
+        """
+        Initializes one wave per seed
+
+        Parameter seeds: the seeds of the waves
+        Precondition: seeds is a non-empty list of ints
+
+        Parameter config: the settings of every wave
+        Precondition: config is a GameConfig
+        """
+        self._twins=[random.Random(seed) for seed in seeds]
+        VectorWave.__init__(self,len(seeds),seed=0,config=config)
+
+    def _randbelow(self,waves,highs):
+        """
+        Returns the next random number below each high, from each wave's twin
+        """
+        return np.array([self._twins[wave]._randbelow(int(high))
+        for wave, high in zip(waves,highs)],dtype=np.int64)
+
+
+def bolts_of(sim):
+    """
+    Returns the sorted positions of the bolts of a WaveSim
+    """
+    return sorted((bolt.x,bolt.y) for bolt in sim.getBolts())
+
+
+def bolts_at(waves,pos):
+    """
+    Returns the sorted positions of the bolts of wave pos of a VectorWave
+    """
+    bolts=[(waves._px[pos],waves._py[pos])] if waves._pactive[pos] else []
+    bolts+=[(x,y) for x, y, active in
+    zip(waves._ax[pos],waves._ay[pos],waves._aactive[pos]) if active]
+    return sorted(bolts)
+
+
+@pytest.mark.parametrize('config',[DEFAULT_CONFIG,
+    DEFAULT_CONFIG._replace(alien_rows=3,aliens_in_row=5,alien_speed=0.1,bolt_rate=2)])
+def test_matches_wavesim(config):
+    seeds=list(range(100,116))
+    waves=TwinWave(seeds,config)
+    sims=[WaveSim(True,seed,config) for seed in seeds]
+    playing=set(range(len(seeds)))
+    rnd=np.random.default_rng(5)
+    finished=0
+    for tick in range(6000):
+        actions=rnd.choice([0,1,2,3,4,5,6],size=len(seeds),
+        p=[.2,.15,.15,.05,.25,.1,.1])
+        rewards,dones,observations=waves.step(actions)
+        for pos in sorted(playing):
+            sim=sims[pos]
+            act=int(actions[pos])
+            sim.update(bool(act & LEFT),bool(act & RIGHT),bool(act & FIRE),1/60)
+            if sim.getDead():
+                sim.setDead(False)
+                sim.respawn_ship()
+            done=sim.assert_win_conditions() or sim.assert_lose_conditions()
+            assert done == bool(dones[pos]), (tick,pos)
+            if done:
+                playing.discard(pos)
+                finished+=1
+                continue
+            formation=sim.getFormation()
+            assert sim.getShipX() == waves._shipx[pos]
+            assert sim.getLives() == waves.lives[pos]
+            assert (formation.alive == waves.alive[pos]).all()
+            assert formation.origin == (waves._ox[pos],waves._oy[pos])
+            assert bolts_of(sim) == bolts_at(waves,pos)
+        if not playing:
+            break
+    assert finished > 0
+
+
+def test_observations_and_resets():
+    config=DEFAULT_CONFIG._replace(alien_rows=2,aliens_in_row=4,alien_speed=0.2)
+    waves=VectorWave(8,seed=1,config=config)
+    assert waves.config == config
+    observations=waves.reset()
+    assert observations.shape == (8,waves.observation_size)
+    assert waves.observation_size == 9+3*waves.slots+8
+    assert (observations[:,0] == np.float32(0.5)).all()
+    assert (observations[:,-8:] == 1).all()
+
+    rnd=np.random.default_rng(0)
+    for tick in range(3000):
+        rewards,dones,observations=waves.step(rnd.integers(0,8,8))
+        assert (observations[:,0] == (waves._shipx/GAME_WIDTH).astype(np.float32)).all()
+        assert (observations[:,-8:] == waves.alive.reshape(8,-1)).all()
+    assert waves.episodes > 0
+    assert action(True,False,True) == LEFT|FIRE
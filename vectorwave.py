@@ -0,0 +1,615 @@
+"""
+Vectorized simulation module for Alien Invaders
+
+This module steps many independent waves of Alien Invaders at once, for bot
+training and balance sweeps.  The state of every wave is a row of a stack of
+NumPy arrays, so one step of all of the waves is a fixed number of array
+operations, whatever their number.
+
+The rules are those of WaveSim (simulation.py), with the formation stored as
+a lattice.  The only differences are the ones an environment needs:
+
+* The random numbers come from one NumPy generator shared by all waves, so a
+  VectorWave does not play out like a WaveSim with the same seed.
+* When the ship is destroyed it is respawned at the end of the step (as if the
+  player pressed 'R' at once) as long as there are lives left.
+* A wave that is won or lost is replaced by a new one at the end of the step.
+
+The actions are bitmasks of LEFT, RIGHT and FIRE, one per wave.  FIRE counts
+as a press of the spacebar in every step it is set.
+
+Kiyam Merali km942, Eben Hill emh238
+12/03/2023
+"""
+from consts import *
+import numpy as np
+import math
+
+# PRIMARY RULE: Like simulation.py, this module must never import game2d or
+# anything else that depends on Kivy.
+
+
+# The bits of an action
+LEFT  = 1
+RIGHT = 2
+FIRE  = 4
+
+# The reward for killing an alien and for losing a life
+REWARD_KILL  = 1.0
+REWARD_DEATH = -1.0
+
+# The number of values in an observation before the alien bolts
+_SCALARS = 9
+
+
+def action(left,right,fire):
+    """
+    Returns the action bitmask for the three controls of the game
+
+    Parameter left: whether the left control is held down
+    Precondition: left is a bool
+
+    Parameter right: whether the right control is held down
+    Precondition: right is a bool
+
+    Parameter fire: whether the fire control was just pressed
+    Precondition: fire is a bool
+    """
+    return (LEFT if left else 0)|(RIGHT if right else 0)|(FIRE if fire else 0)
+
+
+class VectorWave(object):
+    """
+    A class to simulate N waves of Alien Invaders together.
+
+    Call step with an array of N actions to advance every wave by one frame.
+    It returns the rewards, the done flags and the observations of all of
+    the waves.  A wave that is done has already been replaced by a new one,
+    so its observation is the first of the new wave.
+
+    An observation is a row of observation_size float32 values:
+
+    * 0: the x coordinate of the ship / GAME_WIDTH
+    * 1: the lives left / the lives of a new wave
+    * 2, 3: the center of the top left alien of the lattice, divided by
+      GAME_WIDTH and GAME_HEIGHT
+    * 4: the direction of the march (1 for right, 0 for left)
+    * 5: the time since the last alien step / the alien speed (at most 1)
+    * 6, 7, 8: whether the player bolt is active, and its x and y coordinates
+      divided by GAME_WIDTH and GAME_HEIGHT
+    * then 3 values per alien bolt slot, as for the player bolt
+    * then the alive mask of the formation (1 for alive), row by row
+
+    The reward of a step is REWARD_KILL for every alien killed, plus
+    REWARD_DEATH if the ship was destroyed.
+
+    Every wave is played with the same GameConfig.  Its seed is ignored, since
+    the waves share the random numbers of the seed given to the constructor.
+    """
+    # HIDDEN ATTRIBUTES:
+    # Attribute _rng: the random numbers of every wave
+    # Invariant: _rng is a numpy.random.Generator
+    #
+    # Attribute _config: the settings of every wave
+    # Invariant: _config is a GameConfig
+    #
+    # Attribute _pitchx, _pitchy: the distance between the centers of
+    # neighboring aliens, across and down
+    # Invariant: _pitchx and _pitchy are numbers > 0
+    #
+    # Attribute _dt: the time step of every update
+    # Invariant: _dt is a float > 0
+    #
+    # Attribute _shipx: the x coordinate of each ship
+    # Invariant: _shipx is an (N,) float array
+    #
+    # Attribute _prevshipx: the x coordinate of each ship before the last step
+    # Invariant: _prevshipx is an (N,) float array
+    #
+    # Attribute _shipalive: whether each ship is on the screen
+    # Invariant: _shipalive is an (N,) bool array
+    #
+    # Attribute _lives: the lives left in each wave
+    # Invariant: _lives is an (N,) int array of values >= 0
+    #
+    # Attribute _time: the time since the last alien step of each wave
+    # Invariant: _time is an (N,) float array of values >= 0
+    #
+    # Attribute _direction: the direction of each march (True is right)
+    # Invariant: _direction is an (N,) bool array
+    #
+    # Attribute _nextshot: the alien steps until each wave fires a bolt
+    # Invariant: _nextshot is an (N,) int array of values >= 0
+    #
+    # Attribute _steps: the alien steps taken in each wave
+    # Invariant: _steps is an (N,) int array of values >= 0
+    #
+    # Attribute _ox, _oy: the center of the top left alien of each lattice
+    # Invariant: _ox and _oy are (N,) float arrays
+    #
+    # Attribute _alive: which aliens are alive in each wave
+    # Invariant: _alive is an (N,rows,cols) bool array, with the rows and
+    # columns of the formation in _config
+    #
+    # Attribute _count: the number of living aliens in each wave
+    # Invariant: _count is an (N,) int array matching _alive
+    #
+    # Attribute _pactive: whether each wave has a player bolt
+    # Invariant: _pactive is an (N,) bool array
+    #
+    # Attribute _px, _py, _pprevy: the position of each player bolt, and its
+    # y coordinate before the last step
+    # Invariant: _px, _py and _pprevy are (N,) float arrays
+    #
+    # Attribute _aactive: which alien bolt slots of each wave are in use
+    # Invariant: _aactive is an (N,slots) bool array
+    #
+    # Attribute _ax, _ay, _aprevy: the positions of the alien bolts, and their
+    # y coordinates before the last step
+    # Invariant: _ax, _ay and _aprevy are (N,slots) float arrays
+    #
+    # Attribute _aorder: the order the alien bolts were fired in
+    # Invariant: _aorder is an (N,slots) int array
+    #
+    # Attribute _fired: the number of alien bolts fired in each wave
+    # Invariant: _fired is an (N,) int array
+    #
+    # Attribute _episodes: the number of waves finished
+    # Invariant: _episodes is an int >= 0
+    #
+    # Attribute _wins: the number of waves won
+    # Invariant: _wins is an int in 0.._episodes
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def size(self):
+        """
+        The number of waves simulated together
+        """
+        return self._shipx.shape[0]
+
+    @property
+    def slots(self):
+        """
+        The number of alien bolts each wave can have on screen
+        """
+        return self._aactive.shape[1]
+
+    @property
+    def config(self):
+        """
+        The GameConfig of every wave
+        """
+        return self._config
+
+    @property
+    def observation_size(self):
+        """
+        The number of values in the observation of a wave
+        """
+        return _SCALARS+3*self.slots+self._alive.shape[1]*self._alive.shape[2]
+
+    @property
+    def episodes(self):
+        """
+        The number of waves won or lost so far
+        """
+        return self._episodes
+
+    @property
+    def wins(self):
+        """
+        The number of waves won so far
+        """
+        return self._wins
+
+    @property
+    def lives(self):
+        """
+        The (N,) array of lives left in each wave
+
+        This array is owned by the simulation and must not be modified.
+        """
+        return self._lives
+
+    @property
+    def alive(self):
+        """
+        The (N,rows,cols) mask of the living aliens of each wave
+
+        This array is owned by the simulation and must not be modified.
+        """
+        return self._alive
+
+    def __init__(self,size,seed=None,dt=1.0/TICK_RATE,slots=None,
+                 config=DEFAULT_CONFIG):
+        """
+        Initializes size new waves
+
+        By default each wave gets as many alien bolt slots as it can ever
+        have bolts on screen at once with this dt, so no bolt is ever dropped
+        and the waves play as a WaveSim does.  With fewer slots, an alien bolt
+        fired while all of them are in use is lost, which a WaveSim never does.
+
+        Parameter size: the number of waves
+        Precondition: size is an int > 0
+
+        Parameter seed: the seed of the random numbers of the waves
+        Precondition: seed is an int, or None to let the system pick one
+
+        Parameter dt: the time step of every update
+        Precondition: dt is a float > 0
+
+        Parameter slots: the number of alien bolts a wave can have on screen
+        Precondition: slots is an int > 0, or None
+
+        Parameter config: the settings of every wave
+        Precondition: config is a GameConfig
+        """
+        assert isinstance(size,int) and size > 0
+        assert seed is None or isinstance(seed,int)
+        assert (isinstance(dt,int) or isinstance(dt,float)) and dt > 0
+        assert slots is None or (isinstance(slots,int) and slots > 0)
+        assert isinstance(config,GameConfig)
+        if slots is None:
+            slots=_default_slots(dt,config)
+        self._rng=np.random.default_rng(seed)
+        self._config=config
+        self._pitchx=config.alien_width+config.alien_h_sep
+        self._pitchy=config.alien_height+config.alien_v_sep
+        self._dt=float(dt)
+        self._shipx=np.empty(size)
+        self._prevshipx=np.empty(size)
+        self._shipalive=np.empty(size,dtype=bool)
+        self._lives=np.empty(size,dtype=np.int32)
+        self._time=np.empty(size)
+        self._direction=np.empty(size,dtype=bool)
+        self._nextshot=np.empty(size,dtype=np.int32)
+        self._steps=np.empty(size,dtype=np.int64)
+        self._ox=np.empty(size)
+        self._oy=np.empty(size)
+        self._alive=np.empty((size,config.alien_rows,config.aliens_in_row),
+        dtype=bool)
+        self._count=np.empty(size,dtype=np.int32)
+        self._pactive=np.empty(size,dtype=bool)
+        self._px=np.zeros(size)
+        self._py=np.zeros(size)
+        self._pprevy=np.zeros(size)
+        self._aactive=np.empty((size,slots),dtype=bool)
+        self._ax=np.zeros((size,slots))
+        self._ay=np.zeros((size,slots))
+        self._aprevy=np.zeros((size,slots))
+        self._aorder=np.zeros((size,slots),dtype=np.int64)
+        self._fired=np.empty(size,dtype=np.int64)
+        self._episodes=0
+        self._wins=0
+        self._reset(np.ones(size,dtype=bool))
+
+    def reset(self):
+        """
+        Replaces every wave with a new one and returns their observations
+        """
+        self._reset(np.ones(self.size,dtype=bool))
+        self._episodes=0
+        self._wins=0
+        return self.observe()
+
+    # UPDATE METHOD
+    def step(self,actions):
+        """
+        Advances every wave by one frame and returns the tuple
+        (rewards, dones, observations)
+
+        The rewards are an (N,) float32 array, the dones an (N,) bool array
+        and the observations an (N,observation_size) float32 array.
+
+        Parameter actions: the action of each wave
+        Precondition: actions is a sequence of N ints, each a bitmask of LEFT,
+        RIGHT and FIRE
+        """
+        actions=np.asarray(actions)
+        assert actions.shape == (self.size,)
+        rewards=np.zeros(self.size,dtype=np.float32)
+        config=self._config
+        movement=config.ship_movement
+        speed=config.bolt_speed
+
+        # The ship moves right, then left, as in WaveSim.update
+        shipx=self._shipx
+        self._prevshipx[:]=shipx
+        right=self._shipalive & ((actions & RIGHT) != 0) & (shipx <= GAME_WIDTH)
+        np.add(shipx,movement,out=shipx,where=right)
+        left=self._shipalive & ((actions & LEFT) != 0) & (shipx >= 0)
+        np.subtract(shipx,movement,out=shipx,where=left)
+
+        march=self._time > config.alien_speed
+        self._time+=self._dt
+        if march.any():
+            self._time[march]=0
+            self._march(np.flatnonzero(march))
+
+        fire=(((actions & FIRE) != 0) & self._shipalive) & ~self._pactive
+        self._px[fire]=shipx[fire]
+        self._py[fire]=config.ship_bottom+config.ship_height
+        self._pactive|=fire
+
+        self._pprevy[:]=self._py
+        self._py+=speed
+        self._aprevy[:]=self._ay
+        self._ay-=speed
+
+        shooting=np.flatnonzero(self._nextshot == 0)
+        if shooting.size:
+            self._shoot(shooting)
+        self._hit_aliens(rewards)
+        self._hit_ship(rewards)
+
+        self._pactive&=~_offscreen(self._py,config.bolt_height)
+        self._aactive&=~_offscreen(self._ay,config.bolt_height)
+
+        won=self._count == 0
+        dones=won | (self._lives == 0) | self._below_line()
+        if dones.any():
+            self._episodes+=int(dones.sum())
+            self._wins+=int(won.sum())
+            self._reset(dones)
+        return rewards,dones,self.observe()
+
+    def observe(self):
+        """
+        Returns the (N,observation_size) float32 array of observations
+        """
+        slots=self.slots
+        obs=np.empty((self.size,self.observation_size),dtype=np.float32)
+        obs[:,0]=self._shipx/GAME_WIDTH
+        obs[:,1]=self._lives/self._config.ship_lives
+        obs[:,2]=self._ox/GAME_WIDTH
+        obs[:,3]=self._oy/GAME_HEIGHT
+        obs[:,4]=self._direction
+        obs[:,5]=np.minimum(self._time/max(self._config.alien_speed,self._dt),1)
+        obs[:,6]=self._pactive
+        obs[:,7]=self._px/GAME_WIDTH
+        obs[:,8]=self._py/GAME_HEIGHT
+        bolts=obs[:,_SCALARS:_SCALARS+3*slots].reshape(self.size,slots,3)
+        bolts[:,:,0]=self._aactive
+        bolts[:,:,1]=self._ax/GAME_WIDTH
+        bolts[:,:,2]=self._ay/GAME_HEIGHT
+        obs[:,_SCALARS+3*slots:]=self._alive.reshape(self.size,-1)
+        return obs
+
+    # HELPER METHODS
+    def _reset(self,mask):
+        """
+        Replaces the waves in mask with new ones
+
+        Parameter mask: which waves to replace
+        Precondition: mask is an (N,) bool array
+        """
+        config=self._config
+        self._shipx[mask]=GAME_WIDTH/2
+        self._prevshipx[mask]=GAME_WIDTH/2
+        self._shipalive[mask]=True
+        self._lives[mask]=config.ship_lives
+        self._time[mask]=0
+        self._direction[mask]=True
+        self._steps[mask]=0
+        self._ox[mask]=config.alien_h_sep+(config.alien_width/2)
+        self._oy[mask]=GAME_HEIGHT-(config.alien_ceiling+(config.alien_height/2))
+        self._alive[mask]=True
+        self._count[mask]=config.alien_rows*config.aliens_in_row
+        self._pactive[mask]=False
+        self._aactive[mask]=False
+        self._fired[mask]=0
+        waves=np.flatnonzero(mask)
+        self._nextshot[waves]=1+self._randbelow(waves,
+        np.full(waves.size,config.bolt_rate))
+
+    def _randbelow(self,waves,highs):
+        """
+        Returns an array of random ints, each in 0..high-1 for its high
+
+        All of the random numbers of the waves are drawn here, so that a
+        subclass can replace them (to draw them per wave, for example).
+
+        Parameter waves: the indices of the waves drawing the numbers
+        Precondition: waves is a 1d int array
+
+        Parameter highs: the exclusive upper bounds, one per wave
+        Precondition: highs is a 1d int array of values > 0 as long as waves
+        """
+        return self._rng.integers(0,highs)
+
+    def _march(self,waves):
+        """
+        Steps the formations of the given waves, as WaveSim.horde_move does
+
+        Each non-empty row is checked against the edge in turn, with the
+        walks of the rows before it added in.
+
+        Parameter waves: the indices of the waves to step
+        Precondition: waves is a 1d int array
+        """
+        config=self._config
+        sep=config.alien_h_sep
+        hwalk=config.alien_h_walk
+        alive=self._alive[waves]
+        rows,cols=alive.shape[1:]
+        filled=alive.any(axis=2)
+        first=self._ox[waves,np.newaxis]+np.argmax(alive,axis=2)*self._pitchx
+        last=(self._ox[waves,np.newaxis]+
+        (cols-1-np.argmax(alive[:,:,::-1],axis=2))*self._pitchx)
+        direction=self._direction[waves]
+        dx=np.zeros(waves.size)
+        dy=np.zeros(waves.size)
+        for row in range(rows):
+            turnleft=filled[:,row] & direction & (
+            (GAME_WIDTH-(last[:,row]+dx)) < sep)
+            turnright=filled[:,row] & ~direction & (
+            (first[:,row]+dx) < sep)
+            turn=turnleft | turnright
+            walk=filled[:,row] & ~turn
+            dx+=np.where(walk,np.where(direction,hwalk,-hwalk),0)
+            dy-=np.where(turn,config.alien_v_walk,0)
+            direction=(direction & ~turnleft) | turnright
+        self._ox[waves]+=dx
+        self._oy[waves]+=dy
+        self._direction[waves]=direction
+        self._steps[waves]+=1
+        self._nextshot[waves]-=1
+
+    def _shoot(self,waves):
+        """
+        Fires a bolt from the bottom alien of a random non-empty column of
+        each of the given waves, then restarts their countdowns
+
+        Parameter waves: the indices of the waves whose countdown ran out
+        Precondition: waves is a 1d int array
+        """
+        config=self._config
+        alive=self._alive[waves]
+        columns=alive.any(axis=1)
+        counts=columns.sum(axis=1)
+        armed=counts > 0
+        if armed.any():
+            alive=alive[armed]
+            shooters=waves[armed]
+            pick=self._randbelow(shooters,counts[armed])
+            col=np.argmax(np.cumsum(columns[armed],axis=1) > pick[:,np.newaxis],axis=1)
+            height=alive[np.arange(shooters.size),:,col]
+            row=alive.shape[1]-1-np.argmax(height[:,::-1],axis=1)
+            free=~self._aactive[shooters]
+            room=free.any(axis=1)
+            shooters=shooters[room]
+            slot=np.argmax(free[room],axis=1)
+            x=self._ox[shooters]+col[room]*self._pitchx
+            y=self._oy[shooters]-row[room]*self._pitchy-config.bolt_height/2
+            self._aactive[shooters,slot]=True
+            self._ax[shooters,slot]=x
+            self._ay[shooters,slot]=y
+            self._aprevy[shooters,slot]=y
+            self._aorder[shooters,slot]=self._fired[shooters]
+            self._fired[shooters]+=1
+        self._nextshot[waves]=1+self._randbelow(waves,
+        np.full(waves.size,config.bolt_rate))
+
+    def _hit_aliens(self,rewards):
+        """
+        Kills the first alien on the path of each player bolt, and drops the
+        bolts that hit, as LatticeFormation.kill_along does
+
+        Parameter rewards: the rewards of the current step
+        Precondition: rewards is an (N,) float array
+        """
+        waves=np.flatnonzero(self._pactive)
+        if not waves.size:
+            return
+        config=self._config
+        pitchx=self._pitchx
+        pitchy=self._pitchy
+        halfheight=config.alien_height/2
+        cols=self._alive.shape[2]
+        x=self._px[waves]
+        ox=self._ox[waves]
+        col=np.rint((x-ox)/pitchx).astype(np.int64)
+        inside=(col >= 0) & (col < cols)
+        col=np.clip(col,0,cols-1)
+        inside&=np.abs(x-(ox+col*pitchx)) < config.alien_width/2
+        oy=self._oy[waves]
+        low=np.minimum(self._pprevy[waves],self._py[waves])
+        high=np.maximum(self._pprevy[waves],self._py[waves])
+        first=np.floor((oy-high-halfheight)/pitchy)+1
+        last=np.ceil((oy-low+halfheight)/pitchy)-1
+        rows=np.arange(self._alive.shape[1])
+        path=(self._alive[waves,:,col] & inside[:,np.newaxis] &
+        (rows >= first[:,np.newaxis]) & (rows <= last[:,np.newaxis]))
+        hit=path.any(axis=1)
+        if not hit.any():
+            return
+        # Player bolts move up, so they enter the lowest row first
+        row=rows.size-1-np.argmax(path[hit,::-1],axis=1)
+        waves=waves[hit]
+        self._alive[waves,row,col[hit]]=False
+        self._count[waves]-=1
+        self._pactive[waves]=False
+        rewards[waves]+=REWARD_KILL
+
+    def _hit_ship(self,rewards):
+        """
+        Destroys each ship hit by an alien bolt, along with the bolt that
+        reached it first, as WaveSim.resolve_ship_collisions does
+
+        A destroyed ship is respawned at once if there are lives left.
+
+        Parameter rewards: the rewards of the current step
+        Precondition: rewards is an (N,) float array
+        """
+        config=self._config
+        bottom=config.ship_bottom
+        top=bottom+config.ship_height
+        near=(self._aactive & self._shipalive[:,np.newaxis] &
+        (np.abs(self._ax-self._shipx[:,np.newaxis]) < config.ship_width/2))
+        if not near.any():
+            return
+        near&=(self._ay < top) & (self._aprevy > bottom)
+        waves=np.flatnonzero(near.any(axis=1))
+        if not waves.size:
+            return
+        near=near[waves]
+        depth=np.where(near,np.maximum(0,self._aprevy[waves]-top),np.inf)
+        near&=depth == depth.min(axis=1)[:,np.newaxis]
+        order=np.where(near,self._aorder[waves],np.iinfo(np.int64).max)
+        slot=np.argmin(order,axis=1)
+        self._aactive[waves,slot]=False
+        self._lives[waves]-=1
+        rewards[waves]+=REWARD_DEATH
+        self._shipalive[waves]=False
+        waves=waves[self._lives[waves] > 0]
+        self._shipx[waves]=GAME_WIDTH/2
+        self._prevshipx[waves]=GAME_WIDTH/2
+        self._shipalive[waves]=True
+
+    def _below_line(self):
+        """
+        Returns the (N,) bool array of waves with an alien below the defense
+        line
+        """
+        filled=self._alive.any(axis=2)
+        low=filled.shape[1]-1-np.argmax(filled[:,::-1],axis=1)
+        return filled.any(axis=1) & (self._oy-low*self._pitchy <
+        self._config.defense_line)
+
+
+def _offscreen(y,height):
+    """
+    Returns the bool array of the bolts at y that have left the screen
+
+    Parameter y: the y coordinates of the bolts
+    Precondition: y is a float array
+
+    Parameter height: the height of a bolt
+    Precondition: height is a number >= 0
+    """
+    return (y-height/2 > GAME_HEIGHT) | (y+height/2 < 0)
+
+
+def _default_slots(dt,config):
+    """
+    Returns the most alien bolts a wave can have on screen with time step dt
+
+    A bolt is on screen for at most the frames it takes to cross the screen,
+    and the aliens fire at most once per step of the formation.  This does not
+    depend on bolt_pool, which only sizes the pool a WaveSim starts with.
+    Bolts that do not move never leave, so then there is no such limit, and
+    the waves get bolt_pool slots.
+
+    Parameter dt: the time step of every update
+    Precondition: dt is a float > 0
+
+    Parameter config: the settings of the waves
+    Precondition: config is a GameConfig
+    """
+    if config.bolt_speed == 0:
+        return config.bolt_pool
+    lifetime=math.ceil((GAME_HEIGHT+config.bolt_height)/config.bolt_speed)+1
+    period=math.floor(config.alien_speed/dt)+2
+    return math.ceil(lifetime/period)+1
@@ -19,7 +19,7 @@ Kiyam Merali km942, Eben Hill emh238
 from game2d import *
 from consts import *
 from models import *
-import random
+from simulation import *
 
 # PRIMARY RULE: Wave can only access attributes in models.py via getters/setters
 # Wave is NOT allowed to access anything in app.py (Subcontrollers are not
@@ -37,6 +37,11 @@ class Wave(object):
     loses). When the wave is complete, you  should create a NEW instance of
     Wave (in Invaders) if you want to make a new wave of aliens.
 
+    The rules of the wave live in the headless class WaveSim (simulation.py).
+    This class is a thin adapter around it: update translates the GInput into
+    the controls of the simulation, and draw mirrors the simulation state onto
+    the Ship, Alien and Bolt models before drawing them.
+
     If you want to pause the game, tell this controller to draw, but do not
     update.  See subcontrollers.py from Lecture 24 for an example.  This
     class will be similar to than one in how it interacts with the main class
@@ -50,33 +55,34 @@ class Wave(object):
     everything else hidden.
     """
     # HIDDEN ATTRIBUTES:
-    # Attribute _ship: the player ship to control
-    # Invariant: _ship is a Ship object or None
+    # Attribute _sim: the headless simulation of this wave
+    # Invariant: _sim is a WaveSim object
+    #
+    # Attribute _ship: the player ship to draw
+    # Invariant: _ship is a Ship object or None (if the ship is dead)
     #
-    # Attribute _aliens: the 2d list of aliens in the wave
-    # Invariant: _aliens is a rectangular 2d list containing Alien objects or None
+    # Attribute _aliens: the aliens to draw, one batch per alien image
+    # Invariant: _aliens is a list of GBatch objects, one for each image in
+    # ALIEN_IMAGES, each with room for the whole formation
     #
-    # Attribute _bolts: the laser bolts currently on screen
-    # Invariant: _bolts is a list of Bolt objects, possibly empty
+    # Attribute _bolts: the laser bolts to draw
+    # Invariant: _bolts is a GBatch object at least as large as the BoltPool
+    # in _sim, when it was last drawn
     #
     # Attribute _dline: the defensive line being protected
     # Invariant : _dline is a GPath object
     #
-    # Attribute _lives: the number of lives left
-    # Invariant: _lives is an int >= 0
-    #
-    # Attribute _time: the amount of time since the last Alien "step"
-    # Invariant: _time is a float >= 0s
+    # Attribute _steps: the alien step last mirrored onto _aliens
+    # Invariant: _steps is an int >= 0, or None if _aliens is not placed yet
     #
-    # Attribute _dead: a bool relating whether or not the ship just died
-    # Invariant: _dead is a boolean
+    # Attribute _count: the number of living aliens last mirrored onto _aliens
+    # Invariant: _count is an int >= 0
     #
-    # Attribute _nextshot: the number of moves until the next alien shoots
-    # Invariant: _nextshot is an int >= 0
+    # Attribute _view: the view the models are attached to
+    # Invariant: _view is a GView object, or None if the wave is hidden
     #
-    # You may change any attribute above, as long as you update the invariant
-    # You may also add any new attributes as long as you document them.
-    # LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
+    # Attribute _config: the settings of the wave
+    # Invariant: _config is a GameConfig
 
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
@@ -84,20 +90,26 @@ class Wave(object):
         """
         Returns the _dead attribute for the current wave object
         """
-        return self._dead
+        return self._sim.getDead()
 
-    def getAliens(self):
+    def getLives(self):
         """
-        Returns the _aliens attribute for the current wave class (2D list
-        containing Alien objects or None)
+        Returns the number of lives the player has left (int)
         """
-        return self._aliens
+        return self._sim.getLives()
 
-    def getLives(self):
+    def getSeed(self):
         """
-        Returns the number of lives the player has left (int)
+        Returns the seed of the wave (int), or None if it was seeded by the
+        system
+        """
+        return self._sim.getSeed()
+
+    def getConfig(self):
         """
-        return self._lives
+        Returns the GameConfig of the wave
+        """
+        return self._config
 
     def setDead(self,b):
         """
@@ -106,28 +118,38 @@ class Wave(object):
         Parameter b: the truth value of the dead attribute
         Precondition: b is a boolean
         """
-        assert isinstance(b,bool)
-        self._dead=b
+        self._sim.setDead(b)
 
     # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
-    def __init__(self):
+    def __init__(self,seed=None,config=DEFAULT_CONFIG):
         """
         Initializes an object of the wave class
+
+        Waves with the same seed and settings play out the same way for the
+        same input.
+
+        Parameter seed: the seed of the random numbers of the wave
+        Precondition: seed is an int, or None to let the system pick one
+
+        Parameter config: the settings of the wave
+        Precondition: config is a GameConfig
         """
-        self._ship=Ship()
-        x_cor_al=(ALIEN_H_SEP+(ALIEN_WIDTH/2))
-        y_cor_al=GAME_HEIGHT-(ALIEN_CEILING+(ALIEN_HEIGHT/2))
-        self._aliens=self._alien_2d(x_cor_al,y_cor_al,ALIENS_IN_ROW,ALIEN_ROWS,
-        ALIEN_IMAGES[0])
-        self._bolts=[]
+        self._config=config
+        self._sim=WaveSim(seed=seed,config=config)
+        self._ship=Ship(config)
+        formation=self._sim.getFormation()
+        self._aliens=[GBatch(width=config.alien_width,height=config.alien_height,
+        capacity=formation.rows*formation.cols,source=source)
+        for source in ALIEN_IMAGES]
+        self._bolts=GBatch(width=config.bolt_width,height=config.bolt_height,
+        capacity=self._sim.getBoltPool().capacity,fillcolor='blue')
         #defense line
-        self._dline=GPath(points=[0,DEFENSE_LINE,GAME_WIDTH,DEFENSE_LINE],\
+        line=config.defense_line
+        self._dline=GPath(points=[0,line,GAME_WIDTH,line],\
         linewidth=1,linecolor='red')
-        self._lives=SHIP_LIVES
-        self._time=0
-        self._direction=True #right, False means left
-        self._dead=False
-        self._nextshot=random.randint(1,BOLT_RATE)
+        self._steps=None
+        self._count=0
+        self._view=None
 
     # UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
     def update(self,input,dt):
@@ -144,379 +166,165 @@ class Wave(object):
         assert isinstance(input, GInput)
         assert isinstance(dt, float)
         assert dt >= 0
+        left,right,fire=controls(input)
+        self._sim.update(left,right,fire,dt)
 
-        if self._ship.getShipX() <= GAME_WIDTH:
-            if input.is_key_down('right'):
-                self._ship.moveShip(SHIP_MOVEMENT)
-        if self._ship.getShipX() >= 0:
-            if input.is_key_down('left'):
-                self._ship.moveShip(-SHIP_MOVEMENT)
-        if self._time > ALIEN_SPEED:
-            self.horde_move(ALIEN_H_WALK,ALIEN_V_WALK)
-            self._nextshot-=1
-            self._time=0
-        else:
-            self._time+=dt
-        if input.is_key_pressed('spacebar'):
-            if self.no_player_bolt()==True:
-                self.ship_fire_bolt()
-        for bolt in self._bolts:
-            bolt.moveBolt()
-        for bolt in self._bolts:
-            if bolt.bottom > GAME_HEIGHT or bolt.top<0:
-                del self._bolts[self._bolts.index(bolt)]
-
-        self.resolve_alien_shots()
-        self.resolve_alien_collisions()
-        self.resolve_ship_collisions()
-        self.update_lives()
-
-    def no_player_bolt(self):
+    def respawn_ship(self):
         """
-        Returns True if there are no player bolts on the screen
+        Respawns the ship at the center of board
         """
-        for bolt in self._bolts:
-            if bolt.isPlayerBolt():
-                return False
-        return True
+        self._sim.respawn_ship()
 
-    def resolve_alien_shots(self):
-        """
-        Has the aliens shoot after the countdown from their last shot
+    def snapshot(self):
         """
-        if self._nextshot == 0:
-            self.alien_fire_bolt()
-            self._nextshot=random.randint(1,BOLT_RATE)
+        Returns the state of the wave as a WaveSnapshot (see simulation.py)
 
-    def resolve_alien_collisions(self):
+        Only the simulation is captured.  The models hold nothing that is not
+        mirrored from it, so a snapshot is much cheaper than a new Wave.
         """
-        Resolves bolt collisions with aliens
-        """
-        for bolt in self._bolts:
-            for row in self._aliens:
-                for alien in row:
-                    if alien is not None and bolt.collides(alien)\
-                     and bolt.isPlayerBolt():
-                        row[row.index(alien)]= None
-                        del self._bolts[self._bolts.index(bolt)]
+        return self._sim.snapshot()
 
-    def resolve_ship_collisions(self):
-        """
-        Resolves bolt collisions with the ship
+    def restore(self,snapshot):
         """
-        for bolt in self._bolts:
-            if self._ship != None:
-                if bolt.collides(self._ship):
-                    self._ship = None
-                    del self._bolts[self._bolts.index(bolt)]
+        Puts the wave back in the state of snapshot
 
-    def update_lives(self):
-        """
-        If ship is killed reduces lives by one and set self._dead to true
-        """
-        if self._ship is None:
-            self._lives = self._lives - 1
-            self._dead=True
+        The models catch up with the restored state the next time the wave
+        is drawn.
 
-    def respawn_ship(self):
+        Parameter snapshot: the state to restore
+        Precondition: snapshot is a WaveSnapshot taken from a Wave
         """
-        Respawns the ship at the center of board
-        """
-        if self._lives > 0:
-            self._ship = Ship()
+        self._sim.restore(snapshot)
+        # The formation may have the same step and count with other survivors
+        self._steps=None
 
     def assert_win_conditions(self):
         """
         Returns True if win conditions are present
         """
-        if self.all_aliens_dead():
-            return True
-        else:
-            return False
+        return self._sim.assert_win_conditions()
 
     def assert_lose_conditions(self):
         """
         Returns True if lose conditions are present
         """
-        if self.alien_below_line() == True:
-            return True
-        elif self._lives==0:
-            return True
-        else:
-            return False
-
-    #helper for moving aliens
-    def horde_move(self,incr_x,incr_y):
-        """
-        Moves all the aliens, changing direction when they reach the edge
-
-        Parameter incr_x: the magnitude of each alien's movement on the x-axis
-        Precondition: incr_x is a positive number
-
-        Parameter incr_y: the magnitude of each alien's movement on the y-axis
-        Precondition: incr_y is a positive number
-        """
-        assert isinstance(incr_x,int) or isinstance(incr_x,float)
-        assert isinstance(incr_y,int) or isinstance(incr_y,float)
-        assert incr_y >= 0 and incr_x >= 0
-        #check closest to end alien
-        for row in self._aliens:
-            #moving aliens right
-            if self._direction==True:
-                if not self.check_last_alien(row) == False:
-                    self.move_row_right(row,incr_x,incr_y)
-            #moving aliens left
-            elif self._direction==False:
-                if not self.check_last_alien(row) == False:
-                    self.move_row_left(row,incr_x,incr_y)
-
-    def move_row_right(self,row,incr_x,incr_y):
-        """
-        Moves a row of aliens to the right (or down if too far right)
-
-        Parameter incr_x: the magnitude of each alien's movement on the x-axis
-        Precondition: incr_x is a positive number
-
-        Parameter incr_y: the magnitude of each alien's movement on the y-axis
-        Precondition: incr_y is a positive number
-        """
-        assert isinstance(incr_x,int) or isinstance(incr_x,float)
-        assert isinstance(incr_y,int) or isinstance(incr_y,float)
-        assert incr_y >= 0 and incr_x >= 0
-        #the aliens have gone too far right...
-        if (GAME_WIDTH-row[self.check_last_alien(row)].x) < ALIEN_H_SEP:
-            self._direction = False
-            for row in self._aliens:
-                for alien in row:
-                    if alien is not None:
-                        alien.moveAlienY(-incr_y)
-        #keep moving father right wretched aliens!
-        else:
-            for row in self._aliens:
-                for alien in row:
-                    if alien is not None:
-                        if self._direction == True: #True if going right
-                            alien.moveAlienX(incr_x)
-
-    def move_row_left(self,row,incr_x,incr_y):
-        """
-        Moves a row of aliens to the left (or down if too far left)
-
-        Parameter incr_x: the magnitude of each alien's movement on the x-axis
-        Precondition: incr_x is a positive number
-
-        Parameter incr_y: the magnitude of each alien's movement on the y-axis
-        Precondition: incr_y is a positive number
-        """
-        assert isinstance(incr_x,int) or isinstance(incr_x,float)
-        assert isinstance(incr_y,int) or isinstance(incr_y,float)
-        assert incr_y >= 0 and incr_x >= 0
-        #commie aliens must stop somewhere
-        if row[self.check_first_alien(row)].x < ALIEN_H_SEP:
-            self._direction = True
-            for row in self._aliens:
-                for alien in row:
-                    if alien is not None:
-                        alien.moveAlienY(-incr_y)
-        #aliens moving farther and farther to the left
-        else:
-            for row in self._aliens:
-                for alien in row:
-                    if alien is not None:
-                        if self._direction == False: #True if going left
-                            alien.moveAlienX(-incr_x)
-
-    def check_last_alien(self,row):
-        """
-        Returns (negative) position of final alien in row if it exists
-        Otherwise returns False
-
-        Parameter row: row is a row of Aliens
-        Precondition: row is a list
-        """
-        assert isinstance(row,list)
-        if self.is_empty_row(row) == True:
-            return False
-        last_alien=-1
-        while row[last_alien] == None:
-            last_alien-=1
-        return last_alien
-
-    def is_empty_row(self,row):
-        """
-        Returns True if row is "empty" (all Nones), otherwise returns False
-
-        Parameter row: row is a row of Aliens
-        Precondition: row is a list
-        """
-        assert isinstance(row,list)
-        row_empty=True
-        for alien in row:
-            if not alien == None:
-                row_empty=False
-        return row_empty
-
-    def check_first_alien(self,row):
-        """
-        Returns (positive) position of first alien in row if it exists
-        Otherwise returns False
-
-        Parameter row: row is a row of Aliens
-        Precondition: row is a list
-        """
-        assert isinstance(row,list)
-        if self.is_empty_row(row) == True:
-            return False
-        first_alien=0
-        while row[first_alien] == None:
-            first_alien+=1
-        return first_alien
-
-    def ship_fire_bolt(self):
-        """
-        Fires a laser bolt from the ship
-
-        Creates a Bolt object at the ship's position and adds it to the list of
-        bolts.
-        """
-        x_cor=self._ship.x
-        y_cor=self._ship.top
-        blt=Bolt()
-        blt.x=x_cor
-        blt.y=y_cor
-        self._bolts.append(blt)
-
-    def alien_fire_bolt(self):
-        """
-        Fires a laser bolt from a random alien ship.
-        """
-        col =self.non_empty_column()
-        if col is not None:
-            row = len(self._aliens) - 1
-            bottom_alien=None
-
-            while row>= 0 and bottom_alien==None:#no infinite loop plz
-                alien = self._aliens[row][col]
-                if alien is not None:
-                    bottom_alien = alien
-                row = row-1
-
-            if bottom_alien is not None:
-                x_cor = bottom_alien.x
-                y_cor = bottom_alien.y - BOLT_HEIGHT / 2
-                blt=Bolt()
-                blt.x=x_cor
-                blt.y=y_cor
-                self._bolts.append(blt)
-                blt._velocity = -BOLT_SPEED
-
-    def non_empty_column(self):
-        """
-        Helper for alien_fire_bolt. Selects a non-empty column from alien grid
-        at random.
-        Returns the index of column or None if all columns are empty.
-        """
-        acum=[]
-        for col in range(ALIENS_IN_ROW):
-            has_alien=False
-            for row in self._aliens:
-                if row[col] is not None: #check for alien
-                    has_alien = True
-            if has_alien==True:
-                acum.append(col)
+        return self._sim.assert_lose_conditions()
+
+    # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
+    def draw(self,view,alpha=1):
+        """
+        Draws ships, aliens, defensive line and bolts
 
-        if len(acum)>0:
-            return random.choice(acum)
-        return None
+        The models are kept in the retained scene of the view.  The first call
+        attaches them, and later calls only move what moved.  Call hide to take
+        the wave off the screen.
 
-#helpers for game completion
-    def all_aliens_dead(self):
+        The aliens and the bolts are drawn as batches: one mesh for each alien
+        image and one for all of the bolts, whose vertices are rewritten from
+        the arrays of the simulation.  The aliens are only rewritten when the
+        formation steps or loses an alien.
+
+        The ship and the bolts are drawn at alpha of the way between their
+        positions before and after the last update.  The aliens are not
+        interpolated, since they march in discrete steps.
+
+        Parameter view: View to draw the objects in
+        Precondition: view is a GView object
+
+        Parameter alpha: the render interpolation factor
+        Precondition: alpha is a number in 0..1
         """
-        Checks if all aliens in the wave have been killed. Returns True if they
-        have all been killed, or False if they haven't all been killed yet.
-        """
-        for row in self._aliens:
-            for alien in row:
-                if alien is not None:
-                    return False
+        assert isinstance(view,GView)
+        assert isinstance(alpha,int) or isinstance(alpha,float)
+        assert 0 <= alpha <= 1
+        if self._view is not view:
+            self.hide()
+            self._show(view)
+        self._sync_aliens()
+        self._sync_ship(alpha)
+        self._sync_bolts(alpha)
 
-        return True
+    def hide(self):
+        """
+        Removes every model of this wave from the view it is drawn in
 
-    def alien_below_line(self):
+        Nothing happens if the wave is not on screen.
         """
-        Checks if alien crosses below the defense line. Returns true if an alien
-        has a position below the defense line
-        """
-        for row in self._aliens:
-            for alien in row:
-                if alien is not None:
-                    if alien.y < DEFENSE_LINE:
-                        return True
-        return False
+        view=self._view
+        if view is None:
+            return
+        self._dline.detach(view)
+        if self._ship is not None:
+            self._ship.detach(view)
+        for batch in self._aliens:
+            batch.detach(view)
+        self._bolts.detach(view)
+        self._view=None
 
-    # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
-    def draw(self,view):
+    # HELPER METHODS TO MIRROR THE SIMULATION
+    def _show(self,view):
         """
-        Draws ships, aliens, defensive line and bolts
+        Attaches the defense line, ship, aliens and bolts to view
 
-        Parameter view: View to draw the objects in
+        Parameter view: the view to attach the models to
         Precondition: view is a GView object
         """
-        assert isinstance(view,GView)
-        #drawing aliens
-        for row in self.getAliens():
-            for alien in row:
-                if alien is not None:
-                    alien.draw(view)
-        #drawing ship
+        self._view=view
+        self._dline.attach(view)
         if self._ship is not None:
-            self._ship.draw(view)
-        #drawing defensive line
-        self._dline.draw(view)
-        #drawing bolts
-        for bolt in self._bolts:
-            bolt.draw(view)
-
-    # HELPER METHODS FOR COLLISION DETECTION
-    def _alien_2d(self,x,y,num_col,num_rows,src):
-        """
-        Returns a 2d list of aliens with the type alternating every two rows
-
-        Parameter x: x coordinate of first alien in grid
-        Precondition: x is a float or int
-
-        Parameter y: y coordinate of first alien in grid
-        Precondition: y is a float or int
-
-        Parameter num_col: number of columns in the grid
-        Precondition: int, >0
-
-        Parameter num_rows: number of rows in the grid
-        Precondition: int, >0
-
-        Parameter src: alien image file
-        Precondition: str that refers to an image file
-        """
-        assert isinstance(x,float) or isinstance (x, int)
-        assert isinstance(y,float) or isinstance (y, int)
-        assert isinstance(num_col, int) and num_col >0
-        assert isinstance(num_rows, int) and num_rows >0
-        assert isinstance(src, str)
-
-        ycor_accum=y
-        j=0
-        png_accum1=0
-        png_bool=False
-        list_accum=[]
-        while j < num_rows:
-            list_accum.append(alien_row(x,ycor_accum,ALIEN_IMAGES[png_accum1],num_col))
-            ycor_accum=ycor_accum-(ALIEN_HEIGHT+ALIEN_V_SEP)
-            if png_bool:
-                png_accum1+=1
-                png_bool=False
-            else:
-                png_bool=True
-            j+=1
-            if png_accum1==3:
-                png_accum1=0
-        return list_accum
+            self._ship.attach(view)
+        for batch in self._aliens:
+            batch.attach(view)
+        self._bolts.attach(view)
+
+    def _sync_ship(self,alpha):
+        """
+        Mirrors the simulated ship onto _ship
+
+        Parameter alpha: the render interpolation factor
+        Precondition: alpha is a number in 0..1
+        """
+        shipx=self._sim.getShipX(alpha)
+        if shipx is None:
+            if self._ship is not None and self._view is not None:
+                self._ship.detach(self._view)
+            self._ship=None
+            return
+        if self._ship is None:
+            self._ship=Ship(self._config)
+            if self._view is not None:
+                self._ship.attach(self._view)
+        self._ship.x=shipx
+
+    def _sync_aliens(self):
+        """
+        Places the living aliens of the simulated formation in _aliens
+
+        Nothing is done unless the formation has stepped or lost an alien since
+        the last call.
+        """
+        formation=self._sim.getFormation()
+        if (self._steps == self._sim.getSteps() and
+            self._count == formation.count()):
+            return
+        self._steps=self._sim.getSteps()
+        self._count=formation.count()
+        alive=formation.alive
+        kind=formation.kind[alive]
+        xs=formation.x[alive]
+        ys=formation.y[alive]
+        for pos in range(len(self._aliens)):
+            mask=kind == pos
+            self._aliens[pos].place(xs[mask].tolist(),ys[mask].tolist())
+
+    def _sync_bolts(self,alpha):
+        """
+        Places the active simulated bolts in _bolts
+
+        Parameter alpha: the render interpolation factor
+        Precondition: alpha is a number in 0..1
+        """
+        bolts=self._sim.getBolts()
+        self._bolts.reserve(self._sim.getBoltPool().capacity)
+        self._bolts.place([bolt.x for bolt in bolts],
+        [bolt.interpolate(alpha) for bolt in bolts])